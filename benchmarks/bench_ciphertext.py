@@ -0,0 +1,97 @@
+"""
+Compares legacy Fernet tokens with binary AES-GCM and ChaCha20-Poly1305 envelopes: per-record encrypt and decrypt
+latency, size of single encrypted password and size of database holding encrypted passwords.
+
+Usage, from repository root:
+    python -m benchmarks.bench_ciphertext --records 100000 --output after.json --compare before.json
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+
+from cryptography.fernet import Fernet
+from benchmarks.common import (
+    compare_results, environment, file_size, load_results, measure, print_results, save_results, summarize
+)
+from v13pwm.models.cipher import Cipher
+
+# Number of encrypted passwords measured and stored.
+RECORDS: int = 100_000
+
+# Length of encrypted passwords, default password length used by app.
+PASSWORD_LENGTH: int = 20
+
+
+def formats(key: str) -> dict:
+    """
+    Takes Fernet key and returns encrypt and decrypt functions of every compared format.
+    :param str key: Fernet key.
+    :return dict: Format name as key and tuple with encrypt and decrypt function as value.
+    """
+    fernet = Fernet(key)
+    aes_gcm = Cipher([key], Cipher.AES_GCM)
+    chacha = Cipher([key], Cipher.CHACHA20_POLY1305)
+    return {
+        "fernet_text": (lambda data: fernet.encrypt(data).decode(), lambda token: fernet.decrypt(token.encode())),
+        "aes_gcm_blob": (aes_gcm.encrypt, aes_gcm.decrypt),
+        "chacha20_blob": (chacha.encrypt, chacha.decrypt),
+    }
+
+
+def database_size(tokens: list, directory: str, name: str) -> int:
+    """
+    Takes encrypted passwords and stores them in table shaped like password_manager.
+    :param list tokens: Encrypted passwords.
+    :param str directory: Directory for database file.
+    :param str name: Database name.
+    :return int: Database file size in bytes.
+    """
+    path = os.path.join(directory, f"{name}.db")
+    con = sqlite3.connect(path)
+    con.execute("CREATE TABLE password_manager (id integer PRIMARY KEY, app text, username text, password text)")
+    with con:
+        con.executemany(
+            "INSERT INTO password_manager (app, username, password) VALUES (?,?,?)",
+            ((f"app{number}.com", f"user{number}", token) for number, token in enumerate(tokens))
+        )
+    con.execute("VACUUM")
+    con.close()
+    return file_size(path)
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark stored password formats.")
+    parser.add_argument("--records", type=int, default=RECORDS, help="number of encrypted passwords")
+    parser.add_argument("--output", help="write results to JSON file")
+    parser.add_argument("--compare", help="compare with results JSON file of previous run")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed relative slowdown, default 0.1")
+    args = parser.parse_args(argv)
+
+    passwords = [os.urandom(PASSWORD_LENGTH // 2).hex().encode() for _ in range(args.records)]
+    results: dict = {"environment": environment(), "results": {}}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, (encrypt, decrypt) in formats(Fernet.generate_key().decode()).items():
+            print(f"Measuring {name}...", file=sys.stderr)
+            tokens = [encrypt(password) for password in passwords]
+            results["results"][name] = {
+                "encrypt": summarize(measure(encrypt, ((password,) for password in passwords))),
+                "decrypt": summarize(measure(decrypt, ((token,) for token in tokens))),
+                "token_bytes": len(tokens[0]),
+                "db_size_bytes": database_size(tokens, directory, name),
+            }
+
+    print_results(results)
+    if args.output:
+        save_results(args.output, results)
+    if args.compare:
+        regressions = compare_results(load_results(args.compare), results, args.threshold)
+        for group, name, metric, change in regressions:
+            print(f"Regression: {group} {name} {metric} {change:+.1%}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
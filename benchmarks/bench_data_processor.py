@@ -0,0 +1,205 @@
+"""
+Measures DataProcessor operations on synthetic vaults of growing size.
+
+Usage, from repository root:
+    python -m benchmarks.bench_data_processor --sizes 10000 100000 1000000 --output after.json --compare before.json
+"""
+import argparse
+import base64
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.common import (
+    compare_results, environment, file_size, load_results, measure, print_results, save_results, summarize
+)
+from v13pwm.models.data_processor import DataProcessor
+from v13pwm.models.preferences import Preferences
+
+# Sizes of generated vaults.
+SIZES: tuple = (10_000, 100_000, 1_000_000)
+
+# Number of measured calls of every point operation.
+RUNS: int = 1000
+
+# Number of measured calls of operations which read whole table.
+SCAN_RUNS: int = 5
+
+# Number of records inserted in single transaction while generating vault.
+GENERATE_BATCH: int = 10_000
+
+WORDS: tuple = (
+    "mail", "bank", "cloud", "shop", "forum", "news", "games", "photo", "music", "video", "travel", "health",
+    "school", "work", "chat", "code", "drive", "social", "market", "crypto", "sport", "books", "home", "auto",
+)
+DOMAINS: tuple = (".com", ".net", ".org", ".io", ".dev", ".co.uk", ".de", ".app")
+
+
+class VaultGenerator:
+    """
+    Encapsulates deterministic generator of synthetic credentials. Same seed always produces same vault, so
+    results of different runs are comparable.
+    """
+
+    def __init__(self, seed: int = 13):
+        self.random = random.Random(seed)
+
+    def app(self, number: int) -> str:
+        """
+        Takes record number and returns unique app name, mixing plain names, domains and different letter case.
+        :param int number: Record number.
+        :return str: App name.
+        """
+        name = f"{self.random.choice(WORDS)}{self.random.choice(WORDS)}{number}"
+        kind = number % 3
+        if kind == 1:
+            return f"{name}{self.random.choice(DOMAINS)}"
+        if kind == 2:
+            return name.capitalize()
+        return name
+
+    def password(self) -> str:
+        """
+        Returns random string of the same length as Fernet token of 20 character password.
+        :return str: Fake encrypted password.
+        """
+        return base64.urlsafe_b64encode(self.random.randbytes(90)).decode()
+
+    def records(self, count: int, start: int = 0):
+        """
+        Takes number of records and yields synthetic credentials. Roughly every tenth app has second account.
+        :param int count: Number of records.
+        :param int start: Number of first record.
+        :return: Generator of (app, username, password) tuples.
+        """
+        number = start
+        produced = 0
+        while produced < count:
+            app = self.app(number)
+            accounts = 2 if number % 10 == 0 and produced + 1 < count else 1
+            for account in range(accounts):
+                yield app, f"user{account}@{app.lower()}", self.password()
+            produced += accounts
+            number += 1
+
+
+def generate_vault(generator: VaultGenerator, size: int) -> float:
+    """
+    Takes generator and vault size, creates database and fills it with synthetic credentials.
+    :param VaultGenerator generator: Credentials generator.
+    :param int size: Number of records.
+    :return float: Time spent inserting records in seconds.
+    """
+    DataProcessor.create_database()
+    records = generator.records(size)
+    started = time.perf_counter()
+    while batch := [record for _, record in zip(range(GENERATE_BATCH), records)]:
+        DataProcessor.insert_records(batch)
+    return time.perf_counter() - started
+
+
+def bench_size(size: int, runs: int, scan_runs: int, directory: str) -> dict:
+    """
+    Takes vault size, generates vault and measures all operations on it.
+    :param int size: Number of records.
+    :param int runs: Number of measured calls of point operations.
+    :param int scan_runs: Number of measured calls of whole table operations.
+    :param str directory: Directory for database file.
+    :return dict: Statistics of every operation and database file size.
+    """
+    DataProcessor.DB_PATH = os.path.join(directory, f"bench_{size}.db")
+    generator = VaultGenerator()
+    insert_time = generate_vault(generator, size)
+    results: dict = {
+        "generate": summarize([insert_time], items=size),
+        "db_size_bytes": file_size(DataProcessor.DB_PATH),
+    }
+    apps = [app for app, in DataProcessor.get_all_apps()]
+    picker = random.Random(7)
+    existing = [picker.choice(apps) for _ in range(runs)]
+    missing = [f"missing{number}.com" for number in range(runs)]
+    new_records = list(VaultGenerator(seed=31).records(runs, start=size * 2))
+
+    results["search_record"] = summarize(measure(DataProcessor.search_record, ((app,) for app in existing)))
+    results["search_record_missing"] = summarize(measure(DataProcessor.search_record, ((app,) for app in missing)))
+    results["get_accounts"] = summarize(measure(DataProcessor.get_accounts, ((app,) for app in existing)))
+    accounts = [(app, DataProcessor.get_accounts(app)[0]) for app in existing]
+    results["update_record"] = summarize(measure(
+        DataProcessor.update_record, ((app, username, generator.password()) for app, username in accounts)
+    ))
+    results["upsert_record"] = summarize(measure(
+        DataProcessor.upsert_record, ((app, username, password) for app, username, password in new_records)
+    ))
+    results["touch_record"] = summarize(measure(DataProcessor.touch_record, accounts))
+    results["get_frecent_records"] = summarize(measure(DataProcessor.get_frecent_records, [(20,)] * runs))
+    results["get_all_apps"] = summarize(measure(DataProcessor.get_all_apps, [()] * scan_runs), items=len(apps))
+    results["iter_records"] = summarize(
+        measure(lambda: sum(len(batch) for batch in DataProcessor.iter_records()), [()] * scan_runs), items=size
+    )
+    results["db_size_after_bytes"] = file_size(DataProcessor.DB_PATH)
+    DataProcessor.close_connection()
+    return results
+
+
+def bench_preferences(runs: int, directory: str) -> dict:
+    """
+    Measures loading preferences from file and writing them atomically.
+    :param int runs: Number of measured calls.
+    :param str directory: Directory for preferences file.
+    :return dict: Statistics of every operation.
+    """
+    path = os.path.join(directory, "data.json")
+    preferences = Preferences(path, flush_delay=3600)
+
+    def write(length: int):
+        preferences.update({"pw_length": length, "theme": "cyborg"})
+        preferences.flush()
+
+    def write_burst():
+        for length in range(100):
+            preferences.update({"pw_length": length})
+        preferences.flush()
+
+    results = {
+        "flush": summarize(measure(write, ((length,) for length in range(runs)))),
+        "update_burst_100": summarize(measure(write_burst, [()] * runs), items=100),
+        "load": summarize(measure(lambda: Preferences(path).load(), [()] * runs)),
+    }
+    return results
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark DataProcessor on synthetic vaults.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="vault sizes to measure")
+    parser.add_argument("--runs", type=int, default=RUNS, help="measured calls of point operations")
+    parser.add_argument("--scan-runs", type=int, default=SCAN_RUNS, help="measured calls of whole table operations")
+    parser.add_argument("--output", help="write results to JSON file")
+    parser.add_argument("--compare", help="compare with results JSON file of previous run")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed relative slowdown, default 0.1")
+    parser.add_argument("--keep", help="keep generated databases in this directory")
+    args = parser.parse_args(argv)
+
+    results: dict = {"environment": environment(), "results": {}}
+    with tempfile.TemporaryDirectory() as temp_directory:
+        directory = args.keep or temp_directory
+        os.makedirs(directory, exist_ok=True)
+        for size in args.sizes:
+            print(f"Generating and measuring vault with {size} records...", file=sys.stderr)
+            results["results"][str(size)] = bench_size(size, args.runs, args.scan_runs, directory)
+        results["results"]["prefs"] = bench_preferences(args.runs, directory)
+
+    print_results(results)
+    if args.output:
+        save_results(args.output, results)
+    if args.compare:
+        regressions = compare_results(load_results(args.compare), results, args.threshold)
+        for group, name, metric, change in regressions:
+            print(f"Regression: {group} {name} {metric} {change:+.1%}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Measures security token e-mail latency and throughput of every mail transport: direct send, end-to-end latency
+through MailQueue (from queueing message to its status reaching GUI thread) and burst throughput. SMTP transports
+send to local stand-in server, so results show overhead of the app and of SMTP round trips, not of a real provider.
+
+Usage, from repository root:
+    python -m benchmarks.bench_mail --messages 500 --output after.json --compare before.json
+"""
+import argparse
+import sys
+import tempfile
+import time
+from email.message import EmailMessage
+
+from benchmarks.common import compare_results, environment, load_results, print_results, save_results, summarize
+from benchmarks.smtp_server import StandInSMTPServer
+from v13pwm.models.mail_processor import MailProcessor
+from v13pwm.models.mail_queue import MailQueue
+from v13pwm.models.mail_transport import FileTransport, MemoryTransport, SmtpTransport
+
+# Number of measured messages per operation.
+MESSAGES: int = 500
+
+
+class PerMessageSmtpTransport(SmtpTransport):
+    """
+    Encapsulates SMTP transport which opens and authenticates new connection for every message, the way token
+    e-mails were sent before connection reuse.
+    """
+
+    def send(self, message: EmailMessage):
+        super().send(message)
+        self.close()
+
+
+def token_message(number: int) -> EmailMessage:
+    """
+    Takes message number and returns e-mail shaped like security token e-mail.
+    :param int number: Message number.
+    :return EmailMessage: Message.
+    """
+    message = EmailMessage()
+    message["From"] = "sender@example.com"
+    message["To"] = f"user{number}@example.com"
+    message["Subject"] = MailProcessor.TOKEN_SUBJECT
+    message.set_content(f"Your authentication token - {number:06}")
+    return message
+
+
+def wait(mail_queue: MailQueue, done: list, count: int):
+    """
+    Takes mail queue and polls it like GUI thread until given number of statuses was delivered.
+    :param MailQueue mail_queue: Mail queue.
+    :param list done: List statuses are appended to.
+    :param int count: Expected number of statuses.
+    """
+    while len(done) < count:
+        mail_queue.poll()
+        time.sleep(0)
+
+
+def bench_transport(factory, messages: int) -> dict:
+    """
+    Takes transport factory and measures direct sends, queue latency and queue burst throughput.
+    :param factory: Function returning new transport.
+    :param int messages: Number of measured messages per operation.
+    :return dict: Statistics of every operation.
+    """
+    transport = factory()
+    samples: list = []
+    for number in range(messages):
+        message = token_message(number)
+        started = time.perf_counter()
+        transport.send(message)
+        samples.append(time.perf_counter() - started)
+    transport.close()
+    results = {"send": summarize(samples)}
+
+    mail_queue = MailQueue(factory, max_size=messages)
+    mail_queue.start()
+    done: list = []
+    samples = []
+    for number in range(messages):
+        started = time.perf_counter()
+        mail_queue.send(f"user{number}@example.com", MailProcessor.TOKEN_SUBJECT, f"{number:06}",
+                        lambda status, error: done.append(status))
+        wait(mail_queue, done, number + 1)
+        samples.append(time.perf_counter() - started)
+    results["queue_latency"] = summarize(samples)
+
+    done.clear()
+    started = time.perf_counter()
+    for number in range(messages):
+        mail_queue.send(f"user{number}@example.com", MailProcessor.TOKEN_SUBJECT, f"{number:06}",
+                        lambda status, error: done.append(status))
+    wait(mail_queue, done, messages)
+    results["queue_burst"] = summarize([time.perf_counter() - started], items=messages)
+    mail_queue.stop()
+    mail_queue.join()
+    failed = sum(status != MailQueue.SENT for status in done)
+    if failed:
+        print(f"{failed} messages failed", file=sys.stderr)
+    return results
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark mail transports.")
+    parser.add_argument("--messages", type=int, default=MESSAGES, help="measured messages per operation")
+    parser.add_argument("--output", help="write results to JSON file")
+    parser.add_argument("--compare", help="compare with results JSON file of previous run")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed relative slowdown, default 0.1")
+    args = parser.parse_args(argv)
+
+    server = StandInSMTPServer()
+    server.start()
+    results: dict = {"environment": environment(), "results": {}}
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            transports = {
+                "memory": MemoryTransport,
+                "file": lambda: FileTransport(directory),
+                "smtp_pooled": lambda: SmtpTransport("127.0.0.1", server.port, server.user, server.password, False),
+                "smtp_per_msg": lambda: PerMessageSmtpTransport(
+                    "127.0.0.1", server.port, server.user, server.password, False
+                ),
+            }
+            for name, factory in transports.items():
+                print(f"Measuring {name}...", file=sys.stderr)
+                results["results"][name] = bench_transport(factory, args.messages)
+    finally:
+        server.stop()
+
+    print_results(results)
+    if args.output:
+        save_results(args.output, results)
+    if args.compare:
+        regressions = compare_results(load_results(args.compare), results, args.threshold)
+        for group, name, metric, change in regressions:
+            print(f"Regression: {group} {name} {metric} {change:+.1%}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import json
+import os
+import platform
+import sqlite3
+import time
+
+
+def percentile(samples: list, fraction: float) -> float:
+    """
+    Takes samples and returns value below which given fraction of samples lies, using nearest rank method.
+    :param list samples: Measured values.
+    :param float fraction: Fraction between 0 and 1, e.g. 0.99 for p99.
+    :return float: Percentile value.
+    """
+    ordered = sorted(samples)
+    rank = max(1, round(fraction * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples: list, items: int = 1) -> dict:
+    """
+    Takes durations of single operations and returns latency and throughput statistics.
+    :param list samples: Durations in seconds.
+    :param int items: Number of items processed by one operation, used for throughput.
+    :return dict: Number of runs, p50, p99 and mean latency in milliseconds and items processed per second.
+    """
+    total = sum(samples)
+    return {
+        "runs": len(samples),
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "mean_ms": total / len(samples) * 1000,
+        "throughput": len(samples) * items / total if total else 0.0,
+    }
+
+
+def measure(function, arguments) -> list:
+    """
+    Takes function and iterable of argument tuples, calls function once per tuple and returns call durations.
+    :param function: Function to measure.
+    :param arguments: Iterable of argument tuples.
+    :return list: Durations in seconds.
+    """
+    samples: list = []
+    for args in arguments:
+        started = time.perf_counter()
+        function(*args)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def file_size(path: str) -> int:
+    """
+    Takes path to SQLite database and returns size of database file together with its WAL file.
+    :param str path: Path to database file.
+    :return int: Size in bytes.
+    """
+    return sum(os.path.getsize(name) for name in (path, f"{path}-wal") if os.path.exists(name))
+
+
+def environment() -> dict:
+    """
+    Returns description of machine and library versions results were measured with.
+    :return dict: Environment details.
+    """
+    return {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def save_results(path: str, results: dict):
+    """
+    Takes results and writes them to JSON file.
+    :param str path: Output file path.
+    :param dict results: Benchmark results.
+    """
+    with open(path, "w") as results_file:
+        json.dump(results, results_file, indent=4)
+
+
+def load_results(path: str) -> dict:
+    """
+    Takes path to JSON file written by save_results and returns results.
+    :param str path: Results file path.
+    :return dict: Benchmark results.
+    """
+    with open(path) as results_file:
+        return json.load(results_file)
+
+
+def print_results(results: dict):
+    """
+    Takes results and prints them as table, one row per group and operation.
+    :param dict results: Benchmark results.
+    """
+    print(f"{'group':>14}  {'operation':<24}{'p50 ms':>10}{'p99 ms':>10}{'ops/s':>14}")
+    for group, operations in results["results"].items():
+        for name, stats in operations.items():
+            if isinstance(stats, dict):
+                print(
+                    f"{group:>14}  {name:<24}"
+                    f"{stats['p50_ms']:>10.3f}{stats['p99_ms']:>10.3f}{stats['throughput']:>14.1f}"
+                )
+            else:
+                print(f"{group:>14}  {name:<24}{stats:>34}")
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.1) -> list:
+    """
+    Takes two result sets, prints relative change of every operation measured in both and returns regressions.
+    Operation regressed if its p50 or p99 latency grew by more than threshold.
+    :param dict baseline: Results of previous run.
+    :param dict current: Results of this run.
+    :param float threshold: Allowed relative slowdown, e.g. 0.1 for 10 %.
+    :return list: (group, operation, metric, change) tuples of regressed operations.
+    """
+    regressions: list = []
+    print(f"{'group':>14}  {'operation':<24}{'p50':>10}{'p99':>10}{'ops/s':>10}")
+    for group, operations in current["results"].items():
+        for name, stats in operations.items():
+            old = baseline["results"].get(group, {}).get(name)
+            if not isinstance(stats, dict) or not isinstance(old, dict):
+                continue
+            changes = {
+                metric: (stats[metric] - old[metric]) / old[metric] if old[metric] else 0.0
+                for metric in ("p50_ms", "p99_ms", "throughput")
+            }
+            print(
+                f"{group:>14}  {name:<24}"
+                + "".join(f"{changes[metric]:>+10.1%}" for metric in ("p50_ms", "p99_ms", "throughput"))
+            )
+            regressions += [
+                (group, name, metric, changes[metric])
+                for metric in ("p50_ms", "p99_ms") if changes[metric] > threshold
+            ]
+    return regressions
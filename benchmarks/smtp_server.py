@@ -0,0 +1,97 @@
+import base64
+import socket
+import socketserver
+import threading
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """
+    Handles one client connection, speaks just enough SMTP for smtplib: EHLO, AUTH PLAIN, MAIL, RCPT, DATA, NOOP,
+    RSET and QUIT.
+    """
+
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+            server.handlers.append(self)
+        self.reply("220 localhost stand-in SMTP")
+        while line := self.rfile.readline():
+            command = line.decode().strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250-localhost")
+                self.reply("250 AUTH PLAIN")
+            elif verb == "AUTH":
+                credentials = base64.b64decode(command.split()[-1]).split(b"\0")
+                if credentials[1:] == [server.user.encode(), server.password.encode()]:
+                    with server.lock:
+                        server.logins += 1
+                    self.reply("235 Authentication successful")
+                else:
+                    self.reply("535 Authentication credentials invalid")
+            elif verb in ("MAIL", "RCPT", "NOOP", "RSET"):
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b""
+                while (chunk := self.rfile.readline()) not in (b".\r\n", b""):
+                    data += chunk
+                with server.lock:
+                    code = server.failures.pop(0) if server.failures else None
+                    if code is None:
+                        server.messages.append(data.decode())
+                self.reply(f"{code} Failure requested by test" if code else "250 Queued")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class StandInSMTPServer(socketserver.ThreadingTCPServer):
+    """
+    Encapsulates local SMTP server used by tests and benchmarks instead of real mail server. Records connections,
+    logins and received messages and can be told to reject next messages or to drop open connections.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, user: str = "sender@example.com", password: str = "secret"):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.user = user
+        self.password = password
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.logins = 0
+        self.messages: list = []
+        self.failures: list = []
+        self.handlers: list = []
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def drop_connections(self):
+        """
+        Closes all open client connections, like server closing idle connections.
+        """
+        with self.lock:
+            for handler in self.handlers:
+                try:
+                    handler.connection.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            self.handlers.clear()
+
+    def stop(self):
+        self.drop_connections()
+        self.shutdown()
+        self.server_close()
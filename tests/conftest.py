@@ -0,0 +1,18 @@
+from v13pwm.models.data_processor import DataProcessor
+from v13pwm.models.security_engine import SecurityEngine
+import pytest
+
+
+@pytest.fixture
+def security_engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(DataProcessor, "DB_PATH", str(tmp_path / "test_vault.db"))
+    DataProcessor.create_database()
+    security_engine = SecurityEngine()
+    security_engine._client = "test"
+    security_engine.initialize_new_acc()
+    DataProcessor.insert_records(
+        [(f"app_{number}", "user", security_engine.encrypt(f"password_{number}")) for number in range(25)]
+    )
+    yield security_engine
+    security_engine.delete_secrets()
+    DataProcessor.close_connection()
@@ -0,0 +1,42 @@
+from v13pwm.models.app_index import AppIndex
+
+APPS = [("github",), ("gitlab",), ("gmail",), ("Google",), ("amazon",)]
+
+
+def test_load_and_complete():
+    app_index = AppIndex()
+    app_index.load(APPS)
+    assert len(app_index) == 5
+    assert app_index.complete("g") == ["github", "gitlab", "gmail", "Google"]
+    assert app_index.complete("GIT") == ["github", "gitlab"]
+    assert app_index.complete("go") == ["Google"]
+    assert app_index.complete("x") == []
+
+
+def test_complete_limit():
+    app_index = AppIndex()
+    app_index.load(APPS)
+    assert app_index.complete("", limit=2) == ["amazon", "github"]
+    assert app_index.complete("g", limit=1) == ["github"]
+
+
+def test_add_and_remove():
+    app_index = AppIndex()
+    app_index.load(APPS)
+    app_index.add("gitea")
+    app_index.add("github")
+    assert len(app_index) == 6
+    assert app_index.complete("git") == ["gitea", "github", "gitlab"]
+
+    app_index.remove("GitHub")
+    app_index.remove("non-existent")
+    assert "github" not in app_index
+    assert app_index.complete("git") == ["gitea", "gitlab"]
+
+
+def test_clear():
+    app_index = AppIndex()
+    app_index.load(APPS)
+    app_index.clear()
+    assert len(app_index) == 0
+    assert app_index.complete("") == []
@@ -0,0 +1,40 @@
+from v13pwm.utilities.asset_cache import AssetCache
+from PIL import Image
+import pytest
+
+
+@pytest.fixture
+def assets(tmp_path, monkeypatch):
+    Image.new("RGBA", (200, 200), "red").save(tmp_path / "logo.png")
+    Image.new("RGB", (80, 96), "blue").save(tmp_path / "theme.png")
+    monkeypatch.setattr(AssetCache, "IMAGE_DIR", str(tmp_path))
+    AssetCache.clear()
+    yield tmp_path
+    AssetCache.clear()
+
+
+def test_image_is_decoded_once(assets):
+    image = AssetCache.image("logo.png")
+    (assets / "logo.png").unlink()
+    assert AssetCache.image("logo.png") is image
+    assert image.size == (200, 200)
+
+
+def test_scaled_variants_are_cached(assets):
+    small = AssetCache.image("logo.png", (32, 32))
+    assert small.size == (32, 32)
+    assert AssetCache.image("logo.png", [32, 32]) is small
+    assert AssetCache.image("logo.png", (64, 64)).size == (64, 64)
+
+
+def test_memory_footprint(assets):
+    AssetCache.preload([("logo.png", None), ("logo.png", (32, 32)), ("theme.png", None)])
+    footprint = AssetCache.memory_footprint()
+    assert footprint["images"] == 3
+    assert footprint["variants"] == {
+        "logo.png": 200 * 200 * 4,
+        "logo.png@32x32": 32 * 32 * 4,
+        "theme.png": 80 * 96 * 3,
+    }
+    assert footprint["image_bytes"] == footprint["total_bytes"] == 200 * 200 * 4 + 32 * 32 * 4 + 80 * 96 * 3
+    assert footprint["photos"] == 0
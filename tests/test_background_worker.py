@@ -0,0 +1,75 @@
+from v13pwm.models.background_worker import BackgroundWorker
+import threading
+import time
+import pytest
+
+
+@pytest.fixture
+def worker():
+    worker = BackgroundWorker()
+    yield worker
+    worker.shutdown()
+
+
+def wait(worker: BackgroundWorker, key: str, timeout: float = 5) -> int:
+    delivered = 0
+    deadline = time.monotonic() + timeout
+    while worker.busy(key) and time.monotonic() < deadline:
+        delivered += worker.poll()
+        time.sleep(0.001)
+    return delivered
+
+
+def test_job_runs_off_calling_thread(worker):
+    results = []
+    worker.submit("job", threading.get_ident, callback=results.append)
+    assert wait(worker, "job") == 1
+    assert results and results[0] != threading.get_ident()
+
+
+def test_repeated_submits_are_coalesced(worker):
+    release = threading.Event()
+    calls = []
+
+    def slow(number):
+        calls.append(number)
+        release.wait(5)
+        return number
+
+    results = []
+    assert worker.submit("login", slow, 1, callback=results.append)
+    assert not worker.submit("login", slow, 2, callback=results.append)
+    assert not worker.submit("login", slow, 3, callback=results.append)
+    assert worker.busy("login")
+    release.set()
+    wait(worker, "login")
+    assert calls == [1]
+    assert results == [1]
+    assert not worker.busy("login")
+    assert worker.submit("login", slow, 4, callback=results.append)
+    wait(worker, "login")
+    assert results == [1, 4]
+
+
+def test_different_keys_run_independently(worker):
+    results = []
+    worker.submit("first", lambda: "first", callback=results.append)
+    worker.submit("second", lambda: "second", callback=results.append)
+    wait(worker, "first")
+    wait(worker, "second")
+    assert sorted(results) == ["first", "second"]
+
+
+def test_error_is_passed_to_error_callback(worker):
+    errors = []
+    worker.submit("job", lambda: 1 / 0, error=errors.append)
+    wait(worker, "job")
+    assert isinstance(errors[0], ZeroDivisionError)
+    assert not worker.busy("job")
+
+
+def test_unhandled_error_is_raised_from_poll(worker):
+    worker.submit("job", lambda: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        wait(worker, "job")
+    assert not worker.busy("job")
@@ -0,0 +1,58 @@
+from v13pwm.models.cipher import Cipher
+from cryptography.fernet import Fernet, InvalidToken
+import pytest
+
+KEY = Fernet.generate_key().decode()
+OLD_KEY = Fernet.generate_key().decode()
+
+
+@pytest.mark.parametrize("algorithm", [Cipher.AES_GCM, Cipher.CHACHA20_POLY1305])
+def test_encrypt_decrypt(algorithm):
+    cipher = Cipher([KEY], algorithm)
+    token = cipher.encrypt(b"password")
+    assert isinstance(token, bytes)
+    assert token[0] == algorithm
+    assert len(token) == Cipher.HEADER_SIZE + len(b"password") + 16
+    assert cipher.decrypt(token) == b"password"
+    assert cipher.encrypt(b"password") != token
+
+
+def test_envelope_is_smaller_than_fernet_token():
+    fernet_token = Fernet(KEY).encrypt(b"a" * 20)
+    assert len(Cipher([KEY]).encrypt(b"a" * 20)) < len(fernet_token) / 2
+
+
+def test_decrypt_legacy_fernet_token():
+    cipher = Cipher([KEY, OLD_KEY])
+    assert cipher.decrypt(Fernet(KEY).encrypt(b"password").decode()) == b"password"
+    assert cipher.decrypt(Fernet(OLD_KEY).encrypt(b"password")) == b"password"
+
+
+def test_decrypt_with_previous_key():
+    token = Cipher([OLD_KEY], Cipher.CHACHA20_POLY1305).encrypt(b"password")
+    cipher = Cipher([KEY, OLD_KEY])
+    assert cipher.decrypt(token) == b"password"
+    assert not cipher.is_current(token)
+    upgraded = cipher.reencrypt(token)
+    assert cipher.is_current(upgraded)
+    assert upgraded[0] == Cipher.AES_GCM
+    assert Cipher([KEY]).decrypt(upgraded) == b"password"
+
+
+def test_is_current():
+    cipher = Cipher([KEY])
+    assert cipher.is_current(cipher.encrypt(b"password"))
+    assert not cipher.is_current(Fernet(KEY).encrypt(b"password").decode())
+    assert not Cipher([KEY], Cipher.CHACHA20_POLY1305).is_current(cipher.encrypt(b"password"))
+
+
+def test_tampered_or_unknown_token():
+    cipher = Cipher([KEY])
+    token = bytearray(cipher.encrypt(b"password"))
+    token[-1] ^= 1
+    with pytest.raises(InvalidToken):
+        cipher.decrypt(bytes(token))
+    with pytest.raises(InvalidToken):
+        cipher.decrypt(Cipher([OLD_KEY]).encrypt(b"password"))
+    with pytest.raises(InvalidToken):
+        cipher.decrypt(b"")
@@ -0,0 +1,62 @@
+from v13pwm.models.connection_manager import ConnectionManager
+import pytest
+import threading
+
+
+@pytest.fixture
+def manager(tmp_path):
+    connection_manager = ConnectionManager()
+    path = str(tmp_path / "test_connections.db")
+    with connection_manager.transaction(path) as con:
+        con.execute("CREATE TABLE items (name text)")
+    yield connection_manager, path
+    connection_manager.close_all()
+
+
+def test_connection_is_reused(manager):
+    connection_manager, path = manager
+    assert connection_manager.get(path) is connection_manager.get(path)
+
+
+def test_pragmas_applied(manager):
+    connection_manager, path = manager
+    con = connection_manager.get(path)
+    assert con.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert con.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+
+def test_connection_per_thread(manager):
+    connection_manager, path = manager
+    connections = []
+    thread = threading.Thread(target=lambda: connections.append(connection_manager.get(path)))
+    thread.start()
+    thread.join()
+    assert connections[0] is not connection_manager.get(path)
+
+
+def test_transaction_rollback(manager):
+    connection_manager, path = manager
+    with pytest.raises(ValueError):
+        with connection_manager.transaction(path) as con:
+            con.execute("INSERT INTO items VALUES ('rolled back')")
+            raise ValueError
+    assert connection_manager.get(path).execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+
+
+def test_nested_transaction_rollback(manager):
+    connection_manager, path = manager
+    with connection_manager.transaction(path) as con:
+        con.execute("INSERT INTO items VALUES ('kept')")
+        with pytest.raises(ValueError):
+            with connection_manager.transaction(path) as nested:
+                nested.execute("INSERT INTO items VALUES ('rolled back')")
+                raise ValueError
+    values = connection_manager.get(path).execute("SELECT name FROM items").fetchall()
+    assert values == [("kept",)]
+
+
+def test_close_all_reopens(manager):
+    connection_manager, path = manager
+    con = connection_manager.get(path)
+    connection_manager.close_all()
+    assert connection_manager.get(path) is not con
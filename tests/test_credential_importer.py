@@ -0,0 +1,97 @@
+from v13pwm.models.credential_importer import CredentialImporter
+from v13pwm.models.data_processor import DataProcessor
+from v13pwm.models.security_engine import SecurityEngine
+import pytest
+
+CHROME_CSV = """name,url,username,password
+github.com,https://github.com/login,User,github_password
+,https://www.example.com/,user,example_password
+empty.com,https://empty.com/,user,
+"""
+
+BITWARDEN_CSV = """folder,favorite,type,name,notes,fields,reprompt,login_uri,login_username,login_password,login_totp
+,,login,GitHub,,,0,https://github.com,user,bitwarden_password,
+,,note,Secret note,text,,0,,,,
+,,login,Mail,,,0,https://mail.com,user,mail_password,
+"""
+
+KEEPASS_XML = """<?xml version="1.0" encoding="utf-8"?>
+<KeePassFile><Root><Group><Name>Root</Name>
+<Entry>
+    <String><Key>Title</Key><Value>Bank</Value></String>
+    <String><Key>UserName</Key><Value>user</Value></String>
+    <String><Key>Password</Key><Value>bank_password</Value></String>
+    <History><Entry>
+        <String><Key>Title</Key><Value>Old Bank</Value></String>
+        <String><Key>Password</Key><Value>old_password</Value></String>
+    </Entry></History>
+</Entry>
+<Entry>
+    <String><Key>Title</Key><Value></Value></String>
+    <String><Key>URL</Key><Value>https://shop.com/account</Value></String>
+    <String><Key>UserName</Key><Value>user</Value></String>
+    <String><Key>Password</Key><Value>shop_password</Value></String>
+</Entry>
+</Group></Root></KeePassFile>
+"""
+
+
+@pytest.fixture
+def importer(tmp_path, monkeypatch):
+    monkeypatch.setattr(DataProcessor, "DB_PATH", str(tmp_path / "test_import.db"))
+    DataProcessor.create_database()
+    security_engine = SecurityEngine()
+    security_engine._client = "test"
+    security_engine.initialize_new_acc()
+    yield CredentialImporter(security_engine, workers=2)
+    security_engine.delete_secrets()
+    DataProcessor.close_connection()
+
+
+def test_import_browser_csv(importer, tmp_path):
+    path = tmp_path / "chrome.csv"
+    path.write_text(CHROME_CSV)
+    report = importer.import_file(str(path))
+    assert (report.read, report.imported, report.skipped, report.duplicates) == (3, 2, 1, 0)
+
+    username, password = DataProcessor.search_record("github.com")
+    assert username == "user"
+    assert importer.security_engine.decrypt(password) == "github_password"
+    assert DataProcessor.search_record("example.com") is not None
+
+
+def test_import_bitwarden_csv_duplicates(importer, tmp_path):
+    DataProcessor.insert_record("github", "user", importer.security_engine.encrypt("existing_password"))
+    path = tmp_path / "bitwarden.csv"
+    path.write_text(BITWARDEN_CSV)
+    report = importer.import_file(str(path))
+    assert (report.read, report.imported, report.duplicates, report.replaced) == (2, 1, 1, 0)
+    assert importer.security_engine.decrypt(DataProcessor.search_record("github")[1]) == "existing_password"
+
+    report = importer.import_file(str(path), replace=True)
+    assert (report.read, report.imported, report.duplicates, report.replaced) == (2, 0, 2, 2)
+    assert importer.security_engine.decrypt(DataProcessor.search_record("github")[1]) == "bitwarden_password"
+
+
+def test_import_keepass_xml(importer, tmp_path):
+    path = tmp_path / "keepass.xml"
+    path.write_text(KEEPASS_XML)
+    report = importer.import_file(str(path))
+    assert report.imported == 2
+    assert DataProcessor.search_record("old bank") is None
+    assert importer.security_engine.decrypt(DataProcessor.search_record("shop.com")[1]) == "shop_password"
+
+
+def test_import_progress_batches(importer):
+    importer.BATCH_SIZE = 10
+    reports = []
+    records = ((f"app_{number}", "user", "password") for number in range(25))
+    report = importer.import_records(records, progress=lambda progress: reports.append(progress.read))
+    assert reports == [10, 20, 25]
+    assert report.imported == 25
+    assert len(DataProcessor.get_all_apps()) == 25
+
+
+def test_unsupported_format(importer):
+    with pytest.raises(ValueError):
+        importer.import_file("vault.json")
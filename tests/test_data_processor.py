@@ -19,6 +19,7 @@ def custom_database():
     custom_db_path = "test_pwm.db"
     DataProcessor.DB_PATH = custom_db_path
     yield
+    DataProcessor.close_connection()
     if os.path.exists(custom_db_path):
         os.remove(custom_db_path)
 
@@ -59,8 +60,9 @@ def test_search_record_invalid(custom_database):
 def test_update_record(custom_database):
     DataProcessor.update_record(
         app=DEMO_RECORDS["app"],
-        username=DEMO_RECORDS["upd_username"],
-        password=DEMO_RECORDS["upd_password"]
+        username=DEMO_RECORDS["username"],
+        password=DEMO_RECORDS["upd_password"],
+        new_username=DEMO_RECORDS["upd_username"]
     )
     values = DataProcessor.search_record(DEMO_RECORDS["app"])
     assert values[0] == DEMO_RECORDS["upd_username"]
@@ -85,6 +87,113 @@ def test_get_all_apps(custom_database):
     assert values[2][0] == DEMO_RECORDS["app_3"]
 
 
+def test_search_record_case_insensitive(custom_database):
+    values = DataProcessor.search_record(f" {DEMO_RECORDS['app'].upper()} ")
+    assert values[0] == DEMO_RECORDS["upd_username"]
+
+
+def test_insert_record_duplicate(custom_database):
+    with pytest.raises(sqlite3.IntegrityError):
+        DataProcessor.insert_record(
+            app=DEMO_RECORDS["app"].upper(),
+            username=DEMO_RECORDS["upd_username"],
+            password=DEMO_RECORDS["password"]
+        )
+
+
+def test_upsert_record(custom_database):
+    DataProcessor.upsert_record(
+        app=DEMO_RECORDS["app_2"],
+        username=DEMO_RECORDS["username"],
+        password=DEMO_RECORDS["upd_password"]
+    )
+    values = DataProcessor.search_record(DEMO_RECORDS["app_2"])
+    assert values[0] == DEMO_RECORDS["username"]
+    assert values[1] == DEMO_RECORDS["upd_password"]
+    assert len(DataProcessor.get_all_apps()) == 3
+
+
+def test_multiple_accounts(custom_database):
+    DataProcessor.upsert_record(
+        app=DEMO_RECORDS["app_2"],
+        username=DEMO_RECORDS["upd_username"],
+        password=DEMO_RECORDS["password"]
+    )
+    assert DataProcessor.get_accounts(DEMO_RECORDS["app_2"]) == [DEMO_RECORDS["username"], DEMO_RECORDS["upd_username"]]
+    values = DataProcessor.search_record(DEMO_RECORDS["app_2"], DEMO_RECORDS["upd_username"])
+    assert values == (DEMO_RECORDS["upd_username"], DEMO_RECORDS["password"])
+    assert DataProcessor.search_record(DEMO_RECORDS["app_2"], "non-existent") is None
+    assert len(DataProcessor.get_all_apps()) == 3
+
+    DataProcessor.delete_record(DEMO_RECORDS["app_2"], DEMO_RECORDS["upd_username"])
+    assert DataProcessor.get_accounts(DEMO_RECORDS["app_2"]) == [DEMO_RECORDS["username"]]
+
+
+def test_delete_record(custom_database):
+    DataProcessor.insert_record(
+        app="deleted_app",
+        username=DEMO_RECORDS["username"],
+        password=DEMO_RECORDS["password"]
+    )
+    DataProcessor.delete_record("Deleted_App")
+    assert DataProcessor.search_record("deleted_app") is None
+    assert len(DataProcessor.get_all_apps()) == 3
+
+
+def test_touch_record(custom_database):
+    DataProcessor.touch_record(DEMO_RECORDS["app"], DEMO_RECORDS["upd_username"], timestamp=1000.0)
+    DataProcessor.touch_record(DEMO_RECORDS["app"], DEMO_RECORDS["upd_username"], timestamp=2000.0)
+    values = DataProcessor.get_frecent_records()
+    assert values == [(DEMO_RECORDS["app"], DEMO_RECORDS["upd_username"], 2, 2000.0)]
+
+
+def test_get_frecent_records(custom_database):
+    now = 1_700_000_000.0
+    month = 60 * 60 * 24 * 30
+    for _ in range(3):
+        DataProcessor.touch_record(DEMO_RECORDS["app_2"], DEMO_RECORDS["username"], timestamp=now - 2 * month)
+    DataProcessor.touch_record(DEMO_RECORDS["app_3"], DEMO_RECORDS["username"], timestamp=now)
+    DataProcessor.touch_record(DEMO_RECORDS["app"], DEMO_RECORDS["upd_username"], timestamp=now - 2 * month)
+    values = DataProcessor.get_frecent_records(limit=2)
+    assert [value[0] for value in values] == [DEMO_RECORDS["app_3"], DEMO_RECORDS["app_2"]]
+
+
+def test_bump_frecency():
+    first = DataProcessor.bump_frecency(None, 0)
+    assert DataProcessor.bump_frecency(first, 0) == pytest.approx(first + 1)
+    half_life = DataProcessor.FRECENCY_HALF_LIFE
+    assert DataProcessor.bump_frecency(None, half_life) == pytest.approx(DataProcessor.bump_frecency(first, 0))
+
+
+def test_create_database_migrates_legacy_table(custom_database, monkeypatch, tmp_path):
+    legacy_db_path = str(tmp_path / "legacy_pwm.db")
+    with sqlite3.connect(legacy_db_path) as con:
+        con.execute("CREATE TABLE password_manager (app text, username text, password text)")
+        con.executemany("INSERT INTO password_manager VALUES (?,?,?)", [
+            (DEMO_RECORDS["app"], DEMO_RECORDS["username"], DEMO_RECORDS["password"]),
+            (DEMO_RECORDS["app"], DEMO_RECORDS["upd_username"], DEMO_RECORDS["upd_password"]),
+        ])
+    con.close()
+    monkeypatch.setattr(DataProcessor, "DB_PATH", legacy_db_path)
+
+    DataProcessor.create_database()
+    assert DataProcessor.get_all_apps() == [(DEMO_RECORDS["app"],)]
+    assert DataProcessor.search_record(DEMO_RECORDS["app"])[0] == DEMO_RECORDS["username"]
+    assert DataProcessor.get_accounts(DEMO_RECORDS["app"]) == [DEMO_RECORDS["username"], DEMO_RECORDS["upd_username"]]
+
+
+def test_replace_password(custom_database):
+    DataProcessor.upsert_record(DEMO_RECORDS["app_3"], DEMO_RECORDS["username"], DEMO_RECORDS["password"])
+    assert DataProcessor.replace_password(
+        DEMO_RECORDS["app_3"], DEMO_RECORDS["username"], DEMO_RECORDS["password"], b"binary_password"
+    ) is True
+    assert DataProcessor.search_record(DEMO_RECORDS["app_3"]) == (DEMO_RECORDS["username"], b"binary_password")
+    assert DataProcessor.replace_password(
+        DEMO_RECORDS["app_3"], DEMO_RECORDS["username"], DEMO_RECORDS["password"], b"other_password"
+    ) is False
+    assert DataProcessor.search_record(DEMO_RECORDS["app_3"])[1] == b"binary_password"
+
+
 def test_delete_table(custom_database):
     DataProcessor.delete_table()
     with sqlite3.connect(DataProcessor.DB_PATH) as con:
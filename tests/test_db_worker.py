@@ -0,0 +1,75 @@
+from v13pwm.models.data_processor import DataProcessor
+from v13pwm.models.db_worker import DatabaseWorker
+import sqlite3
+import threading
+import pytest
+
+
+@pytest.fixture
+def worker(tmp_path, monkeypatch):
+    monkeypatch.setattr(DataProcessor, "DB_PATH", str(tmp_path / "test_worker.db"))
+    DataProcessor.create_database()
+    DataProcessor.close_connection()
+    worker = DatabaseWorker(DataProcessor)
+    yield worker
+    worker.submit(DataProcessor.close_connection)
+    worker.stop()
+    worker.start()
+    worker.join(5)
+
+
+def run(worker: DatabaseWorker) -> int:
+    worker.stop()
+    worker.start()
+    worker.join(5)
+    return worker.poll()
+
+
+def test_jobs_run_on_worker_thread(worker):
+    threads = []
+    worker.submit(lambda: threads.append(threading.get_ident()))
+    run(worker)
+    assert threads and threads[0] != threading.get_ident()
+
+
+def test_callbacks_run_in_order(worker):
+    results = []
+    worker.write(DataProcessor.insert_record, "app", "user", "password", callback=lambda _: results.append("saved"))
+    worker.submit(DataProcessor.search_record, "app", callback=results.append)
+    assert run(worker) == 2
+    assert results == ["saved", ("user", "password")]
+
+
+def test_writes_are_group_committed(worker):
+    statements = []
+    worker.submit(lambda: DataProcessor.connect().set_trace_callback(statements.append))
+    for i in range(50):
+        worker.write(DataProcessor.insert_record, f"app_{i}", "user", "password")
+    worker.submit(lambda: DataProcessor.connect().set_trace_callback(None))
+    run(worker)
+    assert statements.count("BEGIN IMMEDIATE") == 1
+    assert statements.count("COMMIT") == 1
+    assert len(DataProcessor.get_all_apps()) == 50
+
+
+def test_failed_write_does_not_undo_others(worker):
+    errors = []
+    worker.write(DataProcessor.insert_record, "app", "user", "password")
+    worker.write(DataProcessor.insert_record, "app", "user", "password", error=errors.append)
+    worker.write(DataProcessor.insert_record, "app_2", "user", "password")
+    run(worker)
+    assert len(errors) == 1 and isinstance(errors[0], sqlite3.IntegrityError)
+    assert DataProcessor.get_all_apps() == [("app",), ("app_2",)]
+
+
+def test_unhandled_error_is_raised_from_poll(worker):
+    results = []
+    worker.submit(DataProcessor.search_record, None)
+    worker.submit(DataProcessor.get_accounts, "app", callback=results.append)
+    worker.stop()
+    worker.start()
+    worker.join(5)
+    with pytest.raises(AttributeError):
+        worker.poll()
+    assert worker.poll() == 1
+    assert results == [[]]
@@ -0,0 +1,97 @@
+from v13pwm.models.key_rotation import KeyRotator
+from v13pwm.models.data_processor import DataProcessor
+from v13pwm.models.security_engine import SecurityEngine
+from v13pwm.models.cipher import Cipher
+from cryptography.fernet import Fernet, InvalidToken
+import pytest
+
+
+def assert_rotated(security_engine: SecurityEngine, old_key: str):
+    assert security_engine.key != old_key
+    assert security_engine.previous_keys == []
+    assert not KeyRotator.in_progress()
+    cipher = Cipher([security_engine.key])
+    for id_, password in DataProcessor.get_passwords(0, 100):
+        assert cipher.decrypt(password).decode() == f"password_{id_ - 1}"
+        with pytest.raises(InvalidToken):
+            Cipher([old_key]).decrypt(password)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_rotate(security_engine, workers):
+    old_key = security_engine.key
+    security_engine.PARALLEL_THRESHOLD = 4
+    security_engine.CHUNK_SIZE = 3
+    rotator = KeyRotator(security_engine, workers=workers)
+    rotator.BATCH_SIZE = 10
+    progress = []
+    assert rotator.rotate(progress=lambda *args: progress.append(args)) == 25
+    assert progress == [(10, 25), (20, 25), (25, 25)]
+    assert_rotated(security_engine, old_key)
+
+
+def test_interrupted_rotation_resumes(security_engine, monkeypatch):
+    old_key = security_engine.key
+    rotator = KeyRotator(security_engine, workers=1)
+    rotator.BATCH_SIZE = 10
+
+    def interrupt(rotated, total):
+        if rotated >= 20:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        rotator.rotate(progress=interrupt)
+    assert DataProcessor.get_rotation_checkpoint() == 20
+    assert security_engine.previous_keys == [old_key]
+    assert security_engine.decrypt(DataProcessor.search_record("app_0")[1]) == "password_0"
+    assert security_engine.decrypt(DataProcessor.search_record("app_24")[1]) == "password_24"
+
+    security_engine.wipe_secrets()
+    security_engine.load_acc()
+    assert KeyRotator(security_engine, workers=1).resume() == 5
+    assert_rotated(security_engine, old_key)
+    assert KeyRotator(security_engine, workers=1).resume() == 0
+
+
+def test_stopped_rotation_resumes(security_engine):
+    old_key = security_engine.key
+    rotator = KeyRotator(security_engine, workers=1)
+    rotator.BATCH_SIZE = 10
+
+    def log_out(rotated, total):
+        if rotated >= 10:
+            security_engine.wipe_secrets()
+
+    assert rotator.rotate(progress=log_out) == 10
+    assert rotator.stopped
+    assert DataProcessor.get_rotation_checkpoint() == 10
+    security_engine.load_acc()
+    assert security_engine.previous_keys == [old_key]
+
+    rotator = KeyRotator(security_engine, workers=1)
+    rotator.stop()
+    assert rotator.resume() == 0
+    assert KeyRotator.in_progress()
+    assert KeyRotator(security_engine, workers=1).resume() == 15
+    assert_rotated(security_engine, old_key)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_upgrade_legacy_passwords(security_engine, workers):
+    fernet = Fernet(security_engine.key)
+    DataProcessor.insert_records(
+        [(f"legacy_{number}", "user", fernet.encrypt(f"legacy_{number}".encode()).decode()) for number in range(15)]
+    )
+    security_engine.PARALLEL_THRESHOLD = 4
+    security_engine.CHUNK_SIZE = 3
+    rotator = KeyRotator(security_engine, workers=workers)
+    rotator.BATCH_SIZE = 10
+    progress = []
+    assert rotator.upgrade(progress=lambda *args: progress.append(args)) == 15
+    assert progress == [(10, 15), (15, 15)]
+    assert DataProcessor.count_legacy_passwords() == 0
+    for app in ("legacy_0", "legacy_14", "app_3"):
+        password = DataProcessor.search_record(app)[1]
+        assert not security_engine.needs_upgrade(password)
+    assert security_engine.decrypt(DataProcessor.search_record("legacy_14")[1]) == "legacy_14"
+    assert rotator.upgrade() == 0
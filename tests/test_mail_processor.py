@@ -1,7 +1,51 @@
+from v13pwm.models import mail_processor
 from v13pwm.models.mail_processor import MailProcessor
+from email_validator import EmailUndeliverableError
+from types import SimpleNamespace
+import dns.resolver
+import threading
+import time
+import pytest
 
 
-def test_valid_emails():
+@pytest.fixture(autouse=True)
+def domain_cache():
+    MailProcessor.clear_domain_cache()
+    yield
+    MailProcessor.clear_domain_cache()
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    lookups = []
+
+    def lookup(domain, domain_i18n, dns_resolver=None):
+        lookups.append(domain)
+        if domain == "missing.example":
+            raise EmailUndeliverableError(f"The domain name {domain_i18n} does not exist.")
+        if domain == "offline.example":
+            return {"unknown-deliverability": "timeout"}
+        return {"mx": [(10, f"mx.{domain}")], "mx_fallback_type": None}
+
+    monkeypatch.setattr(mail_processor, "validate_email_deliverability", lookup)
+    return lookups
+
+
+@pytest.fixture
+def resolver(monkeypatch):
+    mail_domains = {"gmail.com", "yahoo.com", "outlook.com"}
+
+    def resolve(self, domain, record_type):
+        if domain not in mail_domains:
+            raise dns.resolver.NXDOMAIN
+        if record_type != "MX":
+            raise dns.resolver.NoAnswer
+        return [SimpleNamespace(preference=10, exchange=f"mx.{domain}.")]
+
+    monkeypatch.setattr(dns.resolver.Resolver, "resolve", resolve)
+
+
+def test_valid_emails(resolver):
     emails = [
         " test@gmail.com ",
         "test@gmail.com",
@@ -16,7 +60,7 @@ def test_valid_emails():
         assert MailProcessor.validate(email) is None
 
 
-def test_invalid_emails():
+def test_invalid_emails(resolver):
     emails = [
         "",
         " ",
@@ -35,3 +79,41 @@ def test_invalid_emails():
 
     for email in emails:
         assert MailProcessor.validate(email) is not None
+
+
+def test_domain_result_is_cached(lookups):
+    assert MailProcessor.validate("first@mail.example") is None
+    assert MailProcessor.validate("second@mail.example") is None
+    assert MailProcessor.validate("first@missing.example") == "The domain name missing.example does not exist."
+    assert MailProcessor.validate("second@missing.example") == "The domain name missing.example does not exist."
+    assert lookups == ["mail.example", "missing.example"]
+
+
+def test_unknown_result_is_not_cached(lookups):
+    assert MailProcessor.validate("user@offline.example") is None
+    assert MailProcessor.validate("user@offline.example") is None
+    assert lookups == ["offline.example", "offline.example"]
+
+
+def test_expired_result_is_looked_up_again(lookups, monkeypatch):
+    monkeypatch.setattr(MailProcessor, "DOMAIN_TTL", 0.01)
+    MailProcessor.validate("user@mail.example")
+    time.sleep(0.02)
+    MailProcessor.validate("user@mail.example")
+    assert lookups == ["mail.example", "mail.example"]
+
+
+def test_slow_lookup_falls_back_to_syntax_check(monkeypatch):
+    release = threading.Event()
+
+    def lookup(domain, domain_i18n, dns_resolver=None):
+        release.wait(5)
+        raise EmailUndeliverableError(f"The domain name {domain_i18n} does not exist.")
+
+    monkeypatch.setattr(mail_processor, "validate_email_deliverability", lookup)
+    started = time.monotonic()
+    assert MailProcessor.validate("user@slow.example", timeout=0.05) is None
+    assert MailProcessor.validate("user@slow", timeout=0.05) is not None
+    assert time.monotonic() - started < 1
+    release.set()
+    assert MailProcessor.validate("user@slow.example") == "The domain name slow.example does not exist."
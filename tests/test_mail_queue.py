@@ -0,0 +1,137 @@
+from v13pwm.models.mail_queue import MailQueue
+from v13pwm.models.mail_transport import MemoryTransport, SmtpTransport
+from benchmarks.smtp_server import StandInSMTPServer
+import time
+import pytest
+
+
+@pytest.fixture
+def server():
+    server = StandInSMTPServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def mail_queue(server, monkeypatch):
+    monkeypatch.setattr(MailQueue, "BACKOFF", 0.01)
+    mail_queue = MailQueue(lambda: SmtpTransport("127.0.0.1", server.port, server.user, server.password, False))
+    mail_queue.start()
+    yield mail_queue
+    mail_queue.stop()
+    mail_queue.join(5)
+
+
+def wait_for(mail_queue: MailQueue, statuses: list, count: int, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while len([status for status, _ in statuses if status != MailQueue.RETRYING]) < count:
+        assert time.monotonic() < deadline, statuses
+        mail_queue.poll()
+        time.sleep(0.005)
+
+
+def callback(statuses: list):
+    return lambda status, error: statuses.append((status, error))
+
+
+def test_messages_share_connection(server, mail_queue):
+    statuses = []
+    for number in range(5):
+        assert mail_queue.send(f"user{number}@example.com", "Token", f"Token {number}", callback(statuses))
+    wait_for(mail_queue, statuses, 5)
+    assert statuses == [(MailQueue.SENT, None)] * 5
+    assert server.connections == 1
+    assert server.logins == 1
+    assert len(server.messages) == 5
+    assert "Subject: Token" in server.messages[0] and "Token 0" in server.messages[0]
+
+
+def test_temporary_failure_is_retried(server, mail_queue):
+    server.failures = [451, 451]
+    statuses = []
+    mail_queue.send("user@example.com", "Token", "Token", callback(statuses))
+    wait_for(mail_queue, statuses, 1)
+    assert [status for status, _ in statuses] == [MailQueue.RETRYING, MailQueue.RETRYING, MailQueue.SENT]
+    assert len(server.messages) == 1
+
+
+def test_permanent_failure_is_not_retried(server, mail_queue):
+    server.failures = [550]
+    statuses = []
+    mail_queue.send("user@example.com", "Token", "Token", callback(statuses))
+    wait_for(mail_queue, statuses, 1)
+    assert statuses[0][0] == MailQueue.FAILED
+    assert "550" in statuses[0][1]
+    assert not server.messages
+
+
+def test_retries_are_limited(server, mail_queue):
+    server.failures = [451] * MailQueue.MAX_ATTEMPTS
+    statuses = []
+    mail_queue.send("user@example.com", "Token", "Token", callback(statuses))
+    wait_for(mail_queue, statuses, 1)
+    assert [status for status, _ in statuses] == [MailQueue.RETRYING] * (MailQueue.MAX_ATTEMPTS - 1) + [
+        MailQueue.FAILED
+    ]
+
+
+def test_dropped_connection_is_reopened(server, mail_queue):
+    statuses = []
+    mail_queue.send("user@example.com", "Token", "First", callback(statuses))
+    wait_for(mail_queue, statuses, 1)
+    server.drop_connections()
+    mail_queue.send("user@example.com", "Token", "Second", callback(statuses))
+    wait_for(mail_queue, statuses, 2)
+    assert statuses == [(MailQueue.SENT, None)] * 2
+    assert server.connections == 2
+
+
+def test_invalid_login_fails(server, mail_queue):
+    mail_queue.transport_factory = lambda: SmtpTransport("127.0.0.1", server.port, server.user, "wrong", False)
+    statuses = []
+    mail_queue.send("user@example.com", "Token", "Token", callback(statuses))
+    wait_for(mail_queue, statuses, 1)
+    assert statuses == [(MailQueue.FAILED, "SMTP authentication error: Invalid username or password.")]
+
+
+def test_full_queue_rejects_message():
+    mail_queue = MailQueue(MemoryTransport, max_size=2)
+    assert mail_queue.send("user@example.com", "Token", "1")
+    assert mail_queue.send("user@example.com", "Token", "2")
+    assert not mail_queue.send("user@example.com", "Token", "3")
+
+
+def test_transport_is_created_on_first_message():
+    created = []
+
+    def factory():
+        created.append(MemoryTransport("sender@example.com"))
+        return created[-1]
+
+    mail_queue = MailQueue(factory)
+    mail_queue.start()
+    assert not created
+    statuses = []
+    mail_queue.send("user@example.com", "Token", "1", callback(statuses))
+    mail_queue.send("user@example.com", "Token", "2", callback(statuses))
+    wait_for(mail_queue, statuses, 2)
+    mail_queue.stop()
+    mail_queue.join(5)
+    assert len(created) == 1
+    assert [message["From"] for message in created[0].messages] == ["sender@example.com"] * 2
+
+
+def test_configuration_error_fails_message():
+    def factory():
+        raise ValueError("set EMAIL and PASSWORD environment variables to send e-mails.")
+
+    mail_queue = MailQueue(factory)
+    mail_queue.start()
+    statuses = []
+    mail_queue.send("user@example.com", "Token", "Token", callback(statuses))
+    wait_for(mail_queue, statuses, 1)
+    mail_queue.stop()
+    mail_queue.join(5)
+    assert statuses == [(MailQueue.FAILED, "Mail configuration error: set EMAIL and PASSWORD environment variables "
+                                           "to send e-mails.")]
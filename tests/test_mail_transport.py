@@ -0,0 +1,73 @@
+from v13pwm.models.mail_processor import MailProcessor
+from v13pwm.models.mail_transport import FileTransport, MailTransport, MemoryTransport, SmtpTransport
+from benchmarks.smtp_server import StandInSMTPServer
+from email.message import EmailMessage
+import mailbox
+import pytest
+
+
+def message(body: str) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = "sender@example.com"
+    message["To"] = "user@example.com"
+    message["Subject"] = "Token"
+    message.set_content(body)
+    return message
+
+
+@pytest.mark.parametrize("existing", [False, True])
+def test_file_transport_writes_maildir(tmp_path, existing):
+    directory = tmp_path / "mail"
+    if existing:
+        directory.mkdir()
+    transport = FileTransport(str(directory))
+    transport.send(message("First"))
+    transport.send(message("Second"))
+    transport.close()
+    bodies = sorted(stored.get_payload().strip() for stored in mailbox.Maildir(str(directory)))
+    assert bodies == ["First", "Second"]
+
+
+def test_transport_must_implement_send():
+    with pytest.raises(TypeError):
+        MailTransport()
+
+
+def test_memory_transport_keeps_messages():
+    transport = MemoryTransport()
+    transport.send(message("Token"))
+    assert [sent["Subject"] for sent in transport.messages] == ["Token"]
+
+
+def test_smtp_transport_reuses_connection():
+    server = StandInSMTPServer()
+    server.start()
+    try:
+        transport = SmtpTransport("127.0.0.1", server.port, server.user, server.password, starttls=False)
+        for number in range(3):
+            transport.send(message(str(number)))
+        server.drop_connections()
+        transport.send(message("After drop"))
+        transport.close()
+    finally:
+        server.stop()
+    assert len(server.messages) == 4
+    assert server.connections == 2
+
+
+def test_create_transport_from_configuration(tmp_path):
+    smtp = MailProcessor.create_transport({"EMAIL": "sender@example.com", "PASSWORD": "secret", "SMTP_PORT": "2525"})
+    assert isinstance(smtp, SmtpTransport)
+    assert (smtp.host, smtp.port, smtp.sender) == (MailProcessor.SMTP_SERVER, 2525, "sender@example.com")
+
+    file = MailProcessor.create_transport({"MAIL_TRANSPORT": "file", "MAIL_DIR": str(tmp_path)})
+    assert isinstance(file, FileTransport) and file.directory == str(tmp_path)
+
+    assert isinstance(MailProcessor.create_transport({"MAIL_TRANSPORT": "memory"}), MemoryTransport)
+
+
+def test_create_transport_rejects_missing_configuration():
+    with pytest.raises(ValueError):
+        MailProcessor.create_transport({})
+    with pytest.raises(ValueError):
+        MailProcessor.create_transport({"MAIL_TRANSPORT": "pigeon"})
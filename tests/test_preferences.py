@@ -0,0 +1,93 @@
+import json
+import os
+import pytest
+from unittest import mock
+from v13pwm.models.preferences import Preferences
+
+
+@pytest.fixture
+def preferences(tmp_path):
+    return Preferences(str(tmp_path / "data.json"), flush_delay=60)
+
+
+def test_load_missing_file(preferences):
+    assert preferences.load() == {}
+    assert preferences.get("theme", "cyborg") == "cyborg"
+
+
+def test_load_corrupted_file(preferences):
+    with open(preferences.path, "w") as data_file:
+        data_file.write("{\"theme\": ")
+    assert preferences.load() == {}
+
+
+def test_updates_are_coalesced(preferences):
+    with mock.patch.object(preferences, "_write", wraps=preferences._write) as write:
+        for length in range(4, 100):
+            preferences.update({"pw_length": length})
+        preferences.update({"theme": "flatly"})
+        assert not os.path.exists(preferences.path)
+        preferences.flush()
+        preferences.flush()
+    assert write.call_count == 1
+    with open(preferences.path) as data_file:
+        assert json.load(data_file) == {"pw_length": 99, "theme": "flatly"}
+
+
+def test_unchanged_value_is_not_written(preferences):
+    preferences.update({"theme": "flatly"})
+    preferences.flush()
+    with mock.patch.object(preferences, "_write") as write:
+        preferences.update({"theme": "flatly"})
+        preferences.flush()
+    write.assert_not_called()
+
+
+def test_flush_after_delay(tmp_path):
+    preferences = Preferences(str(tmp_path / "data.json"), flush_delay=0.01)
+    preferences.update({"theme": "flatly"})
+    timer = preferences._timer
+    while timer is not None:
+        timer.join()
+        timer = preferences._timer
+    with open(preferences.path) as data_file:
+        assert json.load(data_file) == {"theme": "flatly"}
+
+
+def test_burst_keeps_single_timer(tmp_path):
+    preferences = Preferences(str(tmp_path / "data.json"), flush_delay=0.2)
+    preferences.update({"pw_length": 4})
+    timer = preferences._timer
+    deadline = preferences._deadline
+    for length in range(5, 100):
+        preferences.update({"pw_length": length})
+    assert preferences._timer is timer
+    assert preferences._deadline > deadline
+    while timer is not None:
+        timer.join()
+        timer = preferences._timer
+    with open(preferences.path) as data_file:
+        assert json.load(data_file) == {"pw_length": 99}
+
+
+def test_failed_write_keeps_old_file(preferences):
+    preferences.update({"theme": "flatly"})
+    preferences.flush()
+    preferences.update({"theme": object()})
+    with pytest.raises(TypeError):
+        preferences.flush()
+    with open(preferences.path) as data_file:
+        assert json.load(data_file) == {"theme": "flatly"}
+    assert os.listdir(os.path.dirname(preferences.path)) == ["data.json"]
+    preferences.delete()
+
+
+def test_delete(preferences):
+    preferences.update({"theme": "flatly"})
+    preferences.flush()
+    preferences.update({"pw_length": 30})
+    preferences.delete()
+    assert not os.path.exists(preferences.path)
+    assert preferences.load() == {}
+    preferences.flush()
+    assert not os.path.exists(preferences.path)
@@ -0,0 +1,94 @@
+from v13pwm.models.schema_migrator import SchemaMigrator
+from v13pwm.models.data_processor import DataProcessor
+import pytest
+import sqlite3
+
+
+@pytest.fixture
+def legacy_database(tmp_path, monkeypatch):
+    path = str(tmp_path / "legacy_pwm.db")
+    with sqlite3.connect(path) as con:
+        con.execute("CREATE TABLE password_manager (app text, username text, password text)")
+        con.executemany(
+            "INSERT INTO password_manager VALUES (?,?,?)",
+            [(f"App_{number}", "user", f"password_{number}") for number in range(25)] +
+            [("app_0", "user", "shadowed"), ("app_0", "second_user", "password")]
+        )
+    con.close()
+    monkeypatch.setattr(DataProcessor, "DB_PATH", path)
+    yield path
+    DataProcessor.close_connection()
+
+
+def test_new_database_created_with_latest_schema(tmp_path, monkeypatch):
+    monkeypatch.setattr(DataProcessor, "DB_PATH", str(tmp_path / "new_pwm.db"))
+    migrator = SchemaMigrator(DataProcessor)
+    assert migrator.migrate() == 0
+    assert migrator.version() == migrator.latest_version
+    assert "created_at" in migrator._columns()
+    DataProcessor.close_connection()
+
+
+def test_migrate_legacy_database(legacy_database):
+    migrator = SchemaMigrator(DataProcessor)
+    assert migrator.version() == 0
+    assert migrator.migrate() == migrator.latest_version
+    assert migrator.version() == migrator.latest_version
+    assert migrator.migrate() == 0
+
+    assert len(DataProcessor.get_all_apps()) == 25
+    assert DataProcessor.search_record("app_0") == ("user", "password_0")
+    assert DataProcessor.get_accounts("app_0") == ["user", "user (2)", "second_user"]
+    assert DataProcessor.search_record("app_0", "user (2)") == ("user (2)", "shadowed")
+    assert DataProcessor.connect().execute("SELECT COUNT(*) FROM password_manager").fetchone()[0] == 27
+    assert not migrator._table_exists("password_manager_duplicates")
+
+
+def test_migrate_reports_progress(legacy_database):
+    migrator = SchemaMigrator(DataProcessor, progress=lambda *args: reports.append(args))
+    migrator.BATCH_SIZE = 10
+    reports = []
+    migrator.migrate()
+    assert reports[:3] == [(2, "Add normalized app key", 10), (2, "Add normalized app key", 20),
+                           (2, "Add normalized app key", 27)]
+    assert reports[3] == (2, "Set aside duplicate accounts", 2)
+    assert (4, "Add ids and timestamps", 25) in reports
+    assert reports[-1] == (5, "Restored duplicate accounts", 2)
+
+
+def test_interrupted_migration_resumes(legacy_database):
+    def interrupt(version, description, processed):
+        if version == 4 and processed >= 10:
+            raise KeyboardInterrupt
+
+    migrator = SchemaMigrator(DataProcessor, progress=interrupt)
+    migrator.BATCH_SIZE = 10
+    with pytest.raises(KeyboardInterrupt):
+        migrator.migrate()
+    assert migrator.version() == 3
+    assert DataProcessor.connect().execute("SELECT COUNT(*) FROM password_manager_new").fetchone()[0] == 10
+
+    migrator.progress = None
+    assert migrator.migrate() == migrator.latest_version - 3
+    assert migrator.version() == migrator.latest_version
+    assert len(DataProcessor.get_all_apps()) == 25
+
+
+def test_blank_usernames_do_not_block_unique_index(legacy_database):
+    migrator = SchemaMigrator(DataProcessor, progress=lambda *args: reports.append(args))
+    reports = []
+    migrations = migrator.migrations
+    migrator.migrations = migrations[:4]
+    migrator.migrate()
+    with DataProcessor.transaction() as con:
+        con.executemany(
+            "INSERT INTO password_manager (app, username, password, app_key) VALUES (?,?,?,'blank')",
+            [("Blank", None, "no_username"), ("blank", "", "empty_username"), ("BLANK", None, "second_no_username")]
+        )
+    migrator.migrations = migrations
+    assert migrator.migrate() == migrator.latest_version - 4
+    assert migrator.version() == migrator.latest_version
+    assert DataProcessor.get_accounts("blank") == ["", "(2)", "(3)"]
+    assert DataProcessor.search_record("blank", "") == ("", "no_username")
+    assert DataProcessor.search_record("blank", "(2)") == ("(2)", "empty_username")
+    assert (5, "Renamed duplicate accounts", 2) in reports
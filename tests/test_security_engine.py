@@ -1,4 +1,10 @@
 from v13pwm.models.security_engine import SecurityEngine
+from keyring.errors import PasswordDeleteError
+from unittest import mock
+from itertools import count, islice
+import keyring
+import json
+import pytest
 
 
 class TestSecurityEngine:
@@ -6,6 +12,8 @@ class TestSecurityEngine:
     def setup_method(self, method):
         self.security_engine = SecurityEngine()
         self.security_engine._client = "test"
+        self.security_engine.MIN_BCRYPT_COST = 4
+        self.security_engine.TARGET_HASH_TIME = 0.005
         self.security_engine.initialize_new_acc()
 
     def teardown_method(self, method):
@@ -22,6 +30,24 @@ class TestSecurityEngine:
             decrypted_password = self.security_engine.decrypt(encrypted_password)
             assert decrypted_password == password
 
+    def test_encrypt_decrypt_many(self):
+        passwords = [f"password_{number}".encode() for number in range(50)]
+        for threshold in (100, 10):
+            self.security_engine.PARALLEL_THRESHOLD = threshold
+            self.security_engine.CHUNK_SIZE = 4
+            encrypted = list(self.security_engine.encrypt_many(passwords, workers=3))
+            assert len(encrypted) == 50 and all(isinstance(token, bytes) for token in encrypted)
+            assert list(self.security_engine.decrypt_many(encrypted, workers=3)) == passwords
+            reencrypted = list(self.security_engine.reencrypt_many(encrypted, workers=3))
+            assert [self.security_engine.decrypt(token) for token in reencrypted] == [p.decode() for p in passwords]
+
+    def test_encrypt_many_streams(self):
+        self.security_engine.PARALLEL_THRESHOLD = 10
+        self.security_engine.CHUNK_SIZE = 5
+        passwords = (str(number).encode() for number in count())
+        encrypted = list(islice(self.security_engine.encrypt_many(passwords, workers=2), 30))
+        assert [self.security_engine.decrypt(token) for token in encrypted] == [str(number) for number in range(30)]
+
     def test_pw_hashing(self):
         passwords = ["test", "Test123", "#!@Test123"]
         for password in passwords:
@@ -36,6 +62,65 @@ class TestSecurityEngine:
         for password in invalid_password:
             assert self.security_engine.check_password(password) is False
 
+    def test_calibrate_cost(self):
+        cost = self.security_engine.calibrate_cost()
+        assert 4 <= cost <= self.security_engine.MAX_BCRYPT_COST
+        assert self.security_engine.bcrypt_cost(self.security_engine.salt) == cost
+
+        slow_engine = SecurityEngine()
+        slow_engine._secrets = {}
+        slow_engine.TARGET_HASH_TIME = 10 ** 6
+        assert slow_engine.calibrate_cost() == slow_engine.MAX_BCRYPT_COST
+        fast_engine = SecurityEngine()
+        fast_engine._secrets = {}
+        fast_engine.TARGET_HASH_TIME = 10 ** -9
+        assert fast_engine.calibrate_cost() == fast_engine.MIN_BCRYPT_COST
+
+    def test_rehash_on_outdated_cost(self):
+        self.security_engine._bcrypt_cost = 4
+        self.security_engine.password = "test"
+        old_hash = self.security_engine.password
+        with mock.patch.object(self.security_engine, "measure_cost", return_value=5):
+            assert self.security_engine.check_password("wrong") is False
+            assert self.security_engine.password == old_hash
+            assert self.security_engine.check_password("test") is True
+            assert self.security_engine.bcrypt_cost(self.security_engine.password) == 5
+            assert self.security_engine.bcrypt_cost(self.security_engine.salt) == 5
+            assert self.security_engine.get_secret("bcrypt_cost") == "5"
+            rehashed = self.security_engine.password
+            self.security_engine.wipe_secrets()
+            assert self.security_engine.check_password("test") is True
+            assert self.security_engine.password == rehashed
+
+    def test_no_rehash_on_lower_cost(self):
+        self.security_engine._bcrypt_cost = 5
+        self.security_engine.password = "test"
+        old_hash = self.security_engine.password
+        with mock.patch.object(self.security_engine, "measure_cost", return_value=4):
+            assert self.security_engine.check_password("test") is True
+        assert self.security_engine.password == old_hash
+
+    def test_faster_machine_raises_saved_cost(self):
+        self.security_engine.password = "test"
+        cost = self.security_engine.bcrypt_cost(self.security_engine.password)
+        security_engine = SecurityEngine()
+        security_engine._client = "test"
+        assert security_engine.calibrate_cost() == cost
+        with mock.patch.object(security_engine, "measure_cost", return_value=cost + 1):
+            assert security_engine.check_password("test") is True
+        assert security_engine.bcrypt_cost(security_engine.password) == cost + 1
+        assert security_engine.calibrate_cost() == cost + 1
+
+    def test_calibrated_cost_is_saved(self):
+        cost = self.security_engine.calibrate_cost()
+        assert self.security_engine.get_secret("bcrypt_cost") == str(cost)
+        security_engine = SecurityEngine()
+        security_engine._client = "test"
+        security_engine.TARGET_HASH_TIME = 10 ** 6
+        with mock.patch("bcrypt.hashpw") as hashpw:
+            assert security_engine.calibrate_cost() == cost
+        hashpw.assert_not_called()
+
     def test_validate_password(self):
         valid_passwords = ["Password123!", "Test123!", "1TEST!test", "!1testTest"]
         for password in valid_passwords:
@@ -44,3 +129,94 @@ class TestSecurityEngine:
         invalid_passwords = ["", "test", "password", "Password", "Password!", "Password1", "password1!", "!1PASSWORD"]
         for password in invalid_passwords:
             assert self.security_engine.validate_password(password) is False
+
+    def test_secrets_are_cached(self):
+        self.security_engine.user_email = "user@test.com"
+        self.security_engine.load_acc()
+        with mock.patch("keyring.get_password") as get_password:
+            assert self.security_engine.user_email == "user@test.com"
+            assert self.security_engine.key is not None
+            self.security_engine.password = "test"
+            assert self.security_engine.check_password("test") is True
+        get_password.assert_not_called()
+        bundle = json.loads(keyring.get_password("test", SecurityEngine.BUNDLE))
+        assert bundle["version"] == SecurityEngine.BUNDLE_VERSION
+        assert bundle["secrets"]["user_email"] == "user@test.com"
+
+    def test_load_and_wipe_cost_single_call(self):
+        self.security_engine.wipe_secrets()
+        with mock.patch("keyring.get_password", wraps=keyring.get_password) as get_password:
+            self.security_engine.load_acc()
+            assert self.security_engine.key is not None
+            assert self.security_engine.otp_key is not None
+        get_password.assert_called_once_with("test", SecurityEngine.BUNDLE)
+        with mock.patch("keyring.delete_password", wraps=keyring.delete_password) as delete_password:
+            self.security_engine.delete_secrets()
+        delete_password.assert_called_once_with("test", SecurityEngine.BUNDLE)
+        assert self.security_engine.key is None
+        assert keyring.get_password("test", SecurityEngine.BUNDLE) is None
+
+    def test_wipe_drops_cipher_and_totp(self):
+        self.security_engine.password = "test"
+        encrypted = self.security_engine.encrypt("secret")
+        self.security_engine.wipe_secrets()
+        assert self.security_engine.crypt_engine is None
+        assert self.security_engine.totp is None
+        assert self.security_engine.check_password("wrong") is False
+        assert self.security_engine.crypt_engine is None
+        assert self.security_engine.check_password("test") is True
+        assert self.security_engine.decrypt(encrypted) == "secret"
+        assert self.security_engine.verify_otp(self.security_engine.totp.now()) is True
+        self.security_engine.wipe_secrets()
+        self.security_engine.load_acc()
+        assert self.security_engine.decrypt(encrypted) == "secret"
+        assert self.security_engine.totp is not None
+
+    def test_initialize_new_acc_single_write(self):
+        self.security_engine.delete_secrets()
+        with mock.patch("keyring.set_password", wraps=keyring.set_password) as set_password:
+            self.security_engine.initialize_new_acc()
+        assert set_password.call_count == 1
+
+    def test_migrate_legacy_secrets(self):
+        self.security_engine.delete_secrets()
+        for name in ("key", "salt", "user_email"):
+            keyring.set_password("test", name, f"legacy_{name}")
+        security_engine = SecurityEngine()
+        security_engine._client = "test"
+        assert security_engine.key == "legacy_key"
+        assert security_engine.user_email == "legacy_user_email"
+        assert security_engine.password is None
+        assert keyring.get_password("test", "key") is None
+        bundle = json.loads(keyring.get_password("test", SecurityEngine.BUNDLE))
+        assert bundle["secrets"] == {"key": "legacy_key", "salt": "legacy_salt", "user_email": "legacy_user_email"}
+
+    def test_delete_secret(self):
+        self.security_engine.user_email = "user@test.com"
+        del self.security_engine.user_email
+        assert self.security_engine.user_email is None
+        with pytest.raises(PasswordDeleteError):
+            del self.security_engine.user_email
+
+    def test_create_otp_qr(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        self.security_engine.user_email = "user@example.com"
+        image = self.security_engine.create_otp_qr()
+        assert image.size == (SecurityEngine.QR_SIZE, SecurityEngine.QR_SIZE)
+        assert self.security_engine.create_otp_qr() is image
+        assert self.security_engine.create_otp_qr(150).size == (150, 150)
+        assert not any(tmp_path.iterdir())
+
+        del self.security_engine.otp_key
+        self.security_engine.create_otp_key()
+        assert self.security_engine.create_otp_qr() is not image
+
+    def test_delete_qr(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "pwm_data").mkdir()
+        (tmp_path / "pwm_data" / "qr.png").write_bytes(b"png")
+        self.security_engine.user_email = "user@example.com"
+        image = self.security_engine.create_otp_qr()
+        self.security_engine.delete_qr()
+        assert not (tmp_path / "pwm_data" / "qr.png").exists()
+        assert self.security_engine.create_otp_qr() is not image
@@ -0,0 +1,62 @@
+from v13pwm.models.trigram_index import TrigramIndex
+from v13pwm.models.app_index import AppIndex
+import random
+import string
+import time
+
+KEYS = ["github", "gitlab", "mail.google.com", "google", "amazon", "netflix"]
+
+
+def test_trigrams():
+    assert TrigramIndex.trigrams("ab") == {"  a", " ab", "ab "}
+
+
+def test_search_typo():
+    trigram_index = TrigramIndex()
+    for key in KEYS:
+        trigram_index.add(key)
+    assert trigram_index.search("gitub")[0][0] == "github"
+    assert trigram_index.search("mail.google")[0][0] == "mail.google.com"
+    assert trigram_index.search("amazno")[0][0] == "amazon"
+    assert trigram_index.search("zzzz") == []
+
+
+def test_search_ranked():
+    trigram_index = TrigramIndex()
+    for key in KEYS:
+        trigram_index.add(key)
+    results = trigram_index.search("github", threshold=0.0)
+    assert results[0] == ("github", 1.0)
+    assert [score for _, score in results] == sorted([score for _, score in results], reverse=True)
+
+
+def test_remove():
+    trigram_index = TrigramIndex()
+    for key in KEYS:
+        trigram_index.add(key)
+    trigram_index.remove("github")
+    trigram_index.remove("non-existent")
+    assert len(trigram_index) == 5
+    assert "github" not in [key for key, _ in trigram_index.search("github")]
+
+
+def test_app_index_search():
+    app_index = AppIndex()
+    app_index.load([("GitHub",), ("gitlab",)])
+    app_index.add("Mail.Google.com")
+    assert app_index.search("gitub")[0] == "GitHub"
+    assert app_index.search("MAIL.GOOGLE")[0] == "Mail.Google.com"
+    app_index.remove("github")
+    assert "GitHub" not in app_index.search("gitub")
+
+
+def test_search_speed():
+    random.seed(13)
+    trigram_index = TrigramIndex()
+    for _ in range(100_000):
+        name = "".join(random.choices(string.ascii_lowercase, k=random.randint(5, 15)))
+        trigram_index.add(name + random.choice([".com", ".org", ""]))
+    start = time.perf_counter()
+    for query in ("gitub", "mail.google", "amazno.com", "netflx"):
+        trigram_index.search(query)
+    assert (time.perf_counter() - start) / 4 < 0.05
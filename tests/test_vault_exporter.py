@@ -0,0 +1,61 @@
+from v13pwm.models.vault_exporter import VaultExporter
+from v13pwm.models.data_processor import DataProcessor
+import pytest
+
+PASSPHRASE = "export passphrase"
+
+
+@pytest.fixture
+def exporter(security_engine):
+    vault_exporter = VaultExporter(security_engine)
+    vault_exporter.BATCH_SIZE = 10
+    vault_exporter.SCRYPT_N = 2 ** 10
+    return vault_exporter
+
+
+def test_export_and_read(exporter, tmp_path):
+    path = str(tmp_path / "vault.v13")
+    progress = []
+    assert exporter.export(path, PASSPHRASE, progress=progress.append) == 25
+    assert progress == [10, 20, 25]
+
+    records = list(VaultExporter.read_archive(path, PASSPHRASE))
+    assert len(records) == 25
+    assert records[0] == ("app_0", "user", "password_0")
+    with open(path, "rb") as archive:
+        assert b"password_0" not in archive.read()
+
+
+def test_export_wrong_passphrase(exporter, tmp_path):
+    path = str(tmp_path / "vault.v13")
+    exporter.export(path, PASSPHRASE)
+    with pytest.raises(ValueError):
+        list(VaultExporter.read_archive(path, "wrong passphrase"))
+
+
+def test_export_resume(exporter, tmp_path):
+    path = tmp_path / "vault.v13"
+    exporter.export(str(path), PASSPHRASE)
+    lines = path.read_bytes().splitlines(keepends=True)
+    path.write_bytes(b"".join(lines[:2]) + lines[2][:20])
+
+    assert exporter.export(str(path), PASSPHRASE) == 15
+    apps = [app for app, _, _ in VaultExporter.read_archive(str(path), PASSPHRASE)]
+    assert apps == [f"app_{number}" for number in range(25)]
+
+
+def test_export_overwrites_complete_archive(exporter, tmp_path):
+    path = str(tmp_path / "vault.v13")
+    exporter.export(path, PASSPHRASE)
+    DataProcessor.insert_records([("app_new", "user", exporter.security_engine.encrypt("password_new"))])
+    assert exporter.export(path, PASSPHRASE) == 26
+    records = list(VaultExporter.read_archive(path, PASSPHRASE))
+    assert len(records) == 26
+    assert records[-1] == ("app_new", "user", "password_new")
+
+
+def test_read_invalid_file(tmp_path):
+    path = tmp_path / "vault.csv"
+    path.write_text("name,url,username,password\n")
+    with pytest.raises(ValueError):
+        list(VaultExporter.read_archive(str(path), PASSPHRASE))
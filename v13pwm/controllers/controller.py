@@ -1,7 +1,11 @@
 import ttkbootstrap as ttkb
 import pyautogui
-from PIL import Image, ImageTk
+from PIL import ImageTk
 from models.data_processor import DataProcessor
+from models.background_worker import BackgroundWorker
+from models.db_worker import DatabaseWorker
+from models.key_rotation import KeyRotator
+from models.mail_processor import MailProcessor
 from .login_controller import LoginController
 from .create_acc_controller import CreateAccController
 from .create_pw_controller import CreatePwController
@@ -20,6 +24,21 @@ class AppController:
     # Time in seconds after security token expires.
     SECURITY_TOKEN_EXPIRE: int = 60
 
+    # Frame name as key and class of controller handling frame as value.
+    CONTROLLERS: dict = {
+        "login": LoginController,
+        "create_acc": CreateAccController,
+        "create_pw": CreatePwController,
+        "forgot_pw": ForgotPwController,
+        "setup_2fa": SetUp2FAController,
+        "reset_2fa": Reset2FAController,
+        "settings": SettingsController,
+        "main_page": MainPageController
+    }
+
+    # Time in milliseconds between checks for finished database jobs, background jobs and sent e-mails.
+    DB_POLL_INTERVAL: int = 20
+
     def __init__(self, view, security_engine):
         """
         Initializes app controller.
@@ -33,25 +52,22 @@ class AppController:
         self.token: str or None = None
         self.user_email: str or None = None
 
-        preferences = DataProcessor.load_preferences()
-        if preferences is not None:
-            self.password_length: int = preferences["pw_length"]
-            self.theme_name: str = preferences["theme"]
-        else:
-            self.password_length: int = 20
-            self.theme_name: str = "cyborg"
-
-        self.login_controller = LoginController(app_controller=self, app_view=self.app_view)
-        self.create_acc_controller = CreateAccController(app_controller=self, app_view=self.app_view)
-        self.create_pw_controller = CreatePwController(app_controller=self, app_view=self.app_view)
-        self.forgot_pw_controller = ForgotPwController(app_controller=self, app_view=self.app_view)
-        self.setup_2fa_controller = SetUp2FAController(app_controller=self, app_view=self.app_view)
-        self.reset_2fa_controller = Reset2FAController(app_controller=self, app_view=self.app_view)
-        self.settings_controller = SettingsController(app_controller=self, app_view=self.app_view)
-        self.main_page_controller = MainPageController(app_controller=self, app_view=self.app_view)
+        self.preferences = DataProcessor.preferences
+        self.db_worker = DatabaseWorker(DataProcessor)
+        self.db_worker.start()
+        self.background_worker = BackgroundWorker()
+        self.mail_queue = MailProcessor.create_queue()
+        self.mail_queue.start()
+        self.password_length: int = self.preferences.get("pw_length", 20)
+        self.theme_name: str = self.preferences.get("theme", "cyborg")
+
+        self.controllers: dict = {}
+        self.key_rotator: KeyRotator or None = None
+        self.app_view.on_frame_created = self.create_controller
 
         self.cursor_pos: tuple or None = None
         self.afk_check()
+        self.poll_workers()
         self.set_theme(self.theme_name)
         self.set_pw_length(self.password_length)
         self.set_starting_page()
@@ -70,7 +86,7 @@ class AppController:
         pos: tuple = pyautogui.position()
         if self.app_view.current_frame == "main_page" or self.app_view.current_frame == "settings":
             if pos == self.cursor_pos:
-                self.app_view.show_frame("login")
+                self.log_out()
             else:
                 self.cursor_pos = pos
         self.afk_check()
@@ -81,15 +97,85 @@ class AppController:
         """
         self.app_view.after(self.LOG_OUT_AFTER, self.detect_afk)
 
+    def create_controller(self, frame_name: str):
+        """
+        Takes name of just built frame and creates its controller, frames and controllers are built on first use.
+        :param str frame_name: Frame name.
+        """
+        self.controllers[frame_name] = self.CONTROLLERS[frame_name](app_controller=self, app_view=self.app_view)
+
+    def get_controller(self, frame_name: str):
+        """
+        Takes frame name and returns controller of frame, builds frame and controller if needed.
+        :param str frame_name: Frame name.
+        :return: Controller class.
+        """
+        self.app_view.get_frame(frame_name)
+        return self.controllers[frame_name]
+
+    def poll_workers(self):
+        """
+        Passes results of finished database and background jobs and statuses of sent e-mails to their callbacks and
+        schedules next check.
+        """
+        try:
+            self.db_worker.poll()
+            self.background_worker.poll()
+            self.mail_queue.poll()
+        finally:
+            self.app_view.after(self.DB_POLL_INTERVAL, self.poll_workers)
+
+    def log_in(self):
+        """
+        Leads user to Main page, then opens database connection for logged in session, brings database schema up to
+        date, loads saved apps, finishes interrupted key rotation and upgrades passwords stored in older format on
+        database worker.
+        """
+        self.app_view.show_frame("main_page")
+        main_page = self.get_controller("main_page")
+        self.db_worker.submit(DataProcessor.open_connection, error=main_page.database_failed)
+        self.db_worker.submit(DataProcessor.create_database, error=main_page.database_failed)
+        main_page.load_apps()
+        self.key_rotator = KeyRotator(self.security_engine)
+        self.db_worker.submit(self.key_rotator.resume, error=self.key_rotator_failed(self.key_rotator))
+        self.db_worker.submit(self.key_rotator.upgrade, error=self.key_rotator_failed(self.key_rotator))
+
+    @staticmethod
+    def key_rotator_failed(key_rotator: KeyRotator):
+        """
+        Takes key rotator and returns error callback for its jobs on database worker. Failure caused by user logging
+        out in the middle of batch is ignored, rotation resumes on next login, other failures are raised.
+        :param KeyRotator key_rotator: Key rotator running jobs.
+        :return: Function called with raised exception.
+        """
+        def failed(exception: Exception):
+            if not key_rotator.stopped:
+                raise exception
+        return failed
+
+    def log_out(self):
+        """
+        Stops key rotation running on database worker, closes database connection, clears loaded apps and cached
+        secrets and leads user to Login page. Rotation is stopped before secrets are wiped, so it ends before next
+        batch instead of running without key.
+        """
+        if self.key_rotator is not None:
+            self.key_rotator.stop()
+            self.key_rotator = None
+        self.db_worker.submit(DataProcessor.close_connection)
+        self.security_engine.wipe_secrets()
+        if "main_page" in self.controllers:
+            self.controllers["main_page"].app_index.clear()
+        self.app_view.show_frame("login")
+
     def create_2fa_qr(self):
         """
-        Generates 2FA QR code image and sets it to corresponding widget in Set Up 2FA page.
+        Generates 2FA QR code image in memory and sets it to corresponding widget in Set Up 2FA page.
         """
-        self.security_engine.create_otp_qr()
-        img = Image.open("pwm_data/qr.png").resize((300, 300))
-        qr = ImageTk.PhotoImage(img)
-        self.app_view.initialized_frames["setup_2fa"].qr_label.config(image=qr)
-        self.app_view.initialized_frames["setup_2fa"].qr_label.image = qr
+        qr = ImageTk.PhotoImage(self.security_engine.create_otp_qr())
+        frame = self.app_view.get_frame("setup_2fa")
+        frame.qr_label.config(image=qr)
+        frame.qr_label.image = qr
 
     def set_starting_page(self):
         """
@@ -97,7 +183,7 @@ class AppController:
         password exists, initializes account with saved keys and leads user to Login page.
         """
         if self.security_engine.password is None:
-            DataProcessor.create_database()
+            self.db_worker.submit(DataProcessor.create_database)
             self.security_engine.initialize_new_acc()
             self.app_view.show_frame("create_acc")
         else:
@@ -106,26 +192,22 @@ class AppController:
 
     def set_theme(self, theme: str):
         """
-        Takes ttkbootstrap theme name and sets app theme, saves chosen theme to user preferences.
+        Takes ttkbootstrap theme name and sets app theme, saves chosen theme to user preferences,
+        write to file is delayed and merged with other changes.
         :param str theme: ttkbootstrap theme name.
         """
         self.app_view.theme = ttkb.Style(theme)
         self.theme_name = theme
-        preferences = {
-            "theme": theme
-        }
-        DataProcessor.save_preferences(preferences)
+        self.preferences.update({"theme": theme})
 
     def set_pw_length(self, length: int):
         """
-        Takes length as integer and sets user preferred password length to its value and saves to preferences.
+        Takes length as integer and sets user preferred password length to its value and saves to preferences,
+        so dragging password length meter results in single write to file.
         Password length can not be less than 4 and must be even number, if odd number given, function will add 1
         to it, all numbers which are less than 4 will be set to 4.
         :param int length: Integer which is greater than 4 and even.
         """
         length = 4 if length < 4 else length
         self.password_length = length if length % 2 == 0 else length + 1
-        preferences = {
-            "pw_length": length
-        }
-        DataProcessor.save_preferences(preferences)
+        self.preferences.update({"pw_length": length})
@@ -13,7 +13,7 @@ class CreateAccController:
         """
         self.app_controller = app_controller
         self.app_view = app_view
-        self.frame = app_view.initialized_frames["create_acc"]
+        self.frame = app_view.get_frame("create_acc")
         self.security_engine = app_controller.security_engine
         self._bind()
 
@@ -26,21 +26,32 @@ class CreateAccController:
 
     def send_email_pressed(self):
         """
-        Checks if user entered e-mail address is valid, if valid generates and sends security token to
-        entered e-mail address, otherwise shows error message.
+        Starts validation of user entered e-mail address on background worker, so slow domain lookup does not
+        freeze window. Presses while validation is running are ignored.
         """
         email = self.frame.email_entry.get()
-        msg = MailProcessor.validate(email)
-
         if email == "Enter E-mail address":
             self.frame.error_label.config(text="Please enter email address", foreground="red")
-        elif msg is not None:
+            self.frame.after(3000, lambda: self.frame.error_label.config(text=""))
+        elif self.app_controller.background_worker.submit(
+            "validate_email", MailProcessor.validate, email, callback=lambda msg: self.email_validated(email, msg)
+        ):
+            self.frame.error_label.config(text="Checking e-mail address...", foreground="green")
+
+    def email_validated(self, email: str, msg: str or None):
+        """
+        Takes validated e-mail address and validation result, if address is valid generates and sends security
+        token to it, otherwise shows error message.
+        :param str email: Entered e-mail address.
+        :param str or None msg: Error message or None if address is valid.
+        """
+        if msg is not None:
             self.frame.error_label.config(text=msg, foreground="red")
+            self.frame.after(3000, lambda: self.frame.error_label.config(text=""))
         else:
             self.app_controller.user_email = email
             CommonFunctions.send_token_email(self, email)
             TokenTimer.set_timer(self, self.app_controller.SECURITY_TOKEN_EXPIRE)
-        self.frame.after(3000, lambda: self.frame.error_label.config(text=""))
 
     def submit_pressed(self):
         """
@@ -11,7 +11,7 @@ class CreatePwController:
         """
         self.app_controller = app_controller
         self.app_view = app_view
-        self.frame = app_view.initialized_frames["create_pw"]
+        self.frame = app_view.get_frame("create_pw")
         self.security_engine = app_controller.security_engine
         self._bind()
 
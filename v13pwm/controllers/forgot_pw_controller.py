@@ -12,7 +12,7 @@ class ForgotPwController:
         """
         self.app_controller = app_controller
         self.app_view = app_view
-        self.frame = app_view.initialized_frames["forgot_pw"]
+        self.frame = app_view.get_frame("forgot_pw")
         self.security_engine = app_controller.security_engine
         self._bind()
 
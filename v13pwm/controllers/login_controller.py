@@ -8,7 +8,7 @@ class LoginController:
         """
         self.app_controller = app_controller
         self.app_view = app_view
-        self.frame = app_view.initialized_frames["login"]
+        self.frame = app_view.get_frame("login")
         self.security_engine = app_controller.security_engine
         self._bind()
 
@@ -22,25 +22,56 @@ class LoginController:
 
     def login_pressed(self):
         """
-        Checks if entered password and OTP are correct, if correct leads user to Main page, otherwise
-        shows error message.
+        Starts check of entered password and OTP on background worker and shows progress. Presses while check is
+        running are ignored, so repeated clicks do not queue several password hashes.
         """
+        if self.app_controller.background_worker.busy("login"):
+            return
         password = self.frame.password_entry.get()
         otp_entered = self.frame.otp_entry.get().strip()
-        if self.security_engine.check_password(password):
-            del password
-            self.frame.password_entry.set()
-            if self.security_engine.verify_otp(otp_entered):
-                self.frame.otp_entry.set()
-                self.app_view.show_frame("main_page")
-            else:
-                self.frame.password_entry.set()
-                self.frame.otp_entry.set()
-                self.frame.error_label.config(text="Invalid OTP", foreground="red")
+        self.frame.password_entry.set()
+        self.frame.otp_entry.set()
+        self.frame.error_label.config(text="")
+        self.frame.set_busy(True)
+        self.app_controller.background_worker.submit(
+            "login", self.check_credentials, password, otp_entered,
+            callback=self.login_checked, error=self.login_failed
+        )
+        del password
+
+    def check_credentials(self, password: str, otp: str) -> str or None:
+        """
+        Takes entered password and OTP and verifies them, runs on background worker.
+        :param str password: Entered password.
+        :param str otp: Entered OTP.
+        :return str or None: Error message if password or OTP is invalid, otherwise None.
+        """
+        if not self.security_engine.check_password(password):
+            return "Invalid password"
+        if not self.security_engine.verify_otp(otp):
+            return "Invalid OTP"
+        return None
+
+    def login_checked(self, error_message: str or None):
+        """
+        Takes result of credentials check, if credentials are correct leads user to Main page, otherwise shows error
+        message.
+        :param str or None error_message: Error message or None if credentials are correct.
+        """
+        self.frame.set_busy(False)
+        if error_message is None:
+            self.app_controller.log_in()
         else:
-            self.frame.password_entry.set()
-            self.frame.otp_entry.set()
-            self.frame.error_label.config(text="Invalid password", foreground="red")
+            self.frame.error_label.config(text=error_message, foreground="red")
+            self.frame.after(3000, lambda: self.frame.error_label.config(text=""))
+
+    def login_failed(self, exception: Exception):
+        """
+        Takes exception raised while checking credentials and shows error message.
+        :param Exception exception: Raised exception.
+        """
+        self.frame.set_busy(False)
+        self.frame.error_label.config(text="Login failed, please try again", foreground="red")
         self.frame.after(3000, lambda: self.frame.error_label.config(text=""))
 
     def forgot_pw_pressed(self):
@@ -1,10 +1,14 @@
 import tkinter as tk
 from models.data_processor import DataProcessor
 from models.password_generator import PasswordGenerator
+from models.app_index import AppIndex
 
 
 class MainPageController:
 
+    # Maximum number of app names shown in combobox dropdown.
+    MAX_SUGGESTIONS: int = 20
+
     def __init__(self, app_controller, app_view):
         """
         Initializes Main page controller.
@@ -13,30 +17,65 @@ class MainPageController:
         """
         self.app_controller = app_controller
         self.app_view = app_view
-        self.frame = app_view.initialized_frames["main_page"]
+        self.frame = app_view.get_frame("main_page")
         self.security_engine = app_controller.security_engine
+        self.app_index = AppIndex()
+        self.frecent_apps: list = []
         self._bind()
 
     def _bind(self):
         """
         Binds Main page buttons to functions.
         """
-        self.frame.app_combox.config(
-            postcommand=lambda: self.frame.app_combox.config(
-                values=DataProcessor.get_all_apps()
-            )
-        )
+        self.frame.app_combox.config(postcommand=self.show_all_apps)
+        self.frame.app_combox.bind("<KeyRelease>", lambda event: self.show_all_apps())
         self.frame.settings_btn.config(command=lambda: self.app_view.show_frame("settings"))
         self.frame.gen_password_btn.config(command=self.gen_pw_pressed)
         self.frame.add_btn.config(command=self.add_pressed)
         self.frame.search_btn.config(command=self.search_pressed)
         self.frame.logout_btn.config(command=self.logout_pressed)
 
+    def load_apps(self):
+        """
+        Loads names of all saved apps to app index and most used apps on database worker, called when user logs in.
+        """
+        self.app_controller.db_worker.submit(
+            DataProcessor.get_all_apps, callback=self.app_index.load, error=self.database_failed
+        )
+        self.load_frecent_apps()
+
+    def load_frecent_apps(self):
+        """
+        Loads most frequently and recently used apps on database worker.
+        """
+        self.app_controller.db_worker.submit(
+            DataProcessor.get_frecent_records, self.MAX_SUGGESTIONS, callback=self.set_frecent_apps,
+            error=self.database_failed
+        )
+
+    def set_frecent_apps(self, records: list):
+        """
+        Takes most frequently and recently used records and keeps their unique app names.
+        :param list records: Records returned by DataProcessor.get_frecent_records.
+        """
+        self.frecent_apps = []
+        for app, _, _, _ in records:
+            if app not in self.frecent_apps:
+                self.frecent_apps.append(app)
+
     def show_all_apps(self):
         """
-        Populates combox with all apps in database.
+        Populates combox with saved apps which start with entered text. If nothing is entered, most frequently and
+        recently used apps are shown first, followed by other apps in alphabetical order.
         """
-        self.frame.app_combox.config(values=lambda: DataProcessor.get_all_apps())
+        prefix = self.frame.app_combox.get()
+        if prefix.strip():
+            values = self.app_index.complete(prefix, self.MAX_SUGGESTIONS)
+        else:
+            values = self.frecent_apps + [
+                app for app in self.app_index.complete("", self.MAX_SUGGESTIONS) if app not in self.frecent_apps
+            ]
+        self.frame.app_combox.config(values=values[:self.MAX_SUGGESTIONS])
 
     def gen_pw_pressed(self):
         """
@@ -49,71 +88,154 @@ class MainPageController:
         self.frame.clipboard_clear()
         self.frame.clipboard_append(password)
 
+    def show_message(self, text: str, color: str):
+        """
+        Takes message and shows it to user for 3 seconds.
+        :param str text: Message text.
+        :param str color: Text color.
+        """
+        self.frame.error_label.config(text=text, foreground=color)
+        self.frame.after(3000, lambda: self.frame.error_label.config(text=""))
+
+    def database_failed(self, exception: Exception):
+        """
+        Takes exception raised by database job and tells user operation failed.
+        :param Exception exception: Raised exception.
+        """
+        self.show_message("Database error, please try again!", "red")
+
+    def clear_fields(self):
+        """
+        Clears app, username and password fields.
+        """
+        self.frame.app_combox.delete(0, tk.END)
+        self.frame.username_entry.set()
+        self.frame.password_entry.set()
+
     def add_pressed(self):
         """
         Checks if all required fields are filled, if not, gives user error message.
-        Asks user for approval to save credentials, if credentials exists for particular app, aks if
+        Asks user for approval to save credentials, if credentials exists for particular app and username, aks if
         user wants to update these credentials, if approved, saves details to database clears widgets,
-        and gives feedback to user.
+        and gives feedback to user. Database is accessed on database worker.
         """
         app = self.frame.app_combox.get().strip().lower()
         username = self.frame.username_entry.get().strip().lower()
         password = self.frame.password_entry.get()
-        encrypted_password = self.security_engine.encrypt(password)
         if not app:
-            self.frame.error_label.config(text="App / Web field is empty!", foreground="red")
+            self.show_message("App / Web field is empty!", "red")
         elif not username:
-            self.frame.error_label.config(text="Username field is empty!", foreground="red")
+            self.show_message("Username field is empty!", "red")
         elif not password:
-            self.frame.error_label.config(text="Password field is empty!", foreground="red")
+            self.show_message("Password field is empty!", "red")
         elif self.frame.should_save() == "Yes":
-            if DataProcessor.search_record(app):
-                if self.frame.should_replace(app) == "No":
-                    self.frame.app_combox.delete(0, tk.END)
-                    self.frame.username_entry.set()
-                    self.frame.password_entry.set()
-                    return
-                else:
-                    DataProcessor.update_record(app, username, encrypted_password)
-            else:
-                DataProcessor.insert_record(app, username, encrypted_password)
-            self.frame.app_combox.delete(0, tk.END)
-            self.frame.username_entry.set()
-            self.frame.password_entry.set()
-            self.frame.error_label.config(text="Data saved successfully!", foreground="green")
-        self.frame.after(3000, lambda: self.frame.error_label.config(text=""))
+            encrypted_password = self.security_engine.encrypt(password)
+            self.app_controller.db_worker.submit(
+                DataProcessor.search_record, app, username,
+                callback=lambda record: self.save_record(app, username, encrypted_password, record),
+                error=self.database_failed
+            )
+
+    def save_record(self, app: str, username: str, encrypted_password: str, record: tuple or None):
+        """
+        Takes credentials and existing record for them, if record exists asks user if it should be updated.
+        Saves credentials on database worker.
+        :param str app: Name of app or web page.
+        :param str username: Username.
+        :param str encrypted_password: Encrypted password.
+        :param tuple or None record: Existing record for app and username.
+        """
+        if record and self.frame.should_replace(app, username) == "No":
+            self.clear_fields()
+            return
+        self.app_controller.db_worker.write(
+            DataProcessor.upsert_record, app, username, encrypted_password,
+            callback=lambda _: self.record_saved(app), error=self.database_failed
+        )
+
+    def record_saved(self, app: str):
+        """
+        Takes name of saved app, adds it to app index, clears widgets and gives feedback to user.
+        :param str app: Name of app or web page.
+        """
+        self.app_index.add(app)
+        self.clear_fields()
+        self.show_message("Data saved successfully!", "green")
 
     def search_pressed(self):
         """
-        Searches for credentials associated with entered app, in case app field is empty or credentials not found
-        shows error message to user. If credentials are found, inserts username in
-        username_entry box and password to password_entry box, copies password to clipboard and gives
-        feedback to user.
+        Searches for credentials associated with entered app on database worker, in case app field is empty shows
+        error message to user.
         """
         app = self.frame.app_combox.get().strip().lower()
+        username = self.frame.username_entry.get().strip().lower()
         if not app:
-            self.frame.error_label.config(text="App / Web field is empty!", foreground="red")
+            self.show_message("App / Web field is empty!", "red")
+        else:
+            self.app_controller.db_worker.submit(
+                DataProcessor.get_accounts, app, callback=lambda accounts: self.choose_account(app, username, accounts),
+                error=self.database_failed
+            )
+
+    def choose_account(self, app: str, username: str, accounts: list):
+        """
+        Takes accounts saved for app and chooses one to show. If several accounts are saved for app, uses account
+        matching entered username or asks user to choose one.
+        :param str app: Name of app or web page.
+        :param str username: Entered username.
+        :param list accounts: Usernames saved for app.
+        """
+        if len(accounts) > 1 and username not in accounts:
+            username = self.frame.choose_account(app, accounts)
+            if username is None:
+                return
+        self.app_controller.db_worker.submit(
+            DataProcessor.search_record, app, username if username in accounts else None,
+            callback=lambda record: self.show_record(app, record), error=self.database_failed
+        )
+
+    def show_record(self, app: str, record: tuple or None):
+        """
+        Takes found record, if credentials are found, inserts username in username_entry box and password to
+        password_entry box, copies password to clipboard, records use of credentials and gives feedback to user.
+        Password stored in older format is re-encrypted in current format.
+        If credentials are not found, shows error message to user and suggests similarly named saved apps if there
+        are any.
+        :param str app: Name of app or web page.
+        :param tuple or None record: Username and encrypted password or None.
+        """
+        if record:
+            username, encrypted_password = record
+            password = self.security_engine.decrypt(encrypted_password)
+            self.app_controller.db_worker.write(
+                DataProcessor.touch_record, app, username, error=self.database_failed
+            )
+            if self.security_engine.needs_upgrade(encrypted_password):
+                self.app_controller.db_worker.write(
+                    DataProcessor.replace_password, app, username, encrypted_password,
+                    self.security_engine.reencrypt(encrypted_password), error=self.database_failed
+                )
+            self.load_frecent_apps()
+            self.frame.username_entry.delete(0, tk.END)
+            self.frame.username_entry.insert(0, username)
+            self.frame.password_entry.delete(0, tk.END)
+            self.frame.password_entry.insert(0, password)
+            self.frame.clipboard_clear()
+            self.frame.clipboard_append(password)
+            self.show_message("Data retrieved successfully!", "green")
         else:
-            content = DataProcessor.search_record(app)
-            if content:
-                username, password = content
-                password = self.security_engine.decrypt(password)
-                self.frame.username_entry.delete(0, tk.END)
-                self.frame.username_entry.insert(0, username)
-                self.frame.password_entry.delete(0, tk.END)
-                self.frame.password_entry.insert(0, password)
-                self.frame.clipboard_clear()
-                self.frame.clipboard_append(password)
-                self.frame.error_label.config(text="Data retrieved successfully!", foreground="green")
+            suggestions = self.app_index.search(app, self.MAX_SUGGESTIONS)
+            if suggestions:
+                self.frame.app_combox.config(values=suggestions)
+                self.show_message(f"Nothing was found! Did you mean {suggestions[0]}?", "red")
             else:
-                self.frame.error_label.config(text="Nothing was found!", foreground="red")
-        self.frame.after(3000, lambda: self.frame.error_label.config(text=""))
+                self.show_message("Nothing was found!", "red")
 
     def logout_pressed(self):
         """
-        Clears widgets and leads user to Login page.
+        Clears widgets, logs out user and leads user to Login page.
         """
-        self.app_view.show_frame("login")
+        self.app_controller.log_out()
         self.frame.app_combox.delete(0, tk.END)
         self.frame.username_entry.set()
         self.frame.password_entry.set()
@@ -12,7 +12,7 @@ class Reset2FAController:
         """
         self.app_controller = app_controller
         self.app_view = app_view
-        self.frame = app_view.initialized_frames["reset_2fa"]
+        self.frame = app_view.get_frame("reset_2fa")
         self.security_engine = app_controller.security_engine
         self._bind()
 
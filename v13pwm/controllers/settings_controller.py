@@ -13,7 +13,7 @@ class SettingsController:
         """
         self.app_controller = app_controller
         self.app_view = app_view
-        self.frame = app_view.initialized_frames["settings"]
+        self.frame = app_view.get_frame("settings")
         self.security_engine = app_controller.security_engine
 
         self.selected_theme = ttkb.StringVar(None, self.app_controller.theme_name)
@@ -75,13 +75,27 @@ class SettingsController:
 
     def delete_acc_pressed(self):
         """
-        Shows user should_delete messagebox, if answer is "delete", deletes account and wipes all data,
-        gives feedback to user and exits app.
+        Shows user should_delete messagebox, if answer is "delete", deletes database table first, secrets are wiped
+        only once table is gone, so failed delete does not leave passwords nobody can decrypt.
         """
         if self.frame.should_delete() == "Delete Account":
-            self.security_engine.delete_secrets()
-            self.security_engine.delete_qr()
-            DataProcessor.delete_table()
-            DataProcessor.delete_preferences()
-            self.frame.account_deleted()
-            sys.exit()
+            self.app_controller.db_worker.write(
+                DataProcessor.delete_table, callback=self.account_deleted, error=self.delete_failed
+            )
+
+    def account_deleted(self, *args):
+        """
+        Wipes secrets, QR code and preferences after database table was deleted, gives feedback to user and exits app.
+        """
+        self.security_engine.delete_secrets()
+        self.security_engine.delete_qr()
+        DataProcessor.delete_preferences()
+        self.frame.account_deleted()
+        sys.exit()
+
+    def delete_failed(self, exception: Exception):
+        """
+        Takes exception raised while deleting database table and tells user account was not deleted, secrets are kept.
+        :param Exception exception: Raised exception.
+        """
+        self.frame.account_not_deleted()
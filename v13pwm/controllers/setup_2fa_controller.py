@@ -8,7 +8,7 @@ class SetUp2FAController:
         """
         self.app_controller = app_controller
         self.app_view = app_view
-        self.frame = app_view.initialized_frames["setup_2fa"]
+        self.frame = app_view.get_frame("setup_2fa")
         self.security_engine = app_controller.security_engine
         self._bind()
 
@@ -0,0 +1,90 @@
+import bisect
+from .data_processor import DataProcessor
+from .trigram_index import TrigramIndex
+
+
+class AppIndex:
+    """
+    Encapsulates in-memory index of saved app names used for autocompletion and search. Names are kept sorted by
+    normalized key so all names starting with given prefix form one contiguous range found by binary search,
+    misspelled names are matched using trigram index.
+    """
+
+    def __init__(self):
+        self._keys: list = []
+        self._names: dict = {}
+        self._trigrams = TrigramIndex()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, app: str) -> bool:
+        return DataProcessor.normalize_app(app) in self._names
+
+    def load(self, apps: list):
+        """
+        Takes list of app names and replaces index content with them.
+        :param list apps: App names as strings or as one-element tuples returned by DataProcessor.get_all_apps.
+        """
+        self._names = {}
+        for app in apps:
+            app = app[0] if isinstance(app, tuple) else app
+            self._names[DataProcessor.normalize_app(app)] = app
+        self._keys = sorted(self._names)
+        self._trigrams.clear()
+        for key in self._keys:
+            self._trigrams.add(key)
+
+    def clear(self):
+        """
+        Removes all app names from index.
+        """
+        self._keys = []
+        self._names = {}
+        self._trigrams.clear()
+
+    def add(self, app: str):
+        """
+        Takes app name and adds it to index, if app is already indexed updates its displayed name.
+        :param str app: Name of app or web page.
+        """
+        key = DataProcessor.normalize_app(app)
+        if key not in self._names:
+            bisect.insort(self._keys, key)
+            self._trigrams.add(key)
+        self._names[key] = app
+
+    def remove(self, app: str):
+        """
+        Takes app name and removes it from index if present.
+        :param str app: Name of app or web page.
+        """
+        key = DataProcessor.normalize_app(app)
+        if self._names.pop(key, None) is not None:
+            del self._keys[bisect.bisect_left(self._keys, key)]
+            self._trigrams.remove(key)
+
+    def complete(self, prefix: str, limit: int = 10) -> list:
+        """
+        Takes beginning of app name and returns saved app names which start with it in alphabetical order.
+        :param str prefix: Beginning of app name, empty string matches all apps.
+        :param int limit: Maximum number of returned names.
+        :return list: Matching app names.
+        """
+        prefix = DataProcessor.normalize_app(prefix)
+        matches: list = []
+        position = bisect.bisect_left(self._keys, prefix)
+        while position < len(self._keys) and len(matches) < limit and self._keys[position].startswith(prefix):
+            matches.append(self._names[self._keys[position]])
+            position += 1
+        return matches
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """
+        Takes possibly misspelled or partial app name and returns similar saved app names, best match first.
+        :param str query: App name to search for.
+        :param int limit: Maximum number of returned names.
+        :return list: Matching app names.
+        """
+        matches = self._trigrams.search(DataProcessor.normalize_app(query), limit)
+        return [self._names[key] for key, _ in matches]
@@ -0,0 +1,84 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundWorker:
+    """
+    Encapsulates thread pool for CPU heavy or slow work which does not touch database, like password hashing, so GUI
+    thread stays responsive. Every job is submitted under a key and only one job per key can be pending, repeated
+    submits while job is running are dropped. Results are collected in result queue and passed to callbacks when GUI
+    thread calls poll, key is released only after its callback ran.
+    """
+
+    # Default number of threads running jobs.
+    WORKERS: int = 2
+
+    def __init__(self, workers: int = None):
+        """
+        Initializes background worker, threads are started on first submit.
+        :param int workers: Number of threads running jobs.
+        """
+        self.workers = workers or self.WORKERS
+        self._executor: ThreadPoolExecutor or None = None
+        self._pending: set = set()
+        self._results = queue.SimpleQueue()
+
+    def busy(self, key: str) -> bool:
+        """
+        Checks if job submitted under key is still pending.
+        :param str key: Job key.
+        :return bool: True if job is running or its result was not delivered yet, otherwise False.
+        """
+        return key in self._pending
+
+    def submit(self, key: str, function, *args, callback=None, error=None) -> bool:
+        """
+        Queues job unless job with the same key is pending, must be called from GUI thread.
+        :param str key: Job key, e.g. name of action which started job.
+        :param function: Function to run on background thread.
+        :param args: Arguments passed to function.
+        :param callback: Optional function called from poll with function's return value.
+        :param error: Optional function called from poll with exception raised by function.
+        :return bool: True if job was queued, False if it was dropped.
+        """
+        if key in self._pending:
+            return False
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="BackgroundWorker")
+        self._pending.add(key)
+        future = self._executor.submit(function, *args)
+        future.add_done_callback(lambda done: self._results.put((key, done, callback, error)))
+        return True
+
+    def poll(self) -> int:
+        """
+        Passes finished jobs' results to their callbacks, must be called from GUI thread. Exception of job without
+        error callback is raised here, remaining results are delivered on next call.
+        :return int: Number of delivered results.
+        """
+        delivered = 0
+        while True:
+            try:
+                key, future, callback, error = self._results.get_nowait()
+            except queue.Empty:
+                return delivered
+            delivered += 1
+            self._pending.discard(key)
+            if future.cancelled():
+                continue
+            exception = future.exception()
+            if exception is not None and error is not None:
+                error(exception)
+            elif exception is not None:
+                raise exception
+            elif callback is not None:
+                callback(future.result())
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stops threads, jobs which already started are finished.
+        :param bool wait: Whether to wait until running jobs finish.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,102 @@
+import base64
+import os
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+
+class Cipher:
+    """
+    Encapsulates encryption of stored passwords. Passwords are encrypted to binary envelope:
+
+        version (1 byte) | key id (4 bytes) | nonce (12 bytes) | ciphertext | tag (16 bytes)
+
+    Version selects AEAD algorithm, key id selects which of current and previous keys was used. Envelope keys are
+    derived from Fernet keys kept in keyring, so no new secret is needed. Passwords encrypted by older versions as
+    base64 Fernet tokens are still decrypted, they are recognized by missing envelope header.
+    """
+
+    AES_GCM: int = 1
+    CHACHA20_POLY1305: int = 2
+
+    # Envelope version as key and AEAD class as value.
+    ALGORITHMS: dict = {
+        AES_GCM: AESGCM,
+        CHACHA20_POLY1305: ChaCha20Poly1305,
+    }
+
+    KEY_ID_SIZE: int = 4
+    NONCE_SIZE: int = 12
+    HEADER_SIZE: int = 1 + KEY_ID_SIZE + NONCE_SIZE
+
+    def __init__(self, keys: list, algorithm: int = AES_GCM):
+        """
+        Initializes cipher.
+        :param list keys: Current Fernet key followed by previous keys.
+        :param int algorithm: Envelope version used for encryption.
+        """
+        self.algorithm = algorithm
+        self._fernet = MultiFernet([Fernet(key) for key in keys])
+        self._key_ids: list = [self.derive(key, b"v13pwm key id")[:self.KEY_ID_SIZE] for key in keys]
+        self._aeads: dict = {
+            (version, key_id): algorithm_class(self.derive(key, b"v13pwm envelope " + bytes([version])))
+            for key, key_id in zip(keys, self._key_ids)
+            for version, algorithm_class in self.ALGORITHMS.items()
+        }
+        self._header = bytes([algorithm]) + self._key_ids[0]
+
+    @staticmethod
+    def derive(key: str, info: bytes) -> bytes:
+        """
+        Takes Fernet key and purpose and derives independent 32 byte key from it.
+        :param str key: Base64 encoded Fernet key.
+        :param bytes info: Purpose of derived key.
+        :return bytes: Derived key.
+        """
+        return HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=info).derive(base64.urlsafe_b64decode(key))
+
+    def encrypt(self, data: bytes) -> bytes:
+        """
+        Takes data and encrypts it with current key.
+        :param bytes data: Data to encrypt.
+        :return bytes: Envelope.
+        """
+        nonce = os.urandom(self.NONCE_SIZE)
+        header = self._header + nonce
+        return header + self._aeads[(self.algorithm, self._key_ids[0])].encrypt(nonce, data, header)
+
+    def decrypt(self, token: bytes or str) -> bytes:
+        """
+        Takes envelope or legacy Fernet token and decrypts it with key it was encrypted with.
+        :param bytes or str token: Encrypted data.
+        :return bytes: Decrypted data.
+        :raises InvalidToken: If token is damaged or was encrypted with unknown key.
+        """
+        if isinstance(token, str) or not token or token[0] not in self.ALGORITHMS:
+            return self._fernet.decrypt(token)
+        aead = self._aeads.get((token[0], token[1:1 + self.KEY_ID_SIZE]))
+        if aead is None:
+            raise InvalidToken
+        header = token[:self.HEADER_SIZE]
+        try:
+            return aead.decrypt(header[1 + self.KEY_ID_SIZE:], token[self.HEADER_SIZE:], header)
+        except InvalidTag:
+            raise InvalidToken from None
+
+    def is_current(self, token: bytes or str) -> bool:
+        """
+        Checks if token was encrypted with current envelope version and current key.
+        :param bytes or str token: Encrypted data.
+        :return bool: True if token does not need to be encrypted again, otherwise False.
+        """
+        return isinstance(token, bytes) and token.startswith(self._header)
+
+    def reencrypt(self, token: bytes or str) -> bytes:
+        """
+        Takes token encrypted with any known key or version and encrypts its data again with current key and version.
+        :param bytes or str token: Encrypted data.
+        :return bytes: Envelope.
+        """
+        return self.encrypt(self.decrypt(token))
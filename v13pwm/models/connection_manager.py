@@ -0,0 +1,119 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class ConnectionManager:
+    """
+    Encapsulates long-lived SQLite connections. Every thread gets its own connection, opened on first use
+    and reused until it is explicitly closed.
+    """
+
+    # Applied to every new connection, in this order.
+    PRAGMAS: dict = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "temp_store": "MEMORY",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -16 * 1024,
+    }
+
+    # Number of prepared statements kept per connection.
+    CACHED_STATEMENTS: int = 256
+
+    def __init__(self, functions: dict = None):
+        """
+        Initializes connection manager.
+        :param dict functions: SQL functions registered on every connection, name as key and tuple with number of
+        arguments and function as value.
+        """
+        self.functions: dict = functions or {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: dict = {}
+
+    def get(self, path: str) -> sqlite3.Connection:
+        """
+        Takes database path and returns connection owned by calling thread. Opens new connection if thread has none,
+        if existing one was closed or if it points to different database.
+        :param str path: Path to database file.
+        :return sqlite3.Connection: Open connection.
+        """
+        con = getattr(self._local, "connection", None)
+        if con is not None and self._connections.get(threading.get_ident()) is con:
+            if self._local.path == path:
+                return con
+            self.close()
+        con = self._open(path)
+        self._local.connection = con
+        self._local.path = path
+        self._local.depth = 0
+        with self._lock:
+            self._connections[threading.get_ident()] = con
+        return con
+
+    def _open(self, path: str) -> sqlite3.Connection:
+        """
+        Opens new connection in autocommit mode, applies pragmas and registers SQL functions.
+        :param str path: Path to database file.
+        :return sqlite3.Connection: Open connection.
+        """
+        con = sqlite3.connect(
+            path,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=self.CACHED_STATEMENTS
+        )
+        for name, value in self.PRAGMAS.items():
+            con.execute(f"PRAGMA {name}={value}")
+        for name, (num_args, function) in self.functions.items():
+            con.create_function(name, num_args, function, deterministic=True)
+        return con
+
+    @contextmanager
+    def transaction(self, path: str):
+        """
+        Runs enclosed statements in one transaction on calling thread's connection. Commits on success and rolls back
+        if exception is raised. Nested transactions are turned into savepoints.
+        :param str path: Path to database file.
+        """
+        con = self.get(path)
+        depth = self._local.depth
+        savepoint = f"sp_{depth}"
+        con.execute("BEGIN IMMEDIATE" if depth == 0 else f"SAVEPOINT {savepoint}")
+        self._local.depth = depth + 1
+        try:
+            yield con
+        except BaseException:
+            if depth == 0:
+                con.execute("ROLLBACK")
+            else:
+                con.execute(f"ROLLBACK TO {savepoint}")
+                con.execute(f"RELEASE {savepoint}")
+            raise
+        else:
+            con.execute("COMMIT" if depth == 0 else f"RELEASE {savepoint}")
+        finally:
+            self._local.depth = depth
+
+    def close(self):
+        """
+        Closes connection owned by calling thread if it is open.
+        """
+        with self._lock:
+            con = self._connections.pop(threading.get_ident(), None)
+        self._local.connection = None
+        if con is not None:
+            con.close()
+
+    def close_all(self):
+        """
+        Closes connections of all threads.
+        """
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        self._local.connection = None
+        for con in connections:
+            con.close()
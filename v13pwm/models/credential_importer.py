@@ -0,0 +1,170 @@
+import csv
+import os
+import time
+import xml.etree.ElementTree as ElementTree
+from itertools import islice
+from urllib.parse import urlparse
+from .data_processor import DataProcessor
+
+
+class ImportReport:
+    """
+    Holds statistics of single import run.
+    """
+
+    def __init__(self):
+        self.read: int = 0
+        self.imported: int = 0
+        self.duplicates: int = 0
+        self.replaced: int = 0
+        self.skipped: int = 0
+        self.started: float = time.perf_counter()
+        self.elapsed: float = 0.0
+
+    @property
+    def records_per_second(self) -> float:
+        """
+        Returns import throughput.
+        :return float: Number of processed records per second.
+        """
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+
+class CredentialImporter:
+    """
+    Encapsulates logic for importing credentials exported from browsers, Bitwarden and KeePass.
+    """
+
+    # Number of records encrypted and written to database in one transaction, large enough to be encrypted in
+    # parallel by SecurityEngine.encrypt_many.
+    BATCH_SIZE: int = 2000
+
+    # Column names, in order of preference, used by supported CSV exports.
+    APP_COLUMNS: tuple = ("name", "title", "account", "url", "login_uri", "web site", "origin")
+    USERNAME_COLUMNS: tuple = ("username", "login_username", "login name", "user name")
+    PASSWORD_COLUMNS: tuple = ("password", "login_password")
+
+    def __init__(self, security_engine, workers: int = None):
+        """
+        Initializes importer.
+        :param security_engine: SecurityEngine class used to encrypt imported passwords.
+        :param int workers: Number of threads used for encryption, defaults to number of CPUs.
+        """
+        self.security_engine = security_engine
+        self.workers = workers or os.cpu_count() or 1
+
+    @staticmethod
+    def app_from_url(url: str) -> str:
+        """
+        Takes URL and returns its host name without "www." prefix, if URL has no host returns it unchanged.
+        :param str url: URL of web page.
+        :return str: Host name.
+        """
+        host = urlparse(url.strip()).netloc or url.strip()
+        return host[4:] if host.startswith("www.") else host
+
+    @classmethod
+    def parse_csv(cls, data_file):
+        """
+        Takes open CSV file exported from browser, Bitwarden or KeePassXC and yields credentials row by row.
+        :param data_file: File object opened in text mode.
+        :return: Generator of (app, username, password) tuples.
+        """
+        reader = csv.DictReader(data_file)
+        columns = {name.strip().lower(): name for name in reader.fieldnames or []}
+        app_columns = [columns[name] for name in cls.APP_COLUMNS if name in columns]
+        username_column = next((columns[name] for name in cls.USERNAME_COLUMNS if name in columns), None)
+        password_column = next((columns[name] for name in cls.PASSWORD_COLUMNS if name in columns), None)
+        type_column = columns.get("type")
+        for row in reader:
+            if type_column and row[type_column] not in ("login", ""):
+                continue
+            app = next((row[column] for column in app_columns if row[column]), "")
+            if "/" in app:
+                app = cls.app_from_url(app)
+            username = row[username_column] if username_column else ""
+            password = row[password_column] if password_column else ""
+            yield app, username or "", password or ""
+
+    @classmethod
+    def parse_keepass_xml(cls, data_file):
+        """
+        Takes KeePass XML export and yields credentials entry by entry, parsed elements are released right away
+        so memory use does not grow with file size. Entries in history are ignored.
+        :param data_file: Path or file object opened in binary mode.
+        :return: Generator of (app, username, password) tuples.
+        """
+        history_depth = 0
+        for event, element in ElementTree.iterparse(data_file, events=("start", "end")):
+            if element.tag == "History":
+                history_depth += 1 if event == "start" else -1
+            elif event == "end" and element.tag == "Entry":
+                if not history_depth:
+                    fields = {
+                        string.findtext("Key"): string.findtext("Value") or "" for string in element.iter("String")
+                    }
+                    app = fields.get("Title") or cls.app_from_url(fields.get("URL", ""))
+                    yield app, fields.get("UserName", ""), fields.get("Password", "")
+                element.clear()
+
+    @classmethod
+    def parse_file(cls, path: str):
+        """
+        Takes path to export file and yields credentials using parser chosen by file extension.
+        :param str path: Path to .csv or .xml file.
+        :return: Generator of (app, username, password) tuples.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".xml":
+            with open(path, "rb") as data_file:
+                yield from cls.parse_keepass_xml(data_file)
+        elif extension == ".csv":
+            with open(path, newline="", encoding="utf-8-sig") as data_file:
+                yield from cls.parse_csv(data_file)
+        else:
+            raise ValueError(f"Unsupported import format: {extension}")
+
+    def import_records(self, records, replace: bool = False, progress=None) -> ImportReport:
+        """
+        Takes iterable of credentials, encrypts passwords in parallel and saves them to database in batches.
+        Records without app name or password are skipped, records for accounts which already exist are counted
+        as duplicates in both modes and left untouched unless replace is True, overwritten ones are also counted as
+        replaced.
+        :param records: Iterable of (app, username, password) tuples.
+        :param bool replace: Whether existing credentials should be overwritten.
+        :param progress: Optional function called with ImportReport after every batch.
+        :return ImportReport: Import statistics.
+        """
+        report = ImportReport()
+        records = iter(records)
+        while batch := list(islice(records, self.BATCH_SIZE)):
+            report.read += len(batch)
+            valid = [
+                (app.strip().lower(), username.strip().lower(), password)
+                for app, username, password in batch if app.strip() and password
+            ]
+            report.skipped += len(batch) - len(valid)
+            encrypted = self.security_engine.encrypt_many(
+                (password.encode() for _, _, password in valid), workers=self.workers
+            )
+            rows = [(app, username, password) for (app, username, _), password in zip(valid, encrypted)]
+            inserted = DataProcessor.insert_records(rows, replace=replace)
+            report.imported += inserted
+            report.duplicates += len(rows) - inserted
+            if replace:
+                report.replaced += len(rows) - inserted
+            report.elapsed = time.perf_counter() - report.started
+            if progress is not None:
+                progress(report)
+        report.elapsed = time.perf_counter() - report.started
+        return report
+
+    def import_file(self, path: str, replace: bool = False, progress=None) -> ImportReport:
+        """
+        Takes path to export file and imports all credentials from it.
+        :param str path: Path to .csv or .xml file.
+        :param bool replace: Whether existing credentials should be overwritten.
+        :param progress: Optional function called with ImportReport after every batch.
+        :return ImportReport: Import statistics.
+        """
+        return self.import_records(self.parse_file(path), replace=replace, progress=progress)
@@ -1,6 +1,9 @@
 import sqlite3
-import json
-import os
+import math
+import time
+from .connection_manager import ConnectionManager
+from .preferences import Preferences
+from .schema_migrator import SchemaMigrator
 
 
 class DataProcessor:
@@ -8,16 +11,80 @@ class DataProcessor:
     Encapsulates functions for manipulations with database and json files.
     """
     DB_PATH = "pwm_data/password_manager.db"
+    PREFERENCES_PATH = "pwm_data/data.json"
+
+    # Time in seconds after which weight of single use in frecency score halves.
+    FRECENCY_HALF_LIFE: int = 60 * 60 * 24 * 14
+
+    _connections = ConnectionManager(functions={
+        "bump_frecency": (2, lambda frecency, timestamp: DataProcessor.bump_frecency(frecency, timestamp))
+    })
+
+    preferences = Preferences(PREFERENCES_PATH)
+
+    @staticmethod
+    def connect() -> sqlite3.Connection:
+        """
+        Returns long-lived connection to database for calling thread, opens it if needed.
+        :return sqlite3.Connection: Open connection.
+        """
+        return DataProcessor._connections.get(DataProcessor.DB_PATH)
+
+    @staticmethod
+    def transaction():
+        """
+        Returns context manager which runs enclosed statements in single transaction and yields connection.
+        """
+        return DataProcessor._connections.transaction(DataProcessor.DB_PATH)
+
+    @staticmethod
+    def open_connection():
+        """
+        Opens connection to database ahead of first query, called when user logs in.
+        """
+        DataProcessor.connect()
+
+    @staticmethod
+    def close_connection():
+        """
+        Closes all open connections to database, called when user logs out.
+        """
+        DataProcessor._connections.close_all()
+
+    @staticmethod
+    def normalize_app(app: str) -> str:
+        """
+        Takes app name and returns key used to index it, lookups by app name are case-insensitive.
+        :param str app: Name of app or web page.
+        :return str: Stripped and case-folded app name.
+        """
+        return app.strip().casefold()
+
+    @staticmethod
+    def bump_frecency(frecency: float or None, timestamp: float) -> float:
+        """
+        Takes current frecency score and time of new use, returns updated score. Every use adds weight
+        2 ** (timestamp / FRECENCY_HALF_LIFE) and score is base 2 logarithm of sum of weights. Weights of all entries
+        decay at the same rate, so ordering by stored score is the same as ordering by decayed score at any moment.
+        :param float or None frecency: Current score, None if entry was never used.
+        :param float timestamp: Unix time of use.
+        :return float: Updated score.
+        """
+        score = timestamp / DataProcessor.FRECENCY_HALF_LIFE
+        if frecency is None:
+            return score
+        high, low = max(frecency, score), min(frecency, score)
+        return high + math.log2(1 + 2 ** (low - high))
 
     @staticmethod
-    def create_database():
+    def create_database(progress=None) -> int:
         """
-        Creates database and password_manager table if not exists.
+        Creates database and password_manager table if not exists, migrates tables created by older versions
+        to latest schema.
+        :param progress: Optional function called with migration version, description and number of processed rows.
+        :return int: Number of applied migrations.
         """
-        with sqlite3.connect(DataProcessor.DB_PATH) as con:
-            cur = con.cursor()
-            cur.execute("CREATE TABLE IF NOT EXISTS password_manager (app text, username text, password text)")
-            con.commit()
+        return SchemaMigrator(DataProcessor, progress).migrate()
 
     @staticmethod
     def insert_record(app: str, username: str, password: str):
@@ -26,102 +93,338 @@ class DataProcessor:
         :param str app: Name of app or web page.
         :param str username: Username for app or web page.
         :param str password: Password for app or web page.
+        :raises sqlite3.IntegrityError: If credentials for this username and app already exist.
         """
-        with sqlite3.connect(DataProcessor.DB_PATH) as con:
-            cur = con.cursor()
-            cur.execute(f"INSERT INTO password_manager VALUES (?,?,?)", (app, username, password))
-            con.commit()
+        now = time.time()
+        with DataProcessor.transaction() as con:
+            con.execute("""
+            INSERT INTO password_manager (app, username, password, app_key, created_at, updated_at) 
+            VALUES (?,?,?,?,?,?)""",
+                        (app, username, password, DataProcessor.normalize_app(app), now, now)
+                        )
+
+    @staticmethod
+    def upsert_record(app: str, username: str, password: str):
+        """
+        Takes app name, username, password and adds to database, if credentials for this username and app already
+        exist, updates password instead.
+        :param str app: Name of app or web page.
+        :param str username: Username for app or web page.
+        :param str password: Password for app or web page.
+        """
+        now = time.time()
+        with DataProcessor.transaction() as con:
+            con.execute("""
+            INSERT INTO password_manager (app, username, password, app_key, created_at, updated_at) 
+            VALUES (?,?,?,?,?,?) 
+            ON CONFLICT (app_key, username) DO UPDATE 
+            SET password=excluded.password, 
+            updated_at=excluded.updated_at""",
+                        (app, username, password, DataProcessor.normalize_app(app), now, now)
+                        )
 
     @staticmethod
-    def search_record(app: str) -> tuple or None:
+    def insert_records(records: list, replace: bool = False) -> int:
         """
-        Takes app name and searches for credentials in database. Returns credentials for specified app.
+        Takes list of (app, username, password) tuples and adds them to database in single transaction.
+        Records for username and app pairs which already exist are skipped, or updated if replace is True.
+        :param list records: List of tuples with app name, username and password.
+        :param bool replace: Whether existing credentials should be overwritten.
+        :return int: Number of inserted records, records for existing accounts are not counted in either mode.
+        """
+        conflict = "DO NOTHING"
+        if replace:
+            conflict = "DO UPDATE SET password=excluded.password, updated_at=excluded.updated_at"
+        now = time.time()
+        with DataProcessor.transaction() as con:
+            last_id = con.execute("SELECT IFNULL(MAX(id), 0) FROM password_manager").fetchone()[0]
+            con.executemany(
+                f"""
+                INSERT INTO password_manager (app, username, password, app_key, created_at, updated_at) 
+                VALUES (?,?,?,?,?,?) 
+                ON CONFLICT (app_key, username) {conflict}""",
+                (
+                    (app, username, password, DataProcessor.normalize_app(app), now, now)
+                    for app, username, password in records
+                )
+            )
+            return con.execute("SELECT COUNT(*) FROM password_manager WHERE id>?", (last_id,)).fetchone()[0]
+
+    @staticmethod
+    def search_record(app: str, username: str = None) -> tuple or None:
+        """
+        Takes app name and optionally username, searches for credentials in database. If username is not given
+        and several accounts are saved for app, returns the most frequently and recently used one.
         :param str app: Name of app or web page.
+        :param str username: Username for app or web page.
         :return tuple or None: Tuple with first value as username and second value as password.
         If nothing was found, returns None.
         """
-        with sqlite3.connect(DataProcessor.DB_PATH) as con:
-            cur = con.cursor()
-            cur.execute("SELECT username, password FROM password_manager WHERE app=?", (app,))
-            values: tuple or None = cur.fetchone()
-            return values
+        if username is None:
+            cur = DataProcessor.connect().execute("""
+            SELECT username, password FROM password_manager 
+            WHERE app_key=? 
+            ORDER BY frecency IS NULL, frecency DESC, id 
+            LIMIT 1""", (DataProcessor.normalize_app(app),))
+        else:
+            cur = DataProcessor.connect().execute(
+                "SELECT username, password FROM password_manager WHERE app_key=? AND username=?",
+                (DataProcessor.normalize_app(app), username)
+            )
+        values: tuple or None = cur.fetchone()
+        return values
 
     @staticmethod
-    def update_record(app: str, username: str, password: str):
+    def get_accounts(app: str) -> list:
         """
-        Takes app name, username, password, updates username and password for specified app.
+        Takes app name and returns usernames of all accounts saved for it, most frequently and recently used first.
         :param str app: Name of app or web page.
-        :param str username: Username for app or web page.
-        :param str password: Password for app or web page.
+        :return list: Usernames as strings.
+        """
+        cur = DataProcessor.connect().execute("""
+        SELECT username FROM password_manager 
+        WHERE app_key=? 
+        ORDER BY frecency IS NULL, frecency DESC, id""", (DataProcessor.normalize_app(app),))
+        return [username for username, in cur.fetchall()]
+
+    @staticmethod
+    def update_record(app: str, username: str, password: str, new_username: str = None):
+        """
+        Takes app name, username, password, updates password and optionally username of specified account.
+        :param str app: Name of app or web page.
+        :param str username: Username of account to update.
+        :param str password: New password for app or web page.
+        :param str new_username: New username, if not given username stays the same.
         """
-        with sqlite3.connect(DataProcessor.DB_PATH) as con:
-            cur = con.cursor()
-            cur.execute("""
+        with DataProcessor.transaction() as con:
+            con.execute("""
             UPDATE password_manager 
             SET username=?, 
-            password=? 
-            WHERE app=?""",
-                        (username, password, app)
+            password=?, 
+            updated_at=? 
+            WHERE app_key=? AND username=?""",
+                        (
+                            username if new_username is None else new_username,
+                            password,
+                            time.time(),
+                            DataProcessor.normalize_app(app),
+                            username
+                        )
+                        )
+
+    @staticmethod
+    def touch_record(app: str, username: str, timestamp: float = None):
+        """
+        Takes app name and username, records that credentials of this account were used, increases use count and
+        frecency score.
+        :param str app: Name of app or web page.
+        :param str username: Username for app or web page.
+        :param float timestamp: Unix time of use, defaults to current time.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        with DataProcessor.transaction() as con:
+            con.execute("""
+            UPDATE password_manager 
+            SET use_count=use_count+1, 
+            last_used_at=?, 
+            frecency=bump_frecency(frecency, ?) 
+            WHERE app_key=? AND username=?""",
+                        (timestamp, timestamp, DataProcessor.normalize_app(app), username)
                         )
-            con.commit()
+
+    @staticmethod
+    def get_frecent_records(limit: int = 10) -> list:
+        """
+        Returns most frequently and recently used accounts, best first. Accounts which were never used are not
+        returned.
+        :param int limit: Maximum number of returned accounts.
+        :return list: List of tuples with app name, username, use count and unix time of last use.
+        """
+        cur = DataProcessor.connect().execute("""
+        SELECT app, username, use_count, last_used_at FROM password_manager 
+        WHERE frecency IS NOT NULL 
+        ORDER BY frecency DESC 
+        LIMIT ?""", (limit,))
+        return cur.fetchall()
+
+    @staticmethod
+    def delete_record(app: str, username: str = None):
+        """
+        Takes app name and optionally username, deletes credentials of specified account or, if username
+        is not given, of all accounts saved for app.
+        :param str app: Name of app or web page.
+        :param str username: Username for app or web page.
+        """
+        with DataProcessor.transaction() as con:
+            if username is None:
+                con.execute("DELETE FROM password_manager WHERE app_key=?", (DataProcessor.normalize_app(app),))
+            else:
+                con.execute(
+                    "DELETE FROM password_manager WHERE app_key=? AND username=?",
+                    (DataProcessor.normalize_app(app), username)
+                )
 
     @staticmethod
     def get_all_apps() -> list:
         """
-        Returns list of all apps in database.
+        Returns list of all apps in database, every app is listed once even if several accounts are saved for it.
         :return list: All apps in database.
         """
-        with sqlite3.connect(DataProcessor.DB_PATH) as con:
-            cur = con.cursor()
-            cur.execute("SELECT app FROM password_manager")
-            values = cur.fetchall()
-            return values
+        cur = DataProcessor.connect().execute("SELECT app, MIN(id) FROM password_manager GROUP BY app_key ORDER BY 2")
+        values = [(app,) for app, _ in cur.fetchall()]
+        return values
+
+    @staticmethod
+    def iter_records(after_id: int = 0, batch_size: int = 500):
+        """
+        Yields all records in insertion order in batches, rows are fetched from cursor batch by batch so memory use
+        does not depend on number of records.
+        :param int after_id: Only records with row id greater than this are returned.
+        :param int batch_size: Maximum number of records in single batch.
+        :return: Generator of lists with (id, app, username, password) tuples.
+        """
+        cur = DataProcessor.connect().execute(
+            "SELECT id, app, username, password FROM password_manager WHERE id>? ORDER BY id",
+            (after_id,)
+        )
+        while batch := cur.fetchmany(batch_size):
+            yield batch
+
+    @staticmethod
+    def get_passwords(after_id: int, limit: int) -> list:
+        """
+        Takes row id and returns encrypted passwords of following records in insertion order.
+        :param int after_id: Only records with row id greater than this are returned.
+        :param int limit: Maximum number of returned records.
+        :return list: List of (id, password) tuples.
+        """
+        cur = DataProcessor.connect().execute(
+            "SELECT id, password FROM password_manager WHERE id>? ORDER BY id LIMIT ?", (after_id, limit)
+        )
+        return cur.fetchall()
+
+    @staticmethod
+    def get_legacy_passwords(after_id: int, limit: int) -> list:
+        """
+        Takes row id and returns following passwords still stored as text Fernet tokens, current format is binary.
+        :param int after_id: Only records with row id greater than this are returned.
+        :param int limit: Maximum number of returned records.
+        :return list: List of (id, password) tuples.
+        """
+        cur = DataProcessor.connect().execute(
+            "SELECT id, password FROM password_manager WHERE id>? AND typeof(password)='text' ORDER BY id LIMIT ?",
+            (after_id, limit)
+        )
+        return cur.fetchall()
+
+    @staticmethod
+    def count_legacy_passwords() -> int:
+        """
+        Returns number of passwords still stored as text Fernet tokens.
+        :return int: Number of records.
+        """
+        return DataProcessor.connect().execute(
+            "SELECT COUNT(*) FROM password_manager WHERE typeof(password)='text'"
+        ).fetchone()[0]
+
+    @staticmethod
+    def replace_password(app: str, username: str, old_password: bytes or str, new_password: bytes) -> bool:
+        """
+        Takes account and its encrypted password and replaces password with re-encrypted one, only if it was not
+        changed in the meantime. Used to upgrade password format when password is read.
+        :param str app: Name of app or web page.
+        :param str username: Username for app or web page.
+        :param bytes or str old_password: Encrypted password which was read.
+        :param bytes new_password: Same password encrypted in current format.
+        :return bool: True if password was replaced, otherwise False.
+        """
+        with DataProcessor.transaction() as con:
+            cur = con.execute(
+                "UPDATE password_manager SET password=? WHERE app_key=? AND username=? AND password=?",
+                (new_password, DataProcessor.normalize_app(app), username, old_password)
+            )
+            return cur.rowcount == 1
+
+    @staticmethod
+    def count_records(after_id: int = 0) -> int:
+        """
+        Returns number of records.
+        :param int after_id: Only records with row id greater than this are counted.
+        :return int: Number of records.
+        """
+        return DataProcessor.connect().execute(
+            "SELECT COUNT(*) FROM password_manager WHERE id>?", (after_id,)
+        ).fetchone()[0]
+
+    @staticmethod
+    def update_passwords(rows: list, checkpoint: int = None):
+        """
+        Takes list of (id, password) tuples and replaces passwords of records in single transaction. If checkpoint is
+        given, it is saved as key rotation progress in the same transaction.
+        :param list rows: List of tuples with record id and new encrypted password.
+        :param int checkpoint: Id of last re-encrypted record.
+        """
+        with DataProcessor.transaction() as con:
+            con.executemany("UPDATE password_manager SET password=? WHERE id=?", ((pw, id_) for id_, pw in rows))
+            if checkpoint is not None:
+                con.execute("UPDATE key_rotation SET last_id=? WHERE id=1", (checkpoint,))
+
+    @staticmethod
+    def get_rotation_checkpoint() -> int or None:
+        """
+        Returns id of last record re-encrypted by unfinished key rotation.
+        :return int or None: Record id, None if no key rotation is in progress.
+        """
+        row = DataProcessor.connect().execute("SELECT last_id FROM key_rotation WHERE id=1").fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def start_rotation():
+        """
+        Marks key rotation as started, no record is re-encrypted yet.
+        """
+        with DataProcessor.transaction() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO key_rotation (id, last_id, started_at) VALUES (1, 0, ?)", (time.time(),)
+            )
+
+    @staticmethod
+    def finish_rotation():
+        """
+        Marks key rotation as finished.
+        """
+        with DataProcessor.transaction() as con:
+            con.execute("DELETE FROM key_rotation")
 
     @staticmethod
     def delete_table():
         """
-        Deletes password_manager table.
+        Deletes password_manager table and key rotation progress.
         """
-        with sqlite3.connect(DataProcessor.DB_PATH) as con:
-            cur = con.cursor()
-            cur.execute("DROP TABLE IF EXISTS password_manager")
-            con.commit()
+        with DataProcessor.transaction() as con:
+            con.execute("DROP TABLE IF EXISTS password_manager")
+            con.execute("DROP TABLE IF EXISTS key_rotation")
 
     @staticmethod
     def save_preferences(data: dict):
         """
-        Takes data as dictionary and saves to data.json file. If file not exists, creates one.
+        Takes data as dictionary and merges it into user preferences, changes are written to data.json file
+        shortly after last call.
         :param data: Dictionary containing user preferences.
         """
-        content: dict = {}
-        try:
-            with open("pwm_data/data.json") as data_file:
-                content = json.load(data_file)
-            content.update(data)
-        except (FileNotFoundError, ValueError):
-            content = data
-        finally:
-            with open("pwm_data/data.json", "w") as data_file:
-                json.dump(content, data_file, indent=4)
+        DataProcessor.preferences.update(data)
 
     @staticmethod
     def load_preferences() -> dict or None:
         """
-        Loads and returns user preferences from data.json file as dictionary, if nothing found,
-        returns None.
+        Returns user preferences as dictionary, if nothing found, returns None. File is read only once.
         :return dict or None: Dictionary or None.
         """
-        try:
-            with open("pwm_data/data.json") as data_file:
-                data = json.load(data_file)
-                return data
-        except (FileNotFoundError, ValueError):
-            return None
+        return DataProcessor.preferences.load() or None
 
     @staticmethod
     def delete_preferences():
         """
-        Deletes data.json file if exists.
+        Clears user preferences and deletes data.json file if exists.
         """
-        if os.path.exists("pwm_data/data.json"):
-            os.remove("pwm_data/data.json")
+        DataProcessor.preferences.delete()
@@ -0,0 +1,151 @@
+import queue
+import threading
+from itertools import groupby
+
+
+class DatabaseWorker:
+    """
+    Encapsulates background thread which runs all database work, so GUI thread never waits for disk. Jobs are taken
+    from queue in order they were submitted. Consecutive writes waiting in queue are committed together in single
+    transaction, every write runs in its own savepoint so failed write does not undo others. Results are collected
+    in result queue and passed to callbacks when GUI thread calls poll.
+    """
+
+    # Maximum number of queued jobs taken by worker at once.
+    MAX_BATCH: int = 100
+
+    # Marks end of job queue.
+    _STOP = object()
+
+    def __init__(self, data_processor):
+        """
+        Initializes database worker.
+        :param data_processor: DataProcessor class used to access database.
+        """
+        self.data_processor = data_processor
+        self._jobs = queue.Queue()
+        self._results = queue.SimpleQueue()
+        self._thread: threading.Thread or None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        Starts worker thread if it is not running.
+        """
+        if not self.running:
+            self._thread = threading.Thread(target=self._run, name="DatabaseWorker", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Asks worker thread to finish, jobs submitted before are still processed.
+        """
+        self._jobs.put(self._STOP)
+
+    def join(self, timeout: float = None):
+        """
+        Waits until worker thread finishes, used when closing app and in tests.
+        :param float timeout: Maximum time to wait in seconds.
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def submit(self, function, *args, callback=None, error=None):
+        """
+        Queues job which runs on its own, outside of grouped transaction. Used for reads and for work which manages
+        transactions or connection itself.
+        :param function: Function to run on worker thread.
+        :param args: Arguments passed to function.
+        :param callback: Optional function called from poll with function's return value.
+        :param error: Optional function called from poll with exception raised by function.
+        """
+        self._jobs.put((function, args, False, callback, error))
+
+    def write(self, function, *args, callback=None, error=None):
+        """
+        Queues job which is committed together with other queued writes.
+        :param function: Function to run on worker thread.
+        :param args: Arguments passed to function.
+        :param callback: Optional function called from poll with function's return value after commit.
+        :param error: Optional function called from poll with exception raised by function or by commit.
+        """
+        self._jobs.put((function, args, True, callback, error))
+
+    def poll(self) -> int:
+        """
+        Passes finished jobs' results to their callbacks, must be called from GUI thread. Exception of job without
+        error callback is raised here, remaining results are delivered on next call.
+        :return int: Number of delivered results.
+        """
+        delivered = 0
+        while True:
+            try:
+                callback, error, value, failed = self._results.get_nowait()
+            except queue.Empty:
+                return delivered
+            delivered += 1
+            if failed and error is not None:
+                error(value)
+            elif failed:
+                raise value
+            elif callback is not None:
+                callback(value)
+
+    def _run(self):
+        """
+        Takes jobs from queue in batches and runs them until stopped.
+        """
+        while True:
+            batch = [self._jobs.get()]
+            while len(batch) < self.MAX_BATCH:
+                try:
+                    batch.append(self._jobs.get_nowait())
+                except queue.Empty:
+                    break
+            stop = self._STOP in batch
+            if stop:
+                batch = batch[:batch.index(self._STOP)]
+            for write, jobs in groupby(batch, key=lambda job: job[2]):
+                if write:
+                    self._write_jobs(list(jobs))
+                else:
+                    for job in jobs:
+                        self._results.put(self._execute(job))
+            if stop:
+                return
+
+    @staticmethod
+    def _execute(job) -> tuple:
+        """
+        Takes job, runs it and returns result entry.
+        :param tuple job: Job tuple.
+        :return tuple: Callback, error callback, return value or exception and whether job failed.
+        """
+        function, args, _, callback, error = job
+        try:
+            return callback, error, function(*args), False
+        except Exception as exception:
+            return callback, error, exception, True
+
+    def _write_jobs(self, jobs: list):
+        """
+        Takes list of write jobs and runs them in single transaction. Results are published only after commit,
+        if commit fails all jobs are reported as failed.
+        :param list jobs: Write jobs.
+        """
+        results: list = []
+        try:
+            with self.data_processor.transaction():
+                for function, args, _, callback, error in jobs:
+                    try:
+                        with self.data_processor.transaction():
+                            results.append((callback, error, function(*args), False))
+                    except Exception as exception:
+                        results.append((callback, error, exception, True))
+        except Exception as exception:
+            results = [(callback, error, exception, True) for _, _, _, callback, error in jobs]
+        for result in results:
+            self._results.put(result)
@@ -0,0 +1,124 @@
+import os
+import threading
+from .data_processor import DataProcessor
+
+
+class KeyRotator:
+    """
+    Encapsulates rotation of key used to encrypt stored passwords. New key is generated while old key stays in
+    keyring, so every password can be decrypted during rotation. Passwords are re-encrypted batch by batch and id of
+    last re-encrypted record is saved in the same transaction as batch, so interrupted rotation resumes where it
+    stopped. Old keys are deleted once all passwords are re-encrypted. The same machinery upgrades passwords stored
+    in legacy Fernet format to current format. Rotator stops between batches once stop is called or cached secrets
+    are wiped, remaining passwords are processed on next resume.
+    """
+
+    # Number of records re-encrypted and written to database in one transaction.
+    BATCH_SIZE: int = 2000
+
+    def __init__(self, security_engine, workers: int = None):
+        """
+        Initializes key rotator.
+        :param security_engine: SecurityEngine class holding keys.
+        :param int workers: Number of threads used for re-encryption, defaults to number of CPUs.
+        """
+        self.security_engine = security_engine
+        self.workers = workers or os.cpu_count() or 1
+        self._stop = threading.Event()
+
+    def stop(self):
+        """
+        Asks rotator to stop before next batch, called from other thread when user logs out.
+        """
+        self._stop.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set() or self.security_engine.crypt_engine is None
+
+    @staticmethod
+    def in_progress() -> bool:
+        """
+        Checks if interrupted key rotation is waiting to be resumed.
+        :return bool: True if key rotation was started and not finished, otherwise False.
+        """
+        return DataProcessor.get_rotation_checkpoint() is not None
+
+    def rotate(self, progress=None) -> int:
+        """
+        Generates new key and re-encrypts all stored passwords with it. Unfinished rotation is resumed instead.
+        :param progress: Optional function called with number of re-encrypted and total number of records after
+        every batch.
+        :return int: Number of re-encrypted records.
+        """
+        if not self.in_progress():
+            DataProcessor.start_rotation()
+            self.security_engine.rotate_key()
+        return self.resume(progress)
+
+    def resume(self, progress=None) -> int:
+        """
+        Re-encrypts passwords following last checkpoint of unfinished key rotation and deletes previous keys when
+        done. Does nothing if no rotation is in progress.
+        :param progress: Optional function called with number of re-encrypted and total number of records after
+        every batch.
+        :return int: Number of re-encrypted records.
+        """
+        last_id = DataProcessor.get_rotation_checkpoint()
+        if last_id is None:
+            return 0
+        total = DataProcessor.count_records(last_id)
+        rotated = 0
+        for batch in self._reencrypt(DataProcessor.get_passwords, last_id):
+            DataProcessor.update_passwords(batch, checkpoint=batch[-1][0])
+            rotated += len(batch)
+            if progress is not None:
+                progress(rotated, total)
+        if self.stopped:
+            return rotated
+        DataProcessor.finish_rotation()
+        self.security_engine.retire_previous_keys()
+        return rotated
+
+    def upgrade(self, progress=None) -> int:
+        """
+        Re-encrypts passwords stored in legacy Fernet format to current format. Upgraded records no longer match,
+        so interrupted upgrade simply continues on next call.
+        :param progress: Optional function called with number of upgraded and total number of legacy records after
+        every batch.
+        :return int: Number of upgraded records.
+        """
+        total = DataProcessor.count_legacy_passwords()
+        upgraded = 0
+        if not total:
+            return upgraded
+        for batch in self._reencrypt(DataProcessor.get_legacy_passwords, 0):
+            DataProcessor.update_passwords(batch)
+            upgraded += len(batch)
+            if progress is not None:
+                progress(upgraded, total)
+        return upgraded
+
+    def _batches(self, fetch, last_id: int):
+        """
+        Takes fetch function and checkpoint and yields following records batch by batch.
+        :param fetch: Function returning batch of (id, password) tuples following given id.
+        :param int last_id: Id of last re-encrypted record.
+        :return: Generator of lists with (id, password) tuples.
+        """
+        while batch := fetch(last_id, self.BATCH_SIZE):
+            yield batch
+            last_id = batch[-1][0]
+
+    def _reencrypt(self, fetch, last_id: int):
+        """
+        Takes fetch function and checkpoint and yields re-encrypted batches in order.
+        :param fetch: Function returning batch of (id, password) tuples following given id.
+        :param int last_id: Id of last re-encrypted record.
+        :return: Generator of lists with (id, password) tuples.
+        """
+        for batch in self._batches(fetch, last_id):
+            if self.stopped:
+                return
+            passwords = self.security_engine.reencrypt_many((password for _, password in batch), self.workers)
+            yield [(id_, password) for (id_, _), password in zip(batch, passwords)]
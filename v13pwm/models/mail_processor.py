@@ -1,6 +1,13 @@
-from email_validator import validate_email, EmailNotValidError
-import smtplib
+from email_validator import validate_email, EmailNotValidError, EmailUndeliverableError
+from email_validator.deliverability import validate_email_deliverability
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import dns.exception
+import dns.resolver
+import threading
+import time
 import os
+from .mail_queue import MailQueue
+from .mail_transport import FileTransport, MailTransport, MemoryTransport, SmtpTransport
 
 
 class MailProcessor:
@@ -8,53 +15,161 @@ class MailProcessor:
     Encapsulates logic related to sending and validating e-mails.
     """
 
-    EMAIL = os.environ["EMAIL"]
-    PASSWORD = os.environ["PASSWORD"]
+    # Default SMTP server, can be changed with SMTP_SERVER and SMTP_PORT environment variables.
     SMTP_SERVER = "smtp.gmail.com"
     SMTP_PORT = 587
 
-    @staticmethod
-    def validate(email: str) -> str or None:
+    # Default directory e-mails are written to by file transport, can be changed with MAIL_DIR environment variable.
+    MAIL_DIR = "pwm_data/mail"
+
+    # Name of transport used if MAIL_TRANSPORT environment variable is not set.
+    DEFAULT_TRANSPORT = "smtp"
+
+    # Subject of e-mail with security token.
+    TOKEN_SUBJECT = "V13 Password Manager authentication token"
+
+    # Time in seconds validation waits for domain lookup before falling back to syntax check only.
+    VALIDATION_TIMEOUT: float = 3.0
+
+    # Time in seconds single DNS query may take.
+    DNS_TIMEOUT: float = 5.0
+
+    # Time in seconds deliverable and undeliverable domain results are cached for.
+    DOMAIN_TTL: float = 60 * 60
+    UNDELIVERABLE_TTL: float = 60 * 5
+
+    # Domain name as key and tuple with expiry time and error message or None as value.
+    _domain_cache: dict = {}
+
+    # Domain name as key and future of running lookup as value.
+    _lookups: dict = {}
+
+    _domain_lock = threading.Lock()
+    _executor: ThreadPoolExecutor or None = None
+    _resolver: dns.resolver.Resolver or None = None
+
+    @classmethod
+    def validate(cls, email: str, timeout: float = None) -> str or None:
         """
-        Takes email address, checks if syntax and domain name are correct.
+        Takes email address, checks if syntax is correct and if domain accepts e-mail. Deliverability of every domain
+        is looked up once and cached. If lookup does not finish in time, e.g. when offline, only syntax is checked
+        and lookup finishes in background, so its result is cached for next call.
         :param str email: E-mail address to validate
+        :param float timeout: Maximum time in seconds to wait for domain lookup, defaults to VALIDATION_TIMEOUT.
         :return None or str: None if email is valid, otherwise returns user-friendly error message as string.
         """
         try:
-            validate_email(email.strip(), check_deliverability=True)
+            validated = validate_email(email.strip(), check_deliverability=False)
         except EmailNotValidError as error:
             return str(error)
-        else:
+        return cls.check_domain(validated.ascii_domain, validated.domain, timeout)
+
+    @classmethod
+    def check_domain(cls, domain: str, domain_i18n: str, timeout: float = None) -> str or None:
+        """
+        Takes domain name and returns cached deliverability result or looks it up, waiting at most timeout seconds.
+        Concurrent checks of the same domain share one lookup.
+        :param str domain: Domain name in ASCII form.
+        :param str domain_i18n: Domain name as entered, used in error message.
+        :param float timeout: Maximum time in seconds to wait for lookup, defaults to VALIDATION_TIMEOUT.
+        :return None or str: Error message if domain does not accept e-mail, None if it does or if it is unknown.
+        """
+        with cls._domain_lock:
+            cached = cls._domain_cache.get(domain)
+            if cached is not None and cached[0] > time.monotonic():
+                return cached[1]
+            lookup = cls._lookups.get(domain)
+            if lookup is None:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="DomainLookup")
+                lookup = cls._executor.submit(cls._lookup, domain, domain_i18n)
+                cls._lookups[domain] = lookup
+        try:
+            return lookup.result(timeout=cls.VALIDATION_TIMEOUT if timeout is None else timeout)
+        except TimeoutError:
             return None
 
-    @staticmethod
-    def send_token(email: str, token: str) -> bool:
+    @classmethod
+    def _lookup(cls, domain: str, domain_i18n: str) -> str or None:
+        """
+        Takes domain name, looks up its MX or address records and caches result. Results of lookups which failed
+        because DNS did not answer are not cached.
+        :param str domain: Domain name in ASCII form.
+        :param str domain_i18n: Domain name as entered, used in error message.
+        :return None or str: Error message if domain does not accept e-mail, None if it does or if it is unknown.
         """
-        Takes recipient email address and token to send, sends e-mail.
+        error = None
+        ttl = cls.DOMAIN_TTL
+        try:
+            if cls._resolver is None:
+                cls._resolver = dns.resolver.Resolver()
+                cls._resolver.lifetime = cls.DNS_TIMEOUT
+            info = validate_email_deliverability(domain, domain_i18n, dns_resolver=cls._resolver)
+            if "unknown-deliverability" in info:
+                ttl = 0
+        except EmailUndeliverableError as undeliverable:
+            error = str(undeliverable)
+            ttl = cls.UNDELIVERABLE_TTL
+        except dns.exception.DNSException:
+            ttl = 0
+        with cls._domain_lock:
+            if ttl:
+                cls._domain_cache[domain] = (time.monotonic() + ttl, error)
+            cls._lookups.pop(domain, None)
+        return error
+
+    @classmethod
+    def clear_domain_cache(cls):
+        """
+        Drops all cached deliverability results.
+        """
+        with cls._domain_lock:
+            cls._domain_cache.clear()
+
+    @classmethod
+    def create_transport(cls, environ: dict = None) -> MailTransport:
+        """
+        Creates mail transport chosen by MAIL_TRANSPORT environment variable:
+        smtp - sends through SMTP server, requires EMAIL and PASSWORD, optionally SMTP_SERVER and SMTP_PORT
+        file - writes e-mails to Maildir directory MAIL_DIR
+        memory - keeps e-mails in memory
+        :param dict environ: Configuration, defaults to environment variables.
+        :return MailTransport: Mail transport.
+        :raises ValueError: If transport is unknown or its configuration is missing.
+        """
+        environ = os.environ if environ is None else environ
+        name = environ.get("MAIL_TRANSPORT", cls.DEFAULT_TRANSPORT).strip().lower()
+        if name == "smtp":
+            if not environ.get("EMAIL") or not environ.get("PASSWORD"):
+                raise ValueError("set EMAIL and PASSWORD environment variables to send e-mails.")
+            return SmtpTransport(
+                environ.get("SMTP_SERVER", cls.SMTP_SERVER),
+                int(environ.get("SMTP_PORT", cls.SMTP_PORT)),
+                environ["EMAIL"],
+                environ["PASSWORD"]
+            )
+        if name == "file":
+            return FileTransport(environ.get("MAIL_DIR", cls.MAIL_DIR))
+        if name == "memory":
+            return MemoryTransport()
+        raise ValueError(f"unknown mail transport {name}, use smtp, file or memory.")
+
+    @classmethod
+    def create_queue(cls) -> MailQueue:
+        """
+        Creates mail queue, its transport is created from environment variables when first e-mail is sent.
+        :return MailQueue: Mail queue, not started.
+        """
+        return MailQueue(cls.create_transport)
+
+    @classmethod
+    def send_token(cls, mail_queue: MailQueue, email: str, token: str, callback=None) -> bool:
+        """
+        Takes recipient email address and token to send, queues e-mail for sending on mail queue's thread.
+        :param MailQueue mail_queue: Mail queue which sends e-mail.
         :param str email: Recipients e-mail address
         :param str token: Token to send
-        :return bool: True if operation was successful, False and prints error message to console if operation failed
+        :param callback: Optional function called on GUI thread with sending status and error message or None.
+        :return bool: True if e-mail was queued, False if too many e-mails are waiting to be sent
         """
-        try:
-            with smtplib.SMTP(MailProcessor.SMTP_SERVER, MailProcessor.SMTP_PORT) as connection:
-                connection.starttls()
-                connection.login(user=MailProcessor.EMAIL, password=MailProcessor.PASSWORD)
-                connection.sendmail(
-                    from_addr=MailProcessor.EMAIL,
-                    to_addrs=email,
-                    msg=f"Subject: V13 Password Manager authentication token\n\n"
-                        f"Your authentication token - {token}"
-                )
-                return True
-        except smtplib.SMTPAuthenticationError:
-            print("SMTP authentication error: Invalid username or password.")
-            return False
-        except smtplib.SMTPException as smtp_error:
-            print(f"SMTP error: {smtp_error}")
-            return False
-        except OSError as os_error:
-            print(f"OS error: {os_error}")
-            return False
-        except KeyError as key_error:
-            print(f"Key error {key_error}")
-            return False
+        return mail_queue.send(email, cls.TOKEN_SUBJECT, f"Your authentication token - {token}", callback)
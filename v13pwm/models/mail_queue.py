@@ -0,0 +1,191 @@
+import queue
+import smtplib
+import threading
+from email.message import EmailMessage
+
+
+class MailQueue:
+    """
+    Encapsulates background thread which sends e-mails, so GUI thread never waits for mail server. Messages are
+    taken from bounded queue and handed to mail transport, which is created on first message, so missing mail
+    configuration only fails sending. Transport may keep connection open between messages, it is closed after
+    queue is idle for a while. Temporary failures are retried with exponential backoff, permanent ones fail at
+    once. Status of every message is collected in result queue and passed to its callback when GUI thread calls
+    poll.
+    """
+
+    # Statuses passed to callbacks.
+    SENT: str = "sent"
+    RETRYING: str = "retrying"
+    FAILED: str = "failed"
+
+    # Maximum number of messages waiting to be sent.
+    MAX_SIZE: int = 20
+
+    # Number of attempts to send one message before it fails.
+    MAX_ATTEMPTS: int = 4
+
+    # Delay in seconds before first retry, doubled with every following retry up to MAX_BACKOFF.
+    BACKOFF: float = 1.0
+    MAX_BACKOFF: float = 30.0
+
+    # Time in seconds after which transport of idle queue is closed.
+    IDLE_TIMEOUT: float = 60.0
+
+    # Marks end of message queue.
+    _STOP = object()
+
+    def __init__(self, transport_factory, max_size: int = None):
+        """
+        Initializes mail queue.
+        :param transport_factory: Function returning MailTransport, called on sender thread before first message.
+        :param int max_size: Maximum number of waiting messages, defaults to MAX_SIZE.
+        """
+        self.transport_factory = transport_factory
+        self._messages = queue.Queue(maxsize=max_size or self.MAX_SIZE)
+        self._results = queue.SimpleQueue()
+        self._stopping = threading.Event()
+        self._transport = None
+        self._thread: threading.Thread or None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        Starts sender thread if it is not running.
+        """
+        if not self.running:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="MailQueue", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Asks sender thread to finish after messages queued before, waiting retries are cut short.
+        """
+        self._stopping.set()
+        self._messages.put(self._STOP)
+
+    def join(self, timeout: float = None):
+        """
+        Waits until sender thread finishes, used when closing app and in tests.
+        :param float timeout: Maximum time to wait in seconds.
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def send(self, to: str, subject: str, body: str, callback=None) -> bool:
+        """
+        Queues message for sending, does not wait for mail server.
+        :param str to: Recipient e-mail address.
+        :param str subject: Message subject.
+        :param str body: Message text.
+        :param callback: Optional function called from poll with status and error message or None, called with
+        RETRYING status before every retry and with SENT or FAILED status once message is done.
+        :return bool: True if message was queued, False if queue is full.
+        """
+        message = EmailMessage()
+        message["To"] = to
+        message["Subject"] = subject
+        message.set_content(body)
+        try:
+            self._messages.put_nowait((message, callback))
+        except queue.Full:
+            return False
+        return True
+
+    def poll(self) -> int:
+        """
+        Passes statuses of queued messages to their callbacks, must be called from GUI thread.
+        :return int: Number of delivered statuses.
+        """
+        delivered = 0
+        while True:
+            try:
+                callback, status, error = self._results.get_nowait()
+            except queue.Empty:
+                return delivered
+            delivered += 1
+            if callback is not None:
+                callback(status, error)
+
+    def _run(self):
+        """
+        Takes messages from queue and sends them until stopped, closes transport when queue stays empty.
+        """
+        while True:
+            try:
+                job = self._messages.get(timeout=self.IDLE_TIMEOUT)
+            except queue.Empty:
+                self._close_transport()
+                continue
+            if job is self._STOP:
+                self._close_transport()
+                return
+            self._deliver(*job)
+
+    def _deliver(self, message: EmailMessage, callback):
+        """
+        Takes message and sends it, retrying temporary failures with exponential backoff. Transport is created
+        before first message, failure to create it fails message.
+        :param EmailMessage message: Message to send.
+        :param callback: Status callback of message.
+        """
+        delay = self.BACKOFF
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            try:
+                if self._transport is None:
+                    self._transport = self.transport_factory()
+                del message["From"]
+                message["From"] = self._transport.sender
+                self._transport.send(message)
+            except Exception as error:
+                self._close_transport()
+                if not self.is_temporary(error) or attempt == self.MAX_ATTEMPTS or self._stopping.is_set():
+                    self._results.put((callback, self.FAILED, self.describe(error)))
+                    return
+                self._results.put((callback, self.RETRYING, self.describe(error)))
+                self._stopping.wait(delay)
+                delay = min(delay * 2, self.MAX_BACKOFF)
+            else:
+                self._results.put((callback, self.SENT, None))
+                return
+
+    def _close_transport(self):
+        """
+        Releases resources held by transport, e.g. closes its connection.
+        """
+        if self._transport is not None:
+            self._transport.close()
+
+    @staticmethod
+    def is_temporary(error: Exception) -> bool:
+        """
+        Takes exception raised while sending and decides if sending again can succeed.
+        :param Exception error: Raised exception.
+        :return bool: True for dropped connections, network errors and 4xx replies, otherwise False.
+        """
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            return all(400 <= code < 500 for code, _ in error.recipients.values())
+        if isinstance(error, smtplib.SMTPResponseException):
+            return 400 <= error.smtp_code < 500
+        return isinstance(error, (smtplib.SMTPServerDisconnected, OSError))
+
+    @staticmethod
+    def describe(error: Exception) -> str:
+        """
+        Takes exception raised while sending and returns user-friendly error message.
+        :param Exception error: Raised exception.
+        :return str: Error message.
+        """
+        if isinstance(error, smtplib.SMTPAuthenticationError):
+            return "SMTP authentication error: Invalid username or password."
+        if isinstance(error, smtplib.SMTPException):
+            return f"SMTP error: {error}"
+        if isinstance(error, OSError):
+            return f"OS error: {error}"
+        if isinstance(error, ValueError):
+            return f"Mail configuration error: {error}"
+        return f"{type(error).__name__}: {error}"
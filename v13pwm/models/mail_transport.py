@@ -0,0 +1,158 @@
+from abc import ABC, abstractmethod
+import mailbox
+import os
+import smtplib
+from email.message import EmailMessage
+
+
+class MailTransport(ABC):
+    """
+    Encapsulates way e-mails leave the app. Transport is used from single thread of mail queue, it may keep
+    resources like connections open between messages until close is called.
+    """
+
+    def __init__(self, sender: str = ""):
+        """
+        Initializes transport.
+        :param str sender: Sender address put to From header of sent e-mails.
+        """
+        self.sender = sender
+
+    @abstractmethod
+    def send(self, message: EmailMessage):
+        """
+        Takes message and delivers it.
+        :param EmailMessage message: Message to send.
+        """
+
+    def close(self):
+        """
+        Releases resources held between messages.
+        """
+
+
+class SmtpTransport(MailTransport):
+    """
+    Encapsulates sending e-mails through SMTP server. Connection stays open and authenticated between messages,
+    connection closed by server while it was idle is reopened once without raising.
+    """
+
+    # Socket timeout in seconds of SMTP connection.
+    TIMEOUT: float = 10.0
+
+    def __init__(self, host: str, port: int, user: str or None = None, password: str or None = None,
+                 starttls: bool = True):
+        """
+        Initializes SMTP transport, connection is opened on first send.
+        :param str host: SMTP server address.
+        :param int port: SMTP server port.
+        :param str or None user: Login user name and sender address, login is skipped if None.
+        :param str or None password: Login password.
+        :param bool starttls: Whether to upgrade connection with STARTTLS before login.
+        """
+        super().__init__(user or "")
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self._connection: smtplib.SMTP or None = None
+
+    def send(self, message: EmailMessage):
+        """
+        Takes message and sends it over open connection. If server closed reused connection while it was idle,
+        connection is reopened and message is sent once more.
+        :param EmailMessage message: Message to send.
+        """
+        reused = self._connection is not None
+        try:
+            self._connect().send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            if not reused:
+                raise
+            self._connect().send_message(message)
+
+    def _connect(self) -> smtplib.SMTP:
+        """
+        Returns open connection, opens and authenticates new one if there is none.
+        :return smtplib.SMTP: Connection to SMTP server.
+        """
+        if self._connection is None:
+            connection = smtplib.SMTP(self.host, self.port, timeout=self.TIMEOUT)
+            try:
+                if self.starttls:
+                    connection.starttls()
+                if self.user is not None:
+                    connection.login(user=self.user, password=self.password)
+            except Exception:
+                connection.close()
+                raise
+            self._connection = connection
+        return self._connection
+
+    def close(self):
+        """
+        Ends SMTP session and closes connection if one is open.
+        """
+        if self._connection is not None:
+            try:
+                self._connection.quit()
+            except (smtplib.SMTPException, OSError):
+                self._connection.close()
+            self._connection = None
+
+
+class FileTransport(MailTransport):
+    """
+    Encapsulates writing e-mails to local Maildir directory instead of sending them, every message is stored as
+    separate file readable by any mail client. Used to work with tokens offline.
+    """
+
+    def __init__(self, directory: str, sender: str = "v13pwm@localhost"):
+        """
+        Initializes file transport, directory and its Maildir folders are created on first send.
+        :param str directory: Maildir directory.
+        :param str sender: Sender address put to From header of written e-mails.
+        """
+        super().__init__(sender)
+        self.directory = directory
+        self._maildir: mailbox.Maildir or None = None
+
+    def send(self, message: EmailMessage):
+        """
+        Takes message and writes it to new folder of Maildir as separate file.
+        :param EmailMessage message: Message to write.
+        """
+        if self._maildir is None:
+            for folder in ("tmp", "new", "cur"):
+                os.makedirs(os.path.join(self.directory, folder), mode=0o700, exist_ok=True)
+            self._maildir = mailbox.Maildir(self.directory, create=False)
+        self._maildir.add(message)
+
+    def close(self):
+        """
+        Drops Maildir handle, it is opened again on next send.
+        """
+        self._maildir = None
+
+
+class MemoryTransport(MailTransport):
+    """
+    Encapsulates keeping e-mails in list instead of sending them, used in tests and benchmarks.
+    """
+
+    def __init__(self, sender: str = "v13pwm@localhost"):
+        """
+        Initializes memory transport.
+        :param str sender: Sender address put to From header of kept e-mails.
+        """
+        super().__init__(sender)
+        self.messages: list = []
+
+    def send(self, message: EmailMessage):
+        """
+        Takes message and appends it to list of kept messages.
+        :param EmailMessage message: Message to keep.
+        """
+        self.messages.append(message)
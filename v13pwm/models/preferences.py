@@ -0,0 +1,140 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class Preferences:
+    """
+    Encapsulates user preferences kept in memory. File is read once on first access, changes are merged in memory
+    and written once no change came for short delay, so burst of changes results in single write. Single timer is
+    kept for whole burst, every change only moves its deadline. File is replaced atomically, so
+    crash during write leaves previous version intact.
+    """
+
+    # Time in seconds waited after last change before preferences are written to file.
+    FLUSH_DELAY: float = 0.5
+
+    def __init__(self, path: str, flush_delay: float = None):
+        """
+        Initializes preferences store.
+        :param str path: Path to JSON file holding preferences.
+        :param float flush_delay: Seconds to wait before writing changes, defaults to FLUSH_DELAY.
+        """
+        self.path = path
+        self.flush_delay = self.FLUSH_DELAY if flush_delay is None else flush_delay
+        self._data: dict or None = None
+        self._dirty: bool = False
+        self._timer: threading.Timer or None = None
+        self._deadline: float = 0.0
+        self._lock = threading.RLock()
+        atexit.register(self.flush)
+
+    def load(self) -> dict:
+        """
+        Returns copy of preferences, reads file only on first call.
+        :return dict: User preferences, empty if file does not exist or can not be parsed.
+        """
+        with self._lock:
+            if self._data is None:
+                try:
+                    with open(self.path) as data_file:
+                        self._data = json.load(data_file)
+                except (FileNotFoundError, ValueError):
+                    self._data = {}
+            return dict(self._data)
+
+    def get(self, key: str, default=None):
+        """
+        Takes preference name and returns its value.
+        :param str key: Preference name.
+        :param default: Value returned if preference is not set.
+        :return: Preference value.
+        """
+        return self.load().get(key, default)
+
+    def update(self, data: dict):
+        """
+        Takes dictionary of preferences, merges it into stored preferences and schedules write to file.
+        Values equal to already stored ones do not cause write.
+        :param dict data: Dictionary containing user preferences.
+        """
+        with self._lock:
+            self.load()
+            changed = {key: value for key, value in data.items() if self._data.get(key, object()) != value}
+            if not changed:
+                return
+            self._data.update(changed)
+            self._dirty = True
+            self._deadline = time.monotonic() + self.flush_delay
+            if self._timer is None:
+                self._start_timer(self.flush_delay)
+
+    def _start_timer(self, delay: float):
+        """
+        Takes delay and starts timer which flushes changes once deadline passes.
+        :param float delay: Seconds to wait.
+        """
+        self._timer = threading.Timer(delay, self._flush_when_due)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_when_due(self):
+        """
+        Called by timer, writes changes if deadline passed, otherwise waits again until deadline moved by later
+        changes. Timer replaced or cancelled meanwhile does nothing.
+        """
+        with self._lock:
+            if threading.current_thread() is not self._timer:
+                return
+            remaining = self._deadline - time.monotonic()
+            if remaining > 0:
+                self._start_timer(remaining)
+            else:
+                self.flush()
+
+    def flush(self):
+        """
+        Writes pending changes to file right away.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            self._write(self._data)
+            self._dirty = False
+
+    def delete(self):
+        """
+        Drops pending changes, clears preferences and deletes file if exists.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._data = {}
+            self._dirty = False
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def _write(self, data: dict):
+        """
+        Takes preferences and writes them to temporary file in the same directory, which then replaces old file.
+        :param dict data: Dictionary containing user preferences.
+        """
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".data-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as data_file:
+                json.dump(data, data_file, indent=4)
+                data_file.flush()
+                os.fsync(data_file.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
@@ -0,0 +1,304 @@
+class SchemaMigrator:
+    """
+    Encapsulates versioned migrations of password_manager table. Current schema version is stored in database header
+    using PRAGMA user_version. Every migration may first do long running work in short batched transactions which can
+    be safely repeated if interrupted, then finishes in single transaction together with version bump, so database
+    is never left with half-applied schema version.
+    """
+
+    # Number of rows rewritten in one transaction.
+    BATCH_SIZE: int = 5000
+
+    TABLE: str = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        id integer PRIMARY KEY,
+        app text NOT NULL,
+        username text,
+        password text,
+        app_key text NOT NULL,
+        use_count integer NOT NULL DEFAULT 0,
+        last_used_at real,
+        frecency real,
+        created_at real,
+        updated_at real
+    )"""
+
+    # Rows shadowed by older row with the same app key, kept aside until accounts get unique username per app.
+    DUPLICATES_TABLE: str = """
+    CREATE TABLE IF NOT EXISTS password_manager_duplicates (
+        app text,
+        username text,
+        password text,
+        app_key text
+    )"""
+
+    KEY_ROTATION_TABLE: str = """
+    CREATE TABLE IF NOT EXISTS key_rotation (
+        id integer PRIMARY KEY CHECK (id=1),
+        last_id integer NOT NULL,
+        started_at real
+    )"""
+
+    INDEXES: tuple = (
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_password_manager_app_key_username 
+        ON password_manager (app_key, username)""",
+        "CREATE INDEX IF NOT EXISTS idx_password_manager_frecency ON password_manager (frecency DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_password_manager_last_used_at ON password_manager (last_used_at DESC)",
+    )
+
+    def __init__(self, data_processor, progress=None):
+        """
+        Initializes schema migrator.
+        :param data_processor: DataProcessor class used to access database.
+        :param progress: Optional function called with migration version, description and number of processed rows
+        after every batch.
+        """
+        self.data_processor = data_processor
+        self.progress = progress
+        self.migrations: list = [
+            (1, "Create password_manager table", None, self._create_legacy_table),
+            (2, "Add normalized app key", self._backfill_app_key, self._index_app_key),
+            (3, "Add usage tracking", None, self._add_usage_tracking),
+            (4, "Add ids and timestamps", self._copy_to_new_table, self._replace_table),
+            (5, "Allow multiple accounts per app", self._number_duplicate_usernames, self._index_app_key_username),
+            (6, "Add key rotation checkpoint", None, self._create_key_rotation_table),
+        ]
+
+    @property
+    def latest_version(self) -> int:
+        return self.migrations[-1][0]
+
+    def version(self) -> int:
+        """
+        Returns schema version of database.
+        :return int: Schema version, 0 if database was never migrated.
+        """
+        return self.data_processor.connect().execute("PRAGMA user_version").fetchone()[0]
+
+    def _table_exists(self, name: str) -> bool:
+        """
+        Takes table name and checks if table exists.
+        :param str name: Table name.
+        :return bool: True if table exists, otherwise False.
+        """
+        cur = self.data_processor.connect().execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=?", (name,)
+        )
+        return cur.fetchone() is not None
+
+    def _columns(self) -> list:
+        """
+        Returns column names of password_manager table.
+        :return list: Column names.
+        """
+        return [row[1] for row in self.data_processor.connect().execute("PRAGMA table_info(password_manager)")]
+
+    def migrate(self) -> int:
+        """
+        Brings database schema to latest version. New databases are created with latest schema right away,
+        older databases are migrated step by step.
+        :return int: Number of applied migrations.
+        """
+        if not self._table_exists("password_manager"):
+            with self.data_processor.transaction() as con:
+                con.execute(self.TABLE.format(name="password_manager"))
+                for index in self.INDEXES:
+                    con.execute(index)
+                con.execute(self.KEY_ROTATION_TABLE)
+                con.execute(f"PRAGMA user_version={self.latest_version}")
+            return 0
+        applied = 0
+        for version, description, prepare, finish in self.migrations:
+            if version <= self.version():
+                continue
+            if prepare is not None:
+                prepare(version, description)
+            with self.data_processor.transaction() as con:
+                finish(con)
+                con.execute(f"PRAGMA user_version={version}")
+            applied += 1
+        return applied
+
+    def _report(self, version: int, description: str, processed: int):
+        """
+        Passes migration progress to progress function if one was given.
+        """
+        if self.progress is not None:
+            self.progress(version, description, processed)
+
+    @staticmethod
+    def _create_legacy_table(con):
+        """
+        Creates table in layout used before schema was versioned.
+        """
+        con.execute("CREATE TABLE IF NOT EXISTS password_manager (app text, username text, password text)")
+
+    def _backfill_app_key(self, version: int, description: str):
+        """
+        Adds app_key column and fills it batch by batch, rows which already have key are skipped on resume.
+        """
+        if "app_key" not in self._columns():
+            with self.data_processor.transaction() as con:
+                con.execute("ALTER TABLE password_manager ADD COLUMN app_key text")
+        last_rowid, processed = 0, 0
+        while True:
+            with self.data_processor.transaction() as con:
+                rows = con.execute("""
+                SELECT rowid, app FROM password_manager
+                WHERE rowid>? AND app_key IS NULL
+                ORDER BY rowid
+                LIMIT ?""", (last_rowid, self.BATCH_SIZE)).fetchall()
+                if not rows:
+                    break
+                con.executemany(
+                    "UPDATE password_manager SET app_key=? WHERE rowid=?",
+                    ((self.data_processor.normalize_app(app or ""), rowid) for rowid, app in rows)
+                )
+            last_rowid = rows[-1][0]
+            processed += len(rows)
+            self._report(version, description, processed)
+        self._set_aside_duplicates(version)
+
+    def _set_aside_duplicates(self, version: int):
+        """
+        Moves rows shadowed by older rows with the same app key to password_manager_duplicates table, so app key can
+        be indexed without dropping any saved password. Rows are moved back once app may have multiple accounts.
+        """
+        with self.data_processor.transaction() as con:
+            con.execute(self.DUPLICATES_TABLE)
+            shadowed = "rowid NOT IN (SELECT MIN(rowid) FROM password_manager GROUP BY app_key)"
+            moved = con.execute(f"""
+            INSERT INTO password_manager_duplicates (app, username, password, app_key)
+            SELECT app, username, password, app_key FROM password_manager
+            WHERE {shadowed}
+            ORDER BY rowid""").rowcount
+            con.execute(f"DELETE FROM password_manager WHERE {shadowed}")
+        if moved:
+            self._report(version, "Set aside duplicate accounts", moved)
+
+    @staticmethod
+    def _index_app_key(con):
+        """
+        Indexes app key, rows sharing app key were set aside before.
+        """
+        con.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_password_manager_app_key ON password_manager (app_key)")
+
+    def _add_usage_tracking(self, con):
+        """
+        Adds columns used for frecency ranking and indexes them.
+        """
+        columns = self._columns()
+        if "use_count" not in columns:
+            con.execute("ALTER TABLE password_manager ADD COLUMN use_count integer NOT NULL DEFAULT 0")
+        if "last_used_at" not in columns:
+            con.execute("ALTER TABLE password_manager ADD COLUMN last_used_at real")
+        if "frecency" not in columns:
+            con.execute("ALTER TABLE password_manager ADD COLUMN frecency real")
+        for index in self.INDEXES[1:]:
+            con.execute(index)
+
+    def _copy_to_new_table(self, version: int, description: str):
+        """
+        Copies rows to table with latest schema batch by batch. Copy continues after highest already copied id, so
+        interrupted copy resumes where it stopped.
+        """
+        with self.data_processor.transaction() as con:
+            con.execute(self.TABLE.format(name="password_manager_new"))
+            processed = con.execute("SELECT COUNT(*) FROM password_manager_new").fetchone()[0]
+        while True:
+            with self.data_processor.transaction() as con:
+                cur = con.execute("""
+                INSERT INTO password_manager_new
+                (id, app, username, password, app_key, use_count, last_used_at, frecency)
+                SELECT rowid, IFNULL(app, ''), username, password, app_key, use_count, last_used_at, frecency
+                FROM password_manager
+                WHERE rowid>(SELECT IFNULL(MAX(id), 0) FROM password_manager_new)
+                ORDER BY rowid
+                LIMIT ?""", (self.BATCH_SIZE,))
+            if not cur.rowcount:
+                break
+            processed += cur.rowcount
+            self._report(version, description, processed)
+
+    def _replace_table(self, con):
+        """
+        Replaces old table with fully copied new table and recreates indexes.
+        """
+        con.execute("DROP TABLE password_manager")
+        con.execute("ALTER TABLE password_manager_new RENAME TO password_manager")
+        for index in self.INDEXES:
+            con.execute(index)
+
+    @staticmethod
+    def _numbered_username(app_key: str, username: str, taken: set) -> str:
+        """
+        Takes account and usernames already used for its app and returns username with lowest free number appended.
+        :param str app_key: Normalized app name.
+        :param str username: Username of account.
+        :param set taken: (app key, username) pairs already used, returned username is added to it.
+        :return str: Numbered username.
+        """
+        number = 2
+        while (app_key, f"{username} ({number})".strip()) in taken:
+            number += 1
+        numbered = f"{username} ({number})".strip()
+        taken.add((app_key, numbered))
+        return numbered
+
+    def _number_duplicate_usernames(self, version: int, description: str):
+        """
+        Finds accounts which would collide with older account of the same app once missing usernames become empty
+        strings, e.g. one saved without username and one with empty username, and appends number to their usernames,
+        so unique index can be built without dropping any saved password. Accounts set aside by app key migration are
+        moved back to password_manager table, numbered the same way if their username is already used.
+        """
+        restored = 0
+        with self.data_processor.transaction() as con:
+            rows = con.execute("SELECT id, app_key, IFNULL(username, '') FROM password_manager ORDER BY id").fetchall()
+            taken: set = {(app_key, username) for _, app_key, username in rows}
+            seen: set = set()
+            duplicates: list = []
+            for id_, app_key, username in rows:
+                if (app_key, username) in seen:
+                    duplicates.append((id_, app_key, username))
+                else:
+                    seen.add((app_key, username))
+            con.executemany(
+                "UPDATE password_manager SET username=? WHERE id=?",
+                ((self._numbered_username(app_key, username, taken), id_) for id_, app_key, username in duplicates)
+            )
+            if self._table_exists("password_manager_duplicates"):
+                accounts = []
+                for app, username, password, app_key in con.execute(
+                    "SELECT IFNULL(app, ''), IFNULL(username, ''), password, app_key FROM password_manager_duplicates "
+                    "ORDER BY rowid"
+                ).fetchall():
+                    if (app_key, username) in taken:
+                        username = self._numbered_username(app_key, username, taken)
+                    else:
+                        taken.add((app_key, username))
+                    accounts.append((app, username, password, app_key))
+                con.executemany(
+                    "INSERT INTO password_manager (app, username, password, app_key) VALUES (?,?,?,?)", accounts
+                )
+                con.execute("DROP TABLE password_manager_duplicates")
+                restored = len(accounts)
+        if duplicates:
+            self._report(version, "Renamed duplicate accounts", len(duplicates))
+        if restored:
+            self._report(version, "Restored duplicate accounts", restored)
+
+    def _index_app_key_username(self, con):
+        """
+        Replaces app key index with unique index on app key and username pair.
+        """
+        con.execute("UPDATE password_manager SET username='' WHERE username IS NULL")
+        con.execute("DROP INDEX IF EXISTS idx_password_manager_app_key")
+        con.execute(self.INDEXES[0])
+
+    def _create_key_rotation_table(self, con):
+        """
+        Creates table holding progress of interrupted key rotation.
+        """
+        con.execute(self.KEY_ROTATION_TABLE)
@@ -7,18 +7,64 @@ import string
 import re
 import pyotp
 import qrcode
+from PIL import Image
 import atexit
+import json
+import math
 import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+from .cipher import Cipher
 
 
 class SecurityEngine:
     """
     Encapsulates all logic related to security.
     """
+
+    # Names of secrets saved in keyring.
+    SECRETS: tuple = ("key", "salt", "password", "otp_key", "user_email")
+
+    # Name of keyring entry holding all secrets and version of its layout.
+    BUNDLE: str = "account"
+    BUNDLE_VERSION: int = 1
+
+    # Smallest number of items encrypted or decrypted at once which is split between worker threads.
+    PARALLEL_THRESHOLD: int = 1000
+
+    # Number of items processed by worker thread as one task.
+    CHUNK_SIZE: int = 250
+
+    # Time in seconds hashing master password should take on current machine.
+    TARGET_HASH_TIME: float = 0.25
+
+    # Limits of bcrypt work factor chosen by calibration, every step doubles hashing time.
+    MIN_BCRYPT_COST: int = 10
+    MAX_BCRYPT_COST: int = 18
+
+    # Work factor measured during calibration, fast enough to add little to startup time.
+    CALIBRATION_COST: int = 6
+
+    # Width and height in pixels of 2FA QR code shown on Set Up 2FA page.
+    QR_SIZE: int = 300
+
+    # Width of quiet zone around QR code in modules, 4 is minimum required by QR code standard.
+    QR_BORDER: int = 4
+
+    # Legacy location where older versions saved QR code image.
+    LEGACY_QR_PATH: str = "pwm_data/qr.png"
+
     def __init__(self):
         self._client = "password manager"
         self._crypt_engine = None
         self._totp = None
+        self._secrets: dict or None = None
+        self._lock = threading.RLock()
+        self._bcrypt_cost: int or None = None
+        self._qr_cache: tuple or None = None
         self.registration_complete = True
         atexit.register(self.cleanup_on_exit)
 
@@ -29,12 +75,92 @@ class SecurityEngine:
         if not self.registration_complete:
             self.delete_secrets()
 
+    def load_secrets(self):
+        """
+        Reads secrets bundle from keyring to cache. If there is no bundle, but secrets are saved in legacy layout
+        with one keyring entry per secret, moves them to bundle and deletes legacy entries.
+        """
+        with self._lock:
+            bundle = keyring.get_password(self.client, self.BUNDLE)
+            if bundle is not None:
+                self._secrets = json.loads(bundle)["secrets"]
+                return
+            secrets = {name: keyring.get_password(self.client, name) for name in self.SECRETS}
+            secrets = {name: value for name, value in secrets.items() if value is not None}
+            self._secrets = {}
+            if secrets:
+                self.update_secrets(secrets)
+                for name in secrets:
+                    try:
+                        keyring.delete_password(self.client, name)
+                    except PasswordDeleteError:
+                        pass
+
+    def update_secrets(self, secrets: dict):
+        """
+        Takes dictionary of secrets, merges it into bundle and saves whole bundle to keyring with single write.
+        Secrets with None value are removed. Cache is updated only if write succeeds.
+        :param dict secrets: Secret names as keys and secret values or None as values.
+        """
+        with self._lock:
+            if self._secrets is None:
+                self.load_secrets()
+            updated = {**self._secrets, **secrets}
+            updated = {name: value for name, value in updated.items() if value is not None}
+            keyring.set_password(
+                self.client, self.BUNDLE, json.dumps({"version": self.BUNDLE_VERSION, "secrets": updated})
+            )
+            self._secrets = updated
+
+    def get_secret(self, name: str) -> str or None:
+        """
+        Takes secret name and returns its value from cache, reads bundle from keyring only if it is not cached yet.
+        :param str name: Secret name.
+        :return str or None: Secret value or None if secret is not saved.
+        """
+        with self._lock:
+            if self._secrets is None:
+                self.load_secrets()
+            return self._secrets.get(name)
+
+    def set_secret(self, name: str, value: str):
+        """
+        Takes secret name and value, saves it to keyring and cache.
+        :param str name: Secret name.
+        :param str value: Secret value.
+        """
+        self.update_secrets({name: value})
+
+    def delete_secret(self, name: str):
+        """
+        Takes secret name and deletes it from keyring and cache.
+        :param str name: Secret name.
+        :raises PasswordDeleteError: If secret is not saved.
+        """
+        with self._lock:
+            if self.get_secret(name) is None:
+                raise PasswordDeleteError(f"Secret {name} is not saved.")
+            self.update_secrets({name: None})
+
+    def wipe_secrets(self):
+        """
+        Drops all cached secrets together with cipher and TOTP built from them, following read loads bundle from
+        keyring again. Cipher and TOTP are rebuilt by load_acc or by successful check_password. Called when user logs
+        out.
+        """
+        with self._lock:
+            self._secrets = None
+            self._qr_cache = None
+            self._crypt_engine = None
+            self._totp = None
+
     def initialize_crypt_engine(self):
         """
-        Initializes or re-initializes Fernet with new or existing key.
+        Initializes or re-initializes cipher with current key and keys used before key rotation, so passwords
+        encrypted with previous keys can still be decrypted.
         """
         del self._crypt_engine
-        self._crypt_engine = Fernet(self.key)
+        self._crypt_engine = Cipher(self.keys)
 
     def initialize_totp(self):
         """
@@ -44,7 +170,7 @@ class SecurityEngine:
         self._totp = pyotp.TOTP(self.otp_key)
 
     @property
-    def crypt_engine(self) -> Fernet:
+    def crypt_engine(self) -> Cipher:
         return self._crypt_engine
 
     @property
@@ -57,61 +183,85 @@ class SecurityEngine:
 
     @property
     def otp_key(self):
-        return keyring.get_password(self.client, "otp_key")
+        return self.get_secret("otp_key")
 
     def create_otp_key(self):
         """
         Generates new OTP key and saves to keyring.
         """
         otp_key = pyotp.random_base32()
-        keyring.set_password(self.client, "otp_key", otp_key)
+        self.set_secret("otp_key", otp_key)
 
     @otp_key.deleter
     def otp_key(self):
         """
         Deletes OTP key from keyring.
         """
-        keyring.delete_password(self.client, "otp_key")
+        self.delete_secret("otp_key")
 
     @property
     def key(self) -> str or None:
-        return keyring.get_password(self.client, "key")
+        return self.get_secret("key")
 
     def create_key(self):
         """
         Generates new Fernet key and saves to keyring.
         """
         key = Fernet.generate_key().decode()
-        keyring.set_password(self.client, "key", key)
+        self.set_secret("key", key)
 
     @key.deleter
     def key(self):
         """
         Deletes Fernet key from keyring.
         """
-        keyring.delete_password(self.client, "key")
+        self.delete_secret("key")
+
+    @property
+    def previous_keys(self) -> list:
+        return self.get_secret("previous_keys") or []
+
+    @property
+    def keys(self) -> list:
+        return [self.key, *self.previous_keys]
+
+    def rotate_key(self):
+        """
+        Generates new Fernet key which will be used for encryption, current key is kept among previous keys until
+        all passwords are re-encrypted. Both keys are saved to keyring with single write.
+        """
+        key = Fernet.generate_key().decode()
+        self.update_secrets({"key": key, "previous_keys": self.keys})
+        self.initialize_crypt_engine()
+
+    def retire_previous_keys(self):
+        """
+        Deletes keys used before key rotation, called when all passwords are encrypted with current key.
+        """
+        self.update_secrets({"previous_keys": None})
+        self.initialize_crypt_engine()
 
     @property
     def salt(self) -> str or None:
-        return keyring.get_password(self.client, "salt")
+        return self.get_secret("salt")
 
     def create_salt(self):
         """
-        Generates salt and saves to keyring.
+        Generates salt with work factor calibrated for current machine and saves to keyring.
         """
-        salt = bcrypt.gensalt().decode()
-        keyring.set_password(self.client, "salt", salt)
+        cost = self.calibrate_cost()
+        self.update_secrets({"salt": bcrypt.gensalt(rounds=cost).decode(), "bcrypt_cost": str(cost)})
 
     @salt.deleter
     def salt(self):
         """
         Deletes salt from keyring.
         """
-        keyring.delete_password(self.client, "salt")
+        self.delete_secret("salt")
 
     @property
     def password(self) -> str or None:
-        return keyring.get_password(self.client, "password")
+        return self.get_secret("password")
 
     @password.setter
     def password(self, password: str):
@@ -120,18 +270,18 @@ class SecurityEngine:
         :param str password: Password as string.
         """
         hashed_password = self.hash_password(password)
-        keyring.set_password(self.client, "password", hashed_password)
+        self.set_secret("password", hashed_password)
 
     @password.deleter
     def password(self):
         """
         Deletes password from keyring.
         """
-        keyring.delete_password(self.client, "password")
+        self.delete_secret("password")
 
     @property
     def user_email(self) -> str or None:
-        return keyring.get_password(self.client, "user_email")
+        return self.get_secret("user_email")
 
     @user_email.setter
     def user_email(self, email: str):
@@ -139,30 +289,103 @@ class SecurityEngine:
         Takes user e-mail and saves to keyring.
         :param str email: User e-mail as string.
         """
-        keyring.set_password(self.client, "user_email", email)
+        self.set_secret("user_email", email)
 
     @user_email.deleter
     def user_email(self):
         """
         Deletes user e-mail from keyring.
         """
-        keyring.delete_password(self.client, "user_email")
+        self.delete_secret("user_email")
 
-    def encrypt(self, password: str) -> str:
+    def encrypt(self, password: str) -> bytes:
         """
         Takes password and encrypts it using symmetric encryption.
         :param str password: Password to encrypt
-        :return: Encrypted password
+        :return bytes: Encrypted password
         """
-        return self.crypt_engine.encrypt(password.encode()).decode()
+        return self.crypt_engine.encrypt(password.encode())
 
-    def decrypt(self, password: str) -> str:
+    def decrypt(self, password: bytes or str) -> str:
         """
-        Takes encrypted password, decrypts and returns as string.
-        :param str password: Encrypted password
+        Takes encrypted password, decrypts and returns as string. Passwords encrypted by older versions as Fernet
+        tokens are decrypted as well.
+        :param bytes or str password: Encrypted password
         :return str: Decrypted password
         """
-        return self.crypt_engine.decrypt(password.encode()).decode()
+        return self.crypt_engine.decrypt(password).decode()
+
+    def _map_many(self, function, items, workers: int = None):
+        """
+        Takes function and iterable of items and yields function results in order of items. Fewer items than
+        PARALLEL_THRESHOLD are processed in calling thread, more items are split to chunks processed by worker
+        threads. Only limited number of chunks is read ahead, so items can be streamed.
+        :param function: Function called with every item.
+        :param items: Iterable of items.
+        :param int workers: Number of worker threads, defaults to number of CPUs.
+        :return: Generator of results.
+        """
+        items = iter(items)
+        first = list(islice(items, self.PARALLEL_THRESHOLD))
+        if len(first) < self.PARALLEL_THRESHOLD:
+            yield from map(function, first)
+            return
+        workers = workers or os.cpu_count() or 1
+        items = chain(first, items)
+        chunks = iter(lambda: list(islice(items, self.CHUNK_SIZE)), [])
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(lambda chunk_items: list(map(function, chunk_items)), chunk))
+                if len(pending) >= workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def encrypt_many(self, items, workers: int = None):
+        """
+        Takes iterable of data and yields encrypted data in the same order, large inputs are encrypted in parallel.
+        :param items: Iterable of bytes.
+        :param int workers: Number of worker threads, defaults to number of CPUs.
+        :return: Generator of encrypted bytes.
+        """
+        return self._map_many(self.crypt_engine.encrypt, items, workers)
+
+    def decrypt_many(self, items, workers: int = None):
+        """
+        Takes iterable of encrypted data and yields decrypted data in the same order, large inputs are decrypted
+        in parallel.
+        :param items: Iterable of encrypted bytes, or legacy Fernet tokens as strings.
+        :param int workers: Number of worker threads, defaults to number of CPUs.
+        :return: Generator of decrypted bytes.
+        """
+        return self._map_many(self.crypt_engine.decrypt, items, workers)
+
+    def reencrypt_many(self, items, workers: int = None):
+        """
+        Takes iterable of encrypted data and yields it encrypted again with current key and format, in the same
+        order, large inputs are processed in parallel.
+        :param items: Iterable of encrypted bytes, or legacy Fernet tokens as strings.
+        :param int workers: Number of worker threads, defaults to number of CPUs.
+        :return: Generator of encrypted bytes.
+        """
+        return self._map_many(self.crypt_engine.reencrypt, items, workers)
+
+    def needs_upgrade(self, password: bytes or str) -> bool:
+        """
+        Takes encrypted password and checks if it should be encrypted again, because it uses older format or key.
+        :param bytes or str password: Encrypted password
+        :return bool: True if password should be re-encrypted, otherwise False
+        """
+        return not self.crypt_engine.is_current(password)
+
+    def reencrypt(self, password: bytes or str) -> bytes:
+        """
+        Takes password encrypted with current or previous key in any format and encrypts it again with current key.
+        :param bytes or str password: Encrypted password
+        :return bytes: Password encrypted with current key
+        """
+        return self.crypt_engine.reencrypt(password)
 
     def hash_password(self, password: str) -> str:
         """
@@ -172,15 +395,81 @@ class SecurityEngine:
         """
         return bcrypt.hashpw(password.encode(), self.salt.encode()).decode()
 
+    def calibrate_cost(self) -> int:
+        """
+        Returns bcrypt work factor used for new hashes. Work factor saved to keyring with master password hash is
+        reused, otherwise it is measured. Result is kept for lifetime of SecurityEngine.
+        :return int: Work factor between MIN_BCRYPT_COST and MAX_BCRYPT_COST.
+        """
+        if self._bcrypt_cost is None and self.get_secret("bcrypt_cost") is not None:
+            self._bcrypt_cost = int(self.get_secret("bcrypt_cost"))
+        if self._bcrypt_cost is None:
+            self._bcrypt_cost = self.measure_cost()
+        return self._bcrypt_cost
+
+    def measure_cost(self) -> int:
+        """
+        Measures hashing on current machine and returns bcrypt work factor for which hashing takes about
+        TARGET_HASH_TIME. Hashing is measured with low work factor and extrapolated, so measurement takes only few
+        milliseconds.
+        :return int: Work factor between MIN_BCRYPT_COST and MAX_BCRYPT_COST.
+        """
+        salt = bcrypt.gensalt(rounds=self.CALIBRATION_COST)
+        elapsed = math.inf
+        for _ in range(3):
+            started = time.perf_counter()
+            bcrypt.hashpw(b"calibration", salt)
+            elapsed = min(elapsed, time.perf_counter() - started)
+        cost = self.CALIBRATION_COST + math.floor(math.log2(self.TARGET_HASH_TIME / max(elapsed, 1e-9)))
+        return max(self.MIN_BCRYPT_COST, min(self.MAX_BCRYPT_COST, cost))
+
+    @staticmethod
+    def bcrypt_cost(hashed_password: str) -> int:
+        """
+        Takes bcrypt hash and returns work factor it was created with.
+        :param str hashed_password: Hash in "$2b$<cost>$<salt and hash>" format.
+        :return int: Work factor.
+        """
+        return int(hashed_password.split("$")[2])
+
+    def rehash_password(self, password: str):
+        """
+        Takes master password and hashes it again with new salt using work factor calibrated for current machine.
+        Salt, hash and work factor are saved to keyring with single write.
+        :param str password: Master password.
+        """
+        cost = self.calibrate_cost()
+        salt = bcrypt.gensalt(rounds=cost)
+        self.update_secrets({
+            "salt": salt.decode(),
+            "password": bcrypt.hashpw(password.encode(), salt).decode(),
+            "bcrypt_cost": str(cost),
+        })
+
     def check_password(self, password: str) -> bool:
         """
-        Takes password, hashes it and compares to saved user password.
+        Takes password and compares it to saved user password. If password matches, work factor is measured again
+        and if current machine can afford higher work factor than saved hash was created with, password is hashed
+        again with it, so hash gets stronger when app moves to faster machine. Hash is never rehashed with lower work
+        factor. Cipher and TOTP dropped by wipe_secrets are rebuilt once password matches.
         :param str password: Password to be compared
         :return bool: True if passwords are equal, otherwise False
         """
-        entered_pw = self.hash_password(password)
         user_password = self.password
-        return entered_pw == user_password
+        if user_password is None or not bcrypt.checkpw(password.encode(), user_password.encode()):
+            return False
+        cost = self.measure_cost()
+        if cost > self.bcrypt_cost(user_password):
+            self._bcrypt_cost = cost
+            self.rehash_password(password)
+        elif self.get_secret("bcrypt_cost") is None:
+            self._bcrypt_cost = self.bcrypt_cost(user_password)
+            self.set_secret("bcrypt_cost", str(self._bcrypt_cost))
+        if self._crypt_engine is None:
+            self.initialize_crypt_engine()
+        if self._totp is None:
+            self.initialize_totp()
+        return True
 
     @staticmethod
     def validate_password(password: str) -> bool:
@@ -206,15 +495,34 @@ class SecurityEngine:
         """
         return "".join([random.choice(string.digits) for _ in range(6)])
 
-    def create_otp_qr(self):
+    def create_otp_qr(self, size: int = None) -> Image.Image:
         """
-        Generates uri and creates qr code image from it. Saves as qr.png
+        Generates provisioning uri and renders QR code image from it in memory, nothing is written to disk. Modules
+        are drawn at the largest whole pixel size fitting given size and image is padded to exact size, so no
+        resampling is needed. Image of current OTP key is cached until key changes or secrets are wiped.
+        :param int size: Width and height of image in pixels, defaults to QR_SIZE.
+        :return Image.Image: QR code image.
         """
-        uri = pyotp.totp.TOTP(self.otp_key).provisioning_uri(
+        size = size or self.QR_SIZE
+        otp_key = self.otp_key
+        cache_key = (otp_key, self.user_email, size)
+        if self._qr_cache is not None and self._qr_cache[0] == cache_key:
+            return self._qr_cache[1]
+        uri = pyotp.totp.TOTP(otp_key).provisioning_uri(
             name=self.user_email,
             issuer_name=self.client
         )
-        qrcode.make(uri).save("pwm_data/qr.png")
+        qr = qrcode.QRCode(border=self.QR_BORDER)
+        qr.add_data(uri)
+        qr.make(fit=True)
+        qr.box_size = max(1, size // (qr.modules_count + 2 * self.QR_BORDER))
+        code = qr.make_image().get_image()
+        if code.width > size:
+            code = code.resize((size, size), Image.NEAREST)
+        image = Image.new(code.mode, (size, size), 1 if code.mode == "1" else "white")
+        image.paste(code, ((size - code.width) // 2, (size - code.height) // 2))
+        self._qr_cache = (cache_key, image)
+        return image
 
     def verify_otp(self, otp: str) -> bool:
         """
@@ -226,50 +534,53 @@ class SecurityEngine:
 
     def initialize_new_acc(self):
         """
-        Encapsulates functions that will be called when new account is created.
+        Encapsulates functions that will be called when new account is created. All new secrets are saved to
+        keyring with single write.
         """
-        self.create_salt()
-        self.create_key()
-        self.create_otp_key()
+        cost = self.calibrate_cost()
+        self.update_secrets({
+            "salt": bcrypt.gensalt(rounds=cost).decode(),
+            "bcrypt_cost": str(cost),
+            "key": Fernet.generate_key().decode(),
+            "otp_key": pyotp.random_base32(),
+        })
         self.initialize_crypt_engine()
         self.initialize_totp()
 
     def load_acc(self):
         """
-        Encapsulates functions that will be called when existing account is loaded.
+        Encapsulates functions that will be called when existing account is loaded. QR code file left behind by
+        older versions is deleted.
         """
+        if self._secrets is None:
+            self.load_secrets()
+        self.delete_legacy_qr()
         self.initialize_crypt_engine()
         self.initialize_totp()
 
-    @staticmethod
-    def delete_qr():
+    def delete_qr(self):
         """
-        Deletes qr.png if it exists in directory.
+        Drops cached QR code image and deletes QR code file left behind by older versions.
         """
-        if os.path.exists("pwm_data/qr.png"):
-            os.remove("pwm_data/qr.png")
+        self._qr_cache = None
+        self.delete_legacy_qr()
+
+    @classmethod
+    def delete_legacy_qr(cls):
+        """
+        Deletes QR code file saved by older versions if it exists, file holds OTP key in plain form.
+        """
+        if os.path.exists(cls.LEGACY_QR_PATH):
+            os.remove(cls.LEGACY_QR_PATH)
 
     def delete_secrets(self):
         """
-        Deletes all saved user details from keyring.
-        """
-        try:
-            del self.key
-        except PasswordDeleteError:
-            pass
-        try:
-            del self.salt
-        except PasswordDeleteError:
-            pass
-        try:
-            del self.user_email
-        except PasswordDeleteError:
-            pass
-        try:
-            del self.password
-        except PasswordDeleteError:
-            pass
-        try:
-            del self.otp_key
-        except PasswordDeleteError:
-            pass
+        Deletes all saved user details from keyring and cache.
+        """
+        with self._lock:
+            try:
+                keyring.delete_password(self.client, self.BUNDLE)
+            except PasswordDeleteError:
+                pass
+            self._secrets = {}
+            self._qr_cache = None
@@ -0,0 +1,89 @@
+import heapq
+import math
+from collections import Counter
+
+
+class TrigramIndex:
+    """
+    Encapsulates in-memory trigram index used for typo-tolerant search. Every key is split into overlapping
+    three character sequences, query is matched against keys sharing at least one trigram with it and results are
+    ranked by Dice similarity of trigram sets.
+    """
+
+    def __init__(self):
+        self._postings: dict = {}
+        self._sizes: dict = {}
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    @staticmethod
+    def trigrams(text: str) -> set:
+        """
+        Takes text and returns set of its trigrams. Text is padded so short words and word beginnings also produce
+        trigrams.
+        :param str text: Text to split.
+        :return set: Set of three character strings.
+        """
+        padded = f"  {text} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def add(self, key: str):
+        """
+        Takes key and adds it to index.
+        :param str key: Normalized key.
+        """
+        if key in self._sizes:
+            return
+        grams = self.trigrams(key)
+        self._sizes[key] = len(grams)
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(key)
+
+    def remove(self, key: str):
+        """
+        Takes key and removes it from index if present.
+        :param str key: Normalized key.
+        """
+        if self._sizes.pop(key, None) is None:
+            return
+        for gram in self.trigrams(key):
+            keys = self._postings[gram]
+            keys.discard(key)
+            if not keys:
+                del self._postings[gram]
+
+    def clear(self):
+        """
+        Removes all keys from index.
+        """
+        self._postings = {}
+        self._sizes = {}
+
+    def search(self, query: str, limit: int = 10, threshold: float = 0.45) -> list:
+        """
+        Takes query and returns most similar keys, best match first. Key sharing c of query's n trigrams can not be
+        more similar than 2c / (n + c), so keys below threshold share less than n * t / (2 - t) trigrams with query.
+        Candidates are therefore only collected from query's rarest trigrams, most common trigrams are used just to
+        score keys which are already candidates.
+        :param str query: Normalized search query.
+        :param int limit: Maximum number of returned keys.
+        :param float threshold: Minimum similarity between 0 and 1 for key to be returned.
+        :return list: List of (key, similarity) tuples.
+        """
+        grams = sorted(self.trigrams(query), key=lambda gram: len(self._postings.get(gram, ())))
+        min_shared = max(1, math.ceil(len(grams) * threshold / (2 - threshold)))
+        collect = len(grams) - min_shared + 1
+        shared = Counter()
+        for gram in grams[:collect]:
+            shared.update(self._postings.get(gram, ()))
+        for gram in grams[collect:]:
+            keys = self._postings.get(gram, ())
+            for key in shared:
+                if key in keys:
+                    shared[key] += 1
+        scored = (
+            (2 * count / (len(grams) + self._sizes[key]), key) for key, count in shared.items() if count >= min_shared
+        )
+        best = heapq.nsmallest(limit, ((-score, key) for score, key in scored if score >= threshold))
+        return [(key, -score) for score, key in best]
@@ -0,0 +1,170 @@
+import base64
+import json
+import os
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+from .data_processor import DataProcessor
+
+
+class VaultExporter:
+    """
+    Encapsulates logic for exporting credentials to encrypted archive and reading them back.
+
+    Archive is a text file. First line contains magic string and JSON header with format version and key
+    derivation parameters, every following line is Fernet token holding one batch of records encrypted with key
+    derived from export passphrase. Last line marks archive as complete.
+    """
+
+    MAGIC: str = "V13PWM-EXPORT"
+    VERSION: int = 1
+
+    # Number of records decrypted and written to archive at once.
+    BATCH_SIZE: int = 500
+
+    # Scrypt parameters used for new archives.
+    SCRYPT_N: int = 2 ** 15
+    SCRYPT_R: int = 8
+    SCRYPT_P: int = 1
+
+    def __init__(self, security_engine):
+        """
+        Initializes exporter.
+        :param security_engine: SecurityEngine class used to decrypt stored passwords.
+        """
+        self.security_engine = security_engine
+
+    @staticmethod
+    def derive_key(passphrase: str, header: dict) -> Fernet:
+        """
+        Takes export passphrase and archive header, derives archive encryption key.
+        :param str passphrase: Export passphrase.
+        :param dict header: Archive header with key derivation parameters.
+        :return Fernet: Fernet initialized with derived key.
+        """
+        kdf = Scrypt(salt=base64.b64decode(header["salt"]), length=32, n=header["n"], r=header["r"], p=header["p"])
+        return Fernet(base64.urlsafe_b64encode(kdf.derive(passphrase.encode())))
+
+    @classmethod
+    def read_header(cls, line: str) -> dict:
+        """
+        Takes first line of archive and returns parsed header.
+        :param str line: First line of archive.
+        :return dict: Archive header.
+        :raises ValueError: If line is not valid header or archive version is not supported.
+        """
+        magic, _, header = line.partition(" ")
+        if magic != cls.MAGIC:
+            raise ValueError("File is not V13 Password Manager export")
+        header = json.loads(header)
+        if header.get("version") != cls.VERSION:
+            raise ValueError(f"Unsupported export version: {header.get('version')}")
+        return header
+
+    @classmethod
+    def read_batches(cls, path: str, passphrase: str):
+        """
+        Takes path to archive and passphrase, yields decrypted batches together with position in file where
+        each batch ends.
+        :param str path: Path to archive.
+        :param str passphrase: Export passphrase.
+        :return: Generator of (batch, offset) tuples, batch is dictionary with "last_id", "records" and "complete".
+        :raises ValueError: If archive is invalid or passphrase is incorrect.
+        """
+        with open(path, "rb") as archive:
+            header = cls.read_header(archive.readline().decode())
+            fernet = cls.derive_key(passphrase, header)
+            for line in archive:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    batch = json.loads(fernet.decrypt(line.strip()))
+                except InvalidToken:
+                    raise ValueError("Incorrect passphrase or corrupted export") from None
+                yield batch, archive.tell()
+
+    @classmethod
+    def read_archive(cls, path: str, passphrase: str):
+        """
+        Takes path to archive and passphrase, yields exported credentials one by one.
+        :param str path: Path to archive.
+        :param str passphrase: Export passphrase.
+        :return: Generator of (app, username, password) tuples.
+        """
+        for batch, _ in cls.read_batches(path, passphrase):
+            for app, username, password in batch["records"]:
+                yield app, username, password
+
+    def _resume_point(self, path: str, passphrase: str) -> tuple:
+        """
+        Reads existing archive and finds where interrupted export stopped.
+        :param str path: Path to archive.
+        :param str passphrase: Export passphrase.
+        :return tuple: Header, id of last exported record, offset of end of last complete batch and completion flag.
+        """
+        with open(path, "rb") as archive:
+            first_line = archive.readline()
+        header = self.read_header(first_line.decode())
+        last_id, offset, complete = 0, len(first_line), False
+        for batch, offset in self.read_batches(path, passphrase):
+            last_id, complete = batch["last_id"], batch.get("complete", False)
+        return header, last_id, offset, complete
+
+    def export(self, path: str, passphrase: str, resume: bool = True, progress=None) -> int:
+        """
+        Takes path to archive and passphrase, exports all credentials. Records are read, decrypted and written
+        batch by batch, every batch is flushed to disk so interrupted export can be resumed by calling this function
+        again with the same path and passphrase. Complete archive is never resumed, it is overwritten with fresh
+        export.
+        :param str path: Path to archive.
+        :param str passphrase: Export passphrase.
+        :param bool resume: Whether existing incomplete archive should be continued instead of overwritten.
+        :param progress: Optional function called with number of records exported so far after every batch.
+        :return int: Number of records exported during this call.
+        """
+        complete = True
+        if resume and os.path.exists(path):
+            header, last_id, offset, complete = self._resume_point(path, passphrase)
+        if not complete:
+            archive = open(path, "r+b")
+            archive.truncate(offset)
+            archive.seek(offset)
+        else:
+            header = {
+                "version": self.VERSION,
+                "kdf": "scrypt",
+                "salt": base64.b64encode(os.urandom(16)).decode(),
+                "n": self.SCRYPT_N,
+                "r": self.SCRYPT_R,
+                "p": self.SCRYPT_P,
+            }
+            last_id = 0
+            archive = open(path, "wb")
+            archive.write(f"{self.MAGIC} {json.dumps(header)}\n".encode())
+        fernet = self.derive_key(passphrase, header)
+        exported = 0
+        with archive:
+            for batch in DataProcessor.iter_records(after_id=last_id, batch_size=self.BATCH_SIZE):
+                passwords = self.security_engine.decrypt_many(password for *_, password in batch)
+                records = [
+                    (app, username, password.decode()) for (_, app, username, _), password in zip(batch, passwords)
+                ]
+                last_id = batch[-1][0]
+                self._write_batch(archive, fernet, {"last_id": last_id, "records": records})
+                exported += len(records)
+                del records
+                if progress is not None:
+                    progress(exported)
+            self._write_batch(archive, fernet, {"last_id": last_id, "records": [], "complete": True})
+        return exported
+
+    @staticmethod
+    def _write_batch(archive, fernet: Fernet, batch: dict):
+        """
+        Encrypts batch, appends it to archive as single line and flushes it to disk.
+        :param archive: Archive file opened in binary mode.
+        :param Fernet fernet: Fernet initialized with archive key.
+        :param dict batch: Batch to write.
+        """
+        archive.write(fernet.encrypt(json.dumps(batch).encode()) + b"\n")
+        archive.flush()
+        os.fsync(archive.fileno())
@@ -0,0 +1,91 @@
+from PIL import Image, ImageTk
+
+
+class AssetCache:
+    """
+    Encapsulates shared registry of images used by views. Every image file is decoded once, scaled variants are
+    resized once from decoded image and every variant has single PhotoImage shared by all frames. Images stay in
+    registry for lifetime of app, so Tk never drops image still shown by some label.
+    """
+
+    # Directory image files are loaded from.
+    IMAGE_DIR: str = "pwm_data/img"
+
+    # (file name, size) as key and decoded image as value, size None means original size.
+    _images: dict = {}
+
+    # (file name, size) as key and PhotoImage as value.
+    _photos: dict = {}
+
+    @classmethod
+    def image(cls, name: str, size: tuple = None) -> Image.Image:
+        """
+        Takes image file name and optional size, returns decoded image, decoding or scaling it only on first call.
+        :param str name: Image file name inside IMAGE_DIR.
+        :param tuple size: Width and height in pixels of scaled variant, None for original size.
+        :return Image.Image: Decoded image.
+        """
+        key = (name, tuple(size) if size else None)
+        image = cls._images.get(key)
+        if image is None:
+            if key[1] is None:
+                with Image.open(f"{cls.IMAGE_DIR}/{name}") as image_file:
+                    image = image_file.copy()
+            else:
+                image = cls.image(name).resize(key[1], Image.LANCZOS)
+            cls._images[key] = image
+        return image
+
+    @classmethod
+    def photo(cls, name: str, size: tuple = None) -> ImageTk.PhotoImage:
+        """
+        Takes image file name and optional size, returns PhotoImage shared by all widgets showing this image. App
+        window must exist before first call.
+        :param str name: Image file name inside IMAGE_DIR.
+        :param tuple size: Width and height in pixels of scaled variant, None for original size.
+        :return ImageTk.PhotoImage: Image usable by Tk widgets.
+        """
+        key = (name, tuple(size) if size else None)
+        photo = cls._photos.get(key)
+        if photo is None:
+            photo = ImageTk.PhotoImage(cls.image(name, size))
+            cls._photos[key] = photo
+        return photo
+
+    @classmethod
+    def preload(cls, variants):
+        """
+        Takes image variants and decodes and scales them in advance, e.g. while app is idle.
+        :param variants: Iterable of (file name, size) tuples, size None for original size.
+        """
+        for name, size in variants:
+            cls.image(name, size)
+
+    @classmethod
+    def memory_footprint(cls) -> dict:
+        """
+        Returns estimate of memory held by registry. Decoded images take width * height * bands bytes, Tk keeps
+        every PhotoImage as 4 bytes per pixel.
+        :return dict: Number of decoded images and PhotoImages, their size in bytes and bytes per variant.
+        """
+        variants = {
+            f"{name}@{size[0]}x{size[1]}" if size else name: image.width * image.height * len(image.getbands())
+            for (name, size), image in cls._images.items()
+        }
+        photos = sum(photo.width() * photo.height() * 4 for photo in cls._photos.values())
+        return {
+            "images": len(cls._images),
+            "image_bytes": sum(variants.values()),
+            "photos": len(cls._photos),
+            "photo_bytes": photos,
+            "total_bytes": sum(variants.values()) + photos,
+            "variants": variants,
+        }
+
+    @classmethod
+    def clear(cls):
+        """
+        Drops all cached images, widgets still showing them must be destroyed first.
+        """
+        cls._photos.clear()
+        cls._images.clear()
@@ -1,4 +1,5 @@
 from models.mail_processor import MailProcessor
+from models.mail_queue import MailQueue
 
 
 class CommonFunctions:
@@ -38,17 +39,38 @@ class CommonFunctions:
     @staticmethod
     def send_token_email(controller, email):
         """
-        Generates security token and sends to specified e-mail address, deletes token after
-        amount of time specified in AppController class.
+        Generates security token and queues e-mail with it to specified e-mail address, sending status is shown
+        when mail queue reports it. Token is deleted after amount of time specified in AppController class.
         :param controller: Current controller class.
         :param email: User e-mail.
         """
         token = controller.security_engine.generate_token()
         controller.app_controller.token = token
-        if MailProcessor.send_token(email, token):
+        queued = MailProcessor.send_token(
+            controller.app_controller.mail_queue, email, token,
+            callback=lambda status, error: CommonFunctions.show_mail_status(controller, status, error)
+        )
+        if queued:
+            controller.frame.error_label.config(text="Sending e-mail...", foreground="green")
+        else:
+            controller.frame.error_label.config(text="Too many e-mails waiting, try again later", foreground="red")
+            controller.frame.after(3000, lambda: controller.frame.error_label.config(text=""))
+
+    @staticmethod
+    def show_mail_status(controller, status: str, error: str or None):
+        """
+        Takes sending status reported by mail queue and shows it to user.
+        :param controller: Current controller class.
+        :param str status: MailQueue.SENT, MailQueue.RETRYING or MailQueue.FAILED.
+        :param str or None error: Error message of failed attempt.
+        """
+        if status == MailQueue.SENT:
             controller.frame.error_label.config(text="E-mail sent", foreground="green")
+        elif status == MailQueue.RETRYING:
+            controller.frame.error_label.config(text="Sending e-mail failed, retrying...", foreground="orange")
+            return
         else:
-            controller.frame.error_label.config(text="E-mail failed to send", foreground="red")
+            controller.frame.error_label.config(text=f"E-mail failed to send. {error}", foreground="red")
         controller.frame.after(3000, lambda: controller.frame.error_label.config(text=""))
 
     @staticmethod
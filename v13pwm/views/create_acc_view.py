@@ -2,6 +2,7 @@ import ttkbootstrap as ttkb
 from ttkbootstrap.tooltip import ToolTip
 from utilities.entry_mod import EntryMod
 from utilities import style_config
+from utilities.asset_cache import AssetCache
 
 
 class CreateAccView(ttkb.Frame):
@@ -13,7 +14,7 @@ class CreateAccView(ttkb.Frame):
         """
         super().__init__(master)
 
-        self.logo = ttkb.PhotoImage(file="pwm_data/img/logo.png")
+        self.logo = AssetCache.photo("logo.png")
         self.logo_label = ttkb.Label(self, image=self.logo)
         self.logo_label.grid(row=0, column=0, columnspan=2, pady=(0, 30))
 
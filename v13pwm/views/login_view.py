@@ -2,6 +2,7 @@ import ttkbootstrap as ttkb
 from ttkbootstrap.tooltip import ToolTip
 from utilities.entry_mod import EntryMod
 from utilities import style_config
+from utilities.asset_cache import AssetCache
 
 
 class LoginView(ttkb.Frame):
@@ -13,7 +14,7 @@ class LoginView(ttkb.Frame):
         """
         super().__init__(master)
 
-        self.logo = ttkb.PhotoImage(file="pwm_data/img/logo.png")
+        self.logo = AssetCache.photo("logo.png")
         self.logo_label = ttkb.Label(self, image=self.logo)
         self.logo_label.grid(row=0, column=0, pady=(0, 30))
 
@@ -90,3 +91,24 @@ class LoginView(ttkb.Frame):
             style="primary-outline"
         )
         self.reset_otp_btn.grid(row=8, column=0, pady=5)
+
+        self.progress_bar = ttkb.Progressbar(
+            self,
+            mode="indeterminate",
+            length=250,
+            bootstyle="primary-striped"
+        )
+
+    def set_busy(self, busy: bool):
+        """
+        Takes state of login check, while check is running disables Login button and shows progress bar.
+        :param bool busy: True while password and OTP are being verified.
+        """
+        if busy:
+            self.login_btn.config(state="disabled")
+            self.progress_bar.grid(row=9, column=0, pady=5)
+            self.progress_bar.start(15)
+        else:
+            self.progress_bar.stop()
+            self.progress_bar.grid_remove()
+            self.login_btn.config(state="enabled")
@@ -3,6 +3,60 @@ from ttkbootstrap.tooltip import ToolTip
 from ttkbootstrap.dialogs import Messagebox
 from utilities.entry_mod import EntryMod
 from utilities import style_config
+from utilities.asset_cache import AssetCache
+
+
+class ChooseAccountDialog(ttkb.Toplevel):
+
+    def __init__(self, app: str, usernames: list, parent: ttkb.Frame):
+        """
+        Initializes modal window for choosing one of several accounts saved for the same app. Return chooses
+        account, Escape or closing window cancels choice.
+        :param str app: Name of app or web page.
+        :param list usernames: Usernames to choose from.
+        :param parent: ttkb.Frame (page showing dialog)
+        """
+        super().__init__(title="Choose account", resizable=(False, False), transient=parent.winfo_toplevel())
+        self.withdraw()
+        self.parent = parent
+        self.result: str or None = None
+
+        self.prompt_label = ttkb.Label(self, text=f"Several accounts are saved for {app}.\nChoose account:")
+        self.prompt_label.pack(padx=20, pady=(20, 5), anchor="w")
+
+        self.account_combox = ttkb.Combobox(self, values=usernames, state="readonly")
+        self.account_combox.set(usernames[0])
+        self.account_combox.pack(padx=20, pady=(0, 5), fill="x")
+
+        self.button_frame = ttkb.Frame(self)
+        self.button_frame.pack(padx=20, pady=(10, 20), fill="x")
+        self.cancel_btn = ttkb.Button(self.button_frame, text="Cancel", style="secondary", command=self.destroy)
+        self.cancel_btn.pack(side="right")
+        self.ok_btn = ttkb.Button(self.button_frame, text="OK", style="primary", command=self.submit)
+        self.ok_btn.pack(side="right", padx=(0, 5))
+
+        self.bind("<Return>", self.submit)
+        self.bind("<KP_Enter>", self.submit)
+        self.bind("<Escape>", lambda event: self.destroy())
+
+    def submit(self, *args):
+        """
+        Keeps chosen username and closes window.
+        """
+        self.result = self.account_combox.get()
+        self.destroy()
+
+    def show(self) -> str or None:
+        """
+        Shows window over parent page and waits until it is closed.
+        :return str or None: Chosen username or None if choice was cancelled.
+        """
+        self.geometry(f"+{self.parent.winfo_rootx()}+{self.parent.winfo_rooty()}")
+        self.deiconify()
+        self.account_combox.focus_force()
+        self.grab_set()
+        self.wait_window()
+        return self.result
 
 
 class MainPageView(ttkb.Frame):
@@ -22,7 +76,7 @@ class MainPageView(ttkb.Frame):
         )
         self.settings_btn.grid(row=0, column=2, pady=(0, 0), sticky="n")
 
-        self.logo = ttkb.PhotoImage(file="pwm_data/img/logo.png")
+        self.logo = AssetCache.photo("logo.png")
         self.logo_label = ttkb.Label(self, image=self.logo)
         self.logo_label.grid(row=0, column=0, columnspan=3)
 
@@ -131,15 +185,25 @@ class MainPageView(ttkb.Frame):
             parent=self
         )
 
-    def should_replace(self, app: str) -> str:
+    def should_replace(self, app: str, username: str) -> str:
         """
         Shows messagebox with question.
         :param str app: App to be updated.
+        :param str username: Username of account to be updated.
         :return: "Update" or "No"
         """
         return Messagebox.show_question(
-            f"Credentials for {app} already exists!\n"
+            f"Credentials for {username} at {app} already exists!\n"
             f"Do you want to update these credentials?",
             buttons=["No:secondary", "Update:primary"],
             parent=self
         )
+
+    def choose_account(self, app: str, usernames: list) -> str or None:
+        """
+        Shows dialog asking user to choose one of several accounts saved for app.
+        :param str app: Name of app or web page.
+        :param list usernames: Usernames to choose from.
+        :return str or None: Chosen username or None if dialog was cancelled.
+        """
+        return ChooseAccountDialog(app, usernames, parent=self).show()
@@ -2,6 +2,7 @@ import ttkbootstrap as ttkb
 from ttkbootstrap.tooltip import ToolTip
 from utilities.entry_mod import EntryMod
 from utilities import style_config
+from utilities.asset_cache import AssetCache
 
 
 class Reset2FAView(ttkb.Frame):
@@ -21,7 +22,7 @@ class Reset2FAView(ttkb.Frame):
         )
         self.back_btn.grid(row=0, column=0, pady=(0, 0), sticky="nw")
 
-        self.logo = ttkb.PhotoImage(file="pwm_data/img/logo.png")
+        self.logo = AssetCache.photo("logo.png")
         self.logo_label = ttkb.Label(self, image=self.logo)
         self.logo_label.grid(row=0, column=0, columnspan=2, pady=(0, 30))
 
@@ -2,6 +2,7 @@ import ttkbootstrap as ttkb
 from ttkbootstrap.tooltip import ToolTip
 from ttkbootstrap.dialogs import Messagebox
 from utilities import style_config
+from utilities.asset_cache import AssetCache
 
 
 class SettingsView(ttkb.Frame):
@@ -13,10 +14,10 @@ class SettingsView(ttkb.Frame):
         """
         super().__init__(master)
 
-        self.cyborg_img = ttkb.PhotoImage(file="pwm_data/img/cyborg.png")
-        self.morph_img = ttkb.PhotoImage(file="pwm_data/img/morph.png")
-        self.vapor_img = ttkb.PhotoImage(file="pwm_data/img/vapor.png")
-        self.solar_img = ttkb.PhotoImage(file="pwm_data/img/solar.png")
+        self.cyborg_img = AssetCache.photo("cyborg.png")
+        self.morph_img = AssetCache.photo("morph.png")
+        self.vapor_img = AssetCache.photo("vapor.png")
+        self.solar_img = AssetCache.photo("solar.png")
 
         self.back_btn = ttkb.Button(
             self,
@@ -147,3 +148,9 @@ class SettingsView(ttkb.Frame):
         Shows info messagebox.
         """
         Messagebox.show_info("Account has been deleted!", parent=self)
+
+    def account_not_deleted(self):
+        """
+        Shows error messagebox.
+        """
+        Messagebox.show_error("Account could not be deleted, please try again.", parent=self)
@@ -1,5 +1,6 @@
 import ttkbootstrap as ttkb
 from PIL import Image
+from utilities.asset_cache import AssetCache
 from .create_acc_view import CreateAccView
 from .create_pw_view import CreatePwView
 from .forgot_pw_view import ForgotPwView
@@ -18,12 +19,28 @@ class AppView(ttkb.Window):
     # Time in seconds after security token expires
     SECURITY_TOKEN_EXPIRE = 60
 
+    # Frame name as key and names of frames user is likely to open next as value, built in advance when app is idle.
+    NEXT_FRAMES: dict = {
+        "login": ("main_page", "settings"),
+        "create_acc": ("create_pw", "setup_2fa"),
+        "create_pw": ("setup_2fa",),
+        "main_page": ("settings",),
+        "setup_2fa": ("login",),
+        "reset_2fa": ("setup_2fa",),
+    }
+
+    # Time in milliseconds between building two frames in advance.
+    PREBUILD_DELAY: int = 100
+
+    # Sizes of window icon variants, window manager picks the one closest to size it shows.
+    ICON_SIZES: tuple = ((64, 64), (32, 32), (16, 16))
+
     def __init__(self):
         super().__init__()
 
         self.geometry("550x760")
-        self.logo = ttkb.PhotoImage(file="pwm_data/img/logo.png")
-        self.iconphoto(True, self.logo)
+        self.logo = AssetCache.photo("logo.png")
+        self.iconphoto(True, self.logo, *(AssetCache.photo("logo.png", size) for size in self.ICON_SIZES))
         self.resizable(False, False)
         self.config(padx=50, pady=50)
         self.title("V13 Password Manager")
@@ -48,26 +65,69 @@ class AppView(ttkb.Window):
         }
 
         self.current_frame: str or None = None
-        self.initialize_frames(self.frames)
+        self.on_frame_created = None
+        self._prebuild_queue: list = []
 
     def initialize_frames(self, frames: dict):
         """
         Takes dictionary where frame name is a key and frame a value. Initializes frame by passing in parent frame
-        and adds to initialized_frames dictionary preserving frame name as key.
+        and adds to initialized_frames dictionary preserving frame name as key. Frames are otherwise built on
+        first use, this builds them all at once.
         :param dict frames: Dictionary containing frame names as keys and frame objects as values.
         """
-        for key, value in frames.items():
-            frame = value(self.container)
-            self.initialized_frames[key] = frame
+        self.frames.update(frames)
+        for key in frames:
+            self.get_frame(key)
+
+    def get_frame(self, frame_name: str) -> ttkb.Frame:
+        """
+        Takes frame name and returns frame, builds it if it was not built yet. Built frame is placed under already
+        shown frame and passed to on_frame_created function, which attaches its controller.
+        :param str frame_name: Frame name.
+        :return ttkb.Frame: Frame.
+        """
+        frame = self.initialized_frames.get(frame_name)
+        if frame is None:
+            frame = self.frames[frame_name](self.container)
+            self.initialized_frames[frame_name] = frame
             frame.grid(row=0, column=0, sticky="nsew")
             frame.grid_rowconfigure(0, weight=1)
             frame.grid_columnconfigure(0, weight=1)
+            frame.lower()
+            if self.on_frame_created is not None:
+                self.on_frame_created(frame_name)
+        return frame
 
     def show_frame(self, frame_name: str):
         """
-        Takes frame name and shows specified frame.
+        Takes frame name and shows specified frame, building it first if needed. Frames likely to be opened next
+        are built in advance when app is idle.
         :param str frame_name: Frame name.
         """
         self.current_frame = frame_name
-        frame_to_show = self.initialized_frames[frame_name]
+        frame_to_show = self.get_frame(frame_name)
         frame_to_show.tkraise()
+        self.prebuild_frames(self.NEXT_FRAMES.get(frame_name, ()))
+
+    def prebuild_frames(self, frame_names):
+        """
+        Takes frame names and builds frames which were not built yet one by one, every frame waits until app is
+        idle, so building does not delay user input.
+        :param frame_names: Iterable of frame names.
+        """
+        start = not self._prebuild_queue
+        self._prebuild_queue += [
+            name for name in frame_names
+            if name not in self.initialized_frames and name not in self._prebuild_queue
+        ]
+        if start and self._prebuild_queue:
+            self.after(self.PREBUILD_DELAY, lambda: self.after_idle(self._prebuild_next))
+
+    def _prebuild_next(self):
+        """
+        Builds next frame waiting to be built in advance and schedules following one.
+        """
+        if self._prebuild_queue:
+            self.get_frame(self._prebuild_queue.pop(0))
+        if self._prebuild_queue:
+            self.after(self.PREBUILD_DELAY, lambda: self.after_idle(self._prebuild_next))